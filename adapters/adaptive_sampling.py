@@ -0,0 +1,118 @@
+"""
+Amostragem adaptativa de funções de uma variável.
+Concentra pontos perto de polos, oscilações e pontos de inflexão e economiza
+pontos nas regiões suaves, para que poucas centenas de amostras bastem por curva.
+"""
+from typing import Callable, List, Tuple
+import numpy as np
+import sympy as sp
+
+
+def lambdify_stack(variable: str, expressions: List[sp.Expr]) -> Callable[[np.ndarray], np.ndarray]:
+    """Compila várias expressões em uma única função que devolve um array empilhado (curvas x amostras)."""
+    symbol = sp.Symbol(variable)
+    compiled = sp.lambdify(symbol, list(expressions), "numpy")
+
+    def evaluate(x: np.ndarray) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            values = compiled(x)
+            stacked = np.empty((len(expressions), x.shape[0]), dtype=float)
+            for i, value in enumerate(values):
+                value = np.asarray(value)
+                if np.iscomplexobj(value):
+                    # Manter apenas os valores reais; partes imaginárias viram lacunas
+                    value = np.where(np.abs(value.imag) < 1e-12, value.real, np.nan)
+                stacked[i] = np.broadcast_to(value.astype(float), x.shape)
+        return stacked
+
+    return evaluate
+
+
+def robust_scale(values: np.ndarray) -> np.ndarray:
+    """Amplitude típica de cada curva, ignorando valores não finitos e picos extremos."""
+    scales = np.ones(values.shape[0])
+    for i, row in enumerate(values):
+        finite = row[np.isfinite(row)]
+        if finite.size:
+            low, high = np.percentile(finite, [5, 95])
+            if high - low > 0:
+                scales[i] = high - low
+    return scales
+
+
+def adaptive_sample(
+    evaluate: Callable[[np.ndarray], np.ndarray],
+    domain: Tuple[float, float],
+    initial_points: int = 65,
+    max_points: int = 400,
+    tolerance: float = 2e-3,
+    max_rounds: int = 16
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Escolhe as abscissas por subdivisão adaptativa e retorna (x, valores empilhados).
+
+    Em cada rodada, os pontos médios de todos os intervalos são avaliados em uma
+    única chamada vetorizada. São subdivididos os intervalos em que a interpolação
+    linear erra mais que a tolerância (relativa à amplitude de cada curva), em que
+    surgem valores não finitos (polos e descontinuidades) ou em que a concavidade
+    da função muda de sinal (pontos de inflexão).
+    """
+    a, b = float(domain[0]), float(domain[1])
+    x = np.linspace(a, b, initial_points)
+    values = evaluate(x)
+    min_width = (b - a) * 1e-7
+
+    for _ in range(max_rounds):
+        budget = max_points - x.shape[0]
+        if budget <= 0:
+            break
+
+        midpoints = (x[:-1] + x[1:]) / 2
+        mid_values = evaluate(midpoints)
+        scales = robust_scale(values)[:, None]
+
+        # Erro da interpolação linear no ponto médio, relativo à escala de cada curva
+        linear = (values[:, :-1] + values[:, 1:]) / 2
+        with np.errstate(all="ignore"):
+            error = np.abs(mid_values - linear) / scales
+        finite = np.isfinite(values[:, :-1]) & np.isfinite(values[:, 1:]) & np.isfinite(mid_values)
+        error = np.where(finite, error, np.inf)
+        # Curvas inteiramente indefinidas em um intervalo não pedem refinamento
+        undefined = ~np.isfinite(values[:, :-1]) & ~np.isfinite(values[:, 1:]) & ~np.isfinite(mid_values)
+        error = np.where(undefined, 0.0, error).max(axis=0)
+
+        # Mudança de sinal da segunda diferença da função original: ponto de inflexão
+        if x.shape[0] >= 4:
+            second = np.diff(values[0], 2)
+            flips = np.sign(second[:-1]) * np.sign(second[1:]) < 0
+            inflection = np.zeros_like(error, dtype=bool)
+            inflection[1:-1] = flips
+            error = np.where(inflection, np.maximum(error, tolerance * 2), error)
+
+        widths = np.diff(x)
+        candidates = np.flatnonzero((error > tolerance) & (widths > min_width))
+        if candidates.size == 0:
+            break
+
+        # Refinar primeiro os intervalos com maior erro, respeitando o orçamento
+        if candidates.size > budget:
+            order = np.argsort(error[candidates])[::-1]
+            candidates = np.sort(candidates[order[:budget]])
+
+        x = np.insert(x, candidates + 1, midpoints[candidates])
+        values = np.insert(values, candidates + 1, mid_values[:, candidates], axis=1)
+
+    return x, values
+
+
+def mask_poles(values: np.ndarray, factor: float = 8.0) -> np.ndarray:
+    """Substitui por NaN os valores muito fora da faixa típica, para que o gráfico quebre a linha nos polos."""
+    masked = values.copy()
+    for i, row in enumerate(masked):
+        finite = row[np.isfinite(row)]
+        if not finite.size:
+            continue
+        low, high = np.percentile(finite, [5, 95])
+        margin = factor * max(high - low, 1e-9)
+        row[(row < low - margin) | (row > high + margin)] = np.nan
+    return masked
@@ -0,0 +1,290 @@
+"""
+Cache persistente em disco (SQLite) para valores serializáveis (pickle por padrão).
+Segunda camada atrás do cache em memória: sobrevive a reinícios e deploys e
+pode ser compartilhado pelos processos e réplicas do mesmo host (modo WAL).
+Cada escrita é uma transação, então uma queda no meio dela não corrompe o
+arquivo; entradas ilegíveis são descartadas como se não existissem.
+"""
+from pathlib import Path
+from threading import Lock, local
+from typing import Any, Callable, Dict, Optional
+import os
+import pickle
+import sqlite3
+import time
+import zlib
+
+
+# Protocolo de serialização (buffers fora de banda dos arrays, menos cópias)
+PICKLE_PROTOCOL = 5
+
+# Nível de compressão zlib (resultados simbólicos comprimem bem; níveis maiores quase não ganham)
+COMPRESSION_LEVEL = 6
+
+# Espera por outro processo que esteja escrevendo no arquivo (milissegundos)
+BUSY_TIMEOUT_MS = 5000
+
+# Último acesso só é regravado se for mais antigo que isto (segundos); evita uma escrita por leitura
+TOUCH_INTERVAL = 60.0
+
+# O tamanho total do arquivo é conferido a cada tantas escritas deste processo (a soma percorre a tabela)
+EVICT_CHECK_EVERY = 32
+
+# Despejo por tamanho: ao exceder o limite, remove as entradas menos usadas até esta fração dele
+EVICT_TO_FRACTION = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class DiskCache:
+    """
+    Cache em um arquivo SQLite, com validade (TTL) e limite de tamanho.
+
+    As chaves são strings; os valores são serializados com `dumps` (por
+    padrão, pickle com o protocolo 5) e comprimidos com zlib. `format_version`
+    identifica o formato dos valores: ao abrir um arquivo de outra versão, as
+    entradas antigas são descartadas. Falhas do disco nunca são propagadas: o cache apenas deixa de
+    responder e a contagem de erros aumenta.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int,
+        ttl: Optional[float] = None,
+        format_version: str = "1",
+        dumps: Optional[Callable[[Any], bytes]] = None,
+        loads: Optional[Callable[[bytes], Any]] = None
+    ):
+        self.path = Path(path)
+        self.dumps = dumps or (lambda value: pickle.dumps(value, protocol=PICKLE_PROTOCOL))
+        self.loads = loads or pickle.loads
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.format_version = format_version
+        self._local = local()
+        self._init_lock = Lock()
+        self._stats_lock = Lock()
+        self._ready = False
+        self._writes_since_check = 0
+        self.disabled = False
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "expired": 0, "corrupt": 0, "evicted": 0, "errors": 0}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Retorna o valor da chave, ou `default` se ausente, expirado ou ilegível."""
+        connection = self._connection()
+        if connection is None:
+            return default
+        now = time.time()
+        try:
+            row = connection.execute("SELECT value, created, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count("misses")
+                return default
+            blob, created, accessed = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._delete(connection, key)
+                self._count("expired")
+                self._count("misses")
+                return default
+            try:
+                value = self.loads(zlib.decompress(blob))
+            except Exception:
+                # Entrada ilegível (gravada por outra versão de uma biblioteca, ou danificada)
+                self._delete(connection, key)
+                self._count("corrupt")
+                self._count("misses")
+                return default
+            if now - accessed > TOUCH_INTERVAL:
+                with connection:
+                    connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            self._error(e)
+            return default
+        self._count("hits")
+        return value
+
+    def put(self, key: str, value: Any) -> bool:
+        """Grava o valor; retorna False se ele não pôde ser serializado ou gravado."""
+        connection = self._connection()
+        if connection is None:
+            return False
+        try:
+            blob = zlib.compress(self.dumps(value), COMPRESSION_LEVEL)
+        except Exception:
+            return False
+        if len(blob) > self.max_bytes:
+            return False
+        now = time.time()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, sqlite3.Binary(blob), len(blob), now, now)
+                )
+                if self._due_for_eviction_check():
+                    self._evict(connection)
+        except sqlite3.Error as e:
+            self._error(e)
+            return False
+        self._count("writes")
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        connection = self._connection()
+        if connection is None:
+            return False
+        try:
+            row = connection.execute("SELECT created FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            self._error(e)
+            return False
+        return row is not None and (self.ttl is None or time.time() - row[0] <= self.ttl)
+
+    def purge_expired(self) -> int:
+        """Remove as entradas vencidas; retorna quantas foram removidas."""
+        connection = self._connection()
+        if connection is None or self.ttl is None:
+            return 0
+        try:
+            with connection:
+                removed = connection.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,)).rowcount
+        except sqlite3.Error as e:
+            self._error(e)
+            return 0
+        self._count("expired", removed)
+        return removed
+
+    def clear(self) -> None:
+        """Remove todas as entradas do arquivo."""
+        connection = self._connection()
+        if connection is None:
+            return
+        try:
+            with connection:
+                connection.execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            self._error(e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna o uso do arquivo e as contagens deste processo."""
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats, path=str(self.path), max_bytes=self.max_bytes, disabled=self.disabled)
+        connection = self._connection()
+        if connection is not None:
+            try:
+                entries, total = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+                stats.update(entries=entries, bytes=total)
+            except sqlite3.Error as e:
+                self._error(e)
+        return stats
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Conexão desta thread (o sqlite3 não compartilha conexões entre threads)."""
+        if self.disabled:
+            return None
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+        try:
+            with self._init_lock:
+                if not self._ready:
+                    self._initialize()
+                    self._ready = True
+            connection = self._open()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Cache em disco desativado ({self.path}): {str(e)}")
+            self.disabled = True
+            return None
+        self._local.connection = connection
+        return connection
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_MS / 1000)
+        connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def _initialize(self) -> None:
+        """Cria o arquivo e o esquema; recria arquivos danificados e descarta entradas de outro formato."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._prepare()
+        except sqlite3.DatabaseError as e:
+            if isinstance(e, sqlite3.OperationalError) and "locked" in str(e):
+                raise
+            # Arquivo danificado: é guardado à parte e o cache recomeça vazio
+            print(f"Cache em disco danificado ({self.path}), recriando: {str(e)}")
+            for suffix in ("", "-wal", "-shm"):
+                damaged = Path(str(self.path) + suffix)
+                if damaged.exists():
+                    os.replace(damaged, str(damaged) + ".corrupt")
+            self._prepare()
+
+    def _prepare(self) -> None:
+        connection = self._open()
+        try:
+            # WAL: leitores não bloqueiam o escritor, inclusive entre processos do mesmo host
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA quick_check").fetchone()
+            with connection:
+                connection.executescript(_SCHEMA)
+                row = connection.execute("SELECT value FROM meta WHERE name = 'format'").fetchone()
+                if row is None or row[0] != self.format_version:
+                    connection.execute("DELETE FROM entries")
+                    connection.execute(
+                        "INSERT OR REPLACE INTO meta (name, value) VALUES ('format', ?)", (self.format_version,)
+                    )
+        finally:
+            connection.close()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Remove as entradas vencidas e, acima do limite, as menos usadas."""
+        (total,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        if self.ttl is not None:
+            connection.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+            (total,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        target = self.max_bytes * EVICT_TO_FRACTION
+        evicted = 0
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            if total <= target:
+                break
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._count("evicted", evicted)
+
+    def _due_for_eviction_check(self) -> bool:
+        with self._stats_lock:
+            self._writes_since_check += 1
+            if self._writes_since_check < EVICT_CHECK_EVERY:
+                return False
+            self._writes_since_check = 0
+            return True
+
+    def _delete(self, connection: sqlite3.Connection, key: str) -> None:
+        with connection:
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _error(self, error: sqlite3.Error) -> None:
+        self._count("errors")
+        print(f"Erro no cache em disco ({self.path}): {str(error)}")
@@ -0,0 +1,95 @@
+"""
+Cache de figuras Plotly já construídas.
+Evita reavaliar visualizações que não mudaram entre execuções; as figuras
+ficam serializadas e cada chamada recebe uma cópia própria.
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Hashable, List, Optional, Tuple
+from domain.models import canonical_form
+from adapters.memory_cache import LRUCache
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+
+# Limite padrão de memória para as figuras em cache (64 MiB)
+DEFAULT_FIGURE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CachedFigure:
+    """
+    Figura guardada apenas na forma serializada.
+
+    O cache é compartilhado entre as sessões: cada uma recebe a sua própria
+    figura, reconstruída do JSON, de modo que alterações feitas por uma sessão
+    (layout, traços) não aparecem nas outras.
+    """
+    error: Optional[str]
+    json: Optional[str]
+
+    def to_figure(self) -> Optional["go.Figure"]:
+        """Retorna uma nova figura construída a partir do JSON (o Plotly só é importado aqui)."""
+        if self.json is None:
+            return None
+        import plotly.io as pio
+        return pio.from_json(self.json)
+
+    @property
+    def nbytes(self) -> int:
+        """Tamanho da figura serializada, usado para o limite de memória."""
+        size = len(self.json.encode("utf-8")) if self.json else 0
+        return size + (len(self.error.encode("utf-8")) if self.error else 0)
+
+
+class FigureCache:
+    """Cache LRU de figuras limitado pelo tamanho das figuras serializadas."""
+
+    def __init__(self, max_bytes: int = DEFAULT_FIGURE_CACHE_BYTES):
+        self._cache = LRUCache(max_bytes)
+
+    @staticmethod
+    def make_key(
+        expression_str: str,
+        variables: List[str],
+        domain: Tuple[float, float],
+        resolution: int,
+        kind: str
+    ) -> Hashable:
+        """Monta a chave a partir da forma canônica da expressão e dos parâmetros da figura."""
+        return (
+            canonical_form(expression_str),
+            tuple(variables),
+            tuple(float(bound) for bound in domain),
+            int(resolution),
+            kind
+        )
+
+    def get(self, key: Hashable) -> Optional[CachedFigure]:
+        """Retorna a figura em cache para a chave, se existir."""
+        return self._cache.get(key)
+
+    def put(self, key: Hashable, figure: Optional["go.Figure"], error: Optional[str]) -> CachedFigure:
+        """Serializa a figura uma única vez e a armazena no cache (a figura passada continua do chamador)."""
+        cached = CachedFigure(error=error, json=figure.to_json() if figure is not None else None)
+        self._cache.put(key, cached, cached.nbytes)
+        return cached
+
+    def put_cached(self, key: Hashable, cached: CachedFigure) -> None:
+        """Armazena uma figura já serializada (por exemplo, de um snapshot)."""
+        self._cache.put(key, cached, cached.nbytes)
+
+    def items(self) -> List[Tuple[Hashable, CachedFigure]]:
+        """Retorna os pares (chave, figura) em cache."""
+        return self._cache.items()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._cache
+
+    def stats(self):
+        """Retorna estatísticas de uso do cache."""
+        return self._cache.stats()
+
+    def clear(self) -> None:
+        """Remove todas as figuras do cache."""
+        self._cache.clear()
@@ -0,0 +1,85 @@
+"""
+Utilitários de concurrent.futures usados para encadear cálculos sem ocupar threads.
+Um cálculo entregue ao escalonador é representado por um Future; quem o pediu
+registra um callback em vez de bloquear uma thread esperando o resultado.
+"""
+from concurrent.futures import Future, InvalidStateError
+from threading import Lock
+from typing import Any, Callable
+
+
+def call_now(fn: Callable[..., Any], *args: Any) -> Future:
+    """Executa `fn(*args)` na thread atual e retorna um Future já concluído com o resultado ou a exceção."""
+    future: Future = Future()
+    try:
+        value = fn(*args)
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(value)
+    return future
+
+
+def completed(value: Any) -> Future:
+    """Future já concluído com `value`."""
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+def copy_outcome(source: Future, target: Future) -> None:
+    """
+    Conclui `target` com o resultado, a exceção ou o cancelamento de `source`.
+
+    Não faz nada se `target` já terminou (por exemplo, se foi cancelado por
+    quem o aguardava enquanto `source` ainda calculava).
+    """
+    if target.done():
+        return
+    try:
+        if source.cancelled():
+            target.cancel()
+        elif source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+    except InvalidStateError:
+        # `target` foi cancelado entre a verificação e a conclusão
+        pass
+
+
+def gather(*futures: Future) -> Future:
+    """
+    Future com a tupla dos resultados de `futures`, concluído quando todos
+    terminarem (ou no primeiro erro). Cancelá-lo cancela as partes.
+    """
+    combined: Future = Future()
+    remaining = len(futures)
+    lock = Lock()
+
+    def part_done(_: Future) -> None:
+        nonlocal remaining
+        with lock:
+            remaining -= 1
+            finished = remaining == 0
+        failed = next((part for part in futures if part.done() and (part.cancelled() or part.exception())), None)
+        if failed is not None:
+            copy_outcome(failed, combined)
+        elif finished and not combined.done():
+            try:
+                combined.set_result(tuple(part.result() for part in futures))
+            except InvalidStateError:
+                pass
+
+    def combined_done(_: Future) -> None:
+        # Quem aguardava o conjunto desistiu: as partes também são canceladas
+        if combined.cancelled():
+            for part in futures:
+                part.cancel()
+
+    if not futures:
+        combined.set_result(())
+    for part in futures:
+        part.add_done_callback(part_done)
+    combined.add_done_callback(combined_done)
+    return combined
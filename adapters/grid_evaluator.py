@@ -0,0 +1,141 @@
+"""
+Avaliação numérica de expressões em grades bidimensionais.
+Divide a grade em blocos de linhas avaliados em paralelo: as ufuncs do NumPy
+liberam o GIL, então threads aproveitam vários núcleos sem copiar dados.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Optional, Sequence
+import importlib.util
+import os
+import numpy as np
+import sympy as sp
+
+
+BACKENDS = ("auto", "numpy", "numexpr", "numba")
+
+# Abaixo deste número de pontos a grade é avaliada em um único bloco
+MIN_PARALLEL_POINTS = 64 * 1024
+
+
+def available_backends() -> Sequence[str]:
+    """Retorna os backends de avaliação instalados neste ambiente."""
+    backends = ["numpy"]
+    for module in ("numexpr", "numba"):
+        if importlib.util.find_spec(module) is not None:
+            backends.append(module)
+    return backends
+
+
+class GridEvaluator:
+    """Avalia expressões SymPy em grades (x, y) por blocos de linhas em um pool de threads."""
+
+    def __init__(self, workers: Optional[int] = None, block_rows: int = 128, backend: str = "auto"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend}. Opções: {', '.join(BACKENDS)}")
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.block_rows = max(1, block_rows)
+        self.backend = backend
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+
+    def compile(self, expr: sp.Expr, variables: Sequence[str] = ("x", "y")) -> Callable:
+        """Compila a expressão para o backend escolhido, com fallback para NumPy puro."""
+        symbols = sp.symbols(list(variables))
+        backend = self.backend
+        if backend == "auto":
+            backend = "numexpr" if "numexpr" in available_backends() else "numpy"
+
+        if backend == "numexpr" and "numexpr" in available_backends():
+            try:
+                kernel = sp.lambdify(symbols, expr, "numexpr")
+                # Validar o kernel: nem todas as funções são suportadas pelo numexpr
+                kernel(*[np.ones(2) for _ in symbols])
+                return kernel
+            except Exception:
+                pass
+
+        if backend == "numba" and "numba" in available_backends():
+            try:
+                import numba
+                scalar = sp.lambdify(symbols, expr, "math")
+                signature = "float64(" + ", ".join("float64" for _ in symbols) + ")"
+                kernel = numba.vectorize([signature])(scalar)
+                kernel(*[np.ones(2) for _ in symbols])
+                return kernel
+            except Exception:
+                pass
+
+        return sp.lambdify(symbols, expr, "numpy")
+
+    def evaluate(
+        self,
+        expr: sp.Expr,
+        x_range: np.ndarray,
+        y_range: np.ndarray,
+        out: Optional[np.ndarray] = None,
+        variables: Sequence[str] = ("x", "y")
+    ) -> np.ndarray:
+        """
+        Avalia a expressão na grade meshgrid(x_range, y_range).
+
+        O resultado tem forma (len(y_range), len(x_range)), como em np.meshgrid.
+        Se `out` for informado (por exemplo, um arquivo mapeado em memória), os
+        blocos são escritos diretamente nele.
+        """
+        kernel = self.compile(expr, variables)
+        return self.evaluate_kernel(kernel, x_range, y_range, out=out)
+
+    def evaluate_kernel(
+        self,
+        kernel: Callable,
+        x_range: np.ndarray,
+        y_range: np.ndarray,
+        out: Optional[np.ndarray] = None,
+        row_offset: int = 0
+    ) -> np.ndarray:
+        """Avalia um kernel já compilado; `row_offset` indica a primeira linha de `y_range` em `out`."""
+        rows, cols = len(y_range), len(x_range)
+        if out is None:
+            out = np.empty((rows, cols), dtype=float)
+            row_offset = 0
+
+        x_row = np.asarray(x_range, dtype=float)[None, :]
+        y_col = np.asarray(y_range, dtype=float)[:, None]
+
+        def fill(start: int, stop: int) -> None:
+            # As coordenadas do bloco são geradas sob demanda a partir dos eixos 1D
+            x_block = np.broadcast_to(x_row, (stop - start, cols))
+            y_block = np.broadcast_to(y_col[start:stop], (stop - start, cols))
+            with np.errstate(all="ignore"):
+                values = np.asarray(kernel(x_block, y_block))
+                if np.iscomplexobj(values):
+                    values = np.where(np.abs(values.imag) < 1e-12, values.real, np.nan)
+                out[row_offset + start:row_offset + stop] = np.broadcast_to(values, (stop - start, cols))
+
+        if rows * cols < MIN_PARALLEL_POINTS or self.workers == 1:
+            for start in range(0, rows, self.block_rows):
+                fill(start, min(start + self.block_rows, rows))
+            return out
+
+        futures = [
+            self._pool().submit(fill, start, min(start + self.block_rows, rows))
+            for start in range(0, rows, self.block_rows)
+        ]
+        for future in futures:
+            future.result()
+        return out
+
+    def _pool(self) -> ThreadPoolExecutor:
+        """Cria o pool de threads na primeira avaliação paralela."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="grid-eval")
+            return self._executor
+
+    def shutdown(self) -> None:
+        """Encerra o pool de threads."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
@@ -0,0 +1,99 @@
+"""
+Cache em memória com limite de tamanho e despejo LRU.
+Usado pelos serviços para reaproveitar resultados caros entre execuções.
+"""
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import pickle
+import sys
+
+
+def estimate_size(value: Any) -> int:
+    """Estima o tamanho em bytes de um valor a partir da sua forma serializada."""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Cache LRU thread-safe limitado pelo tamanho total (em bytes) das entradas."""
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = estimate_size):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor associado à chave, marcando-o como usado recentemente."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None) -> bool:
+        """Armazena um valor; retorna False se ele sozinho excede o limite do cache."""
+        if nbytes is None:
+            nbytes = self.sizeof(value)
+        if nbytes > self.max_bytes:
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+
+            # Despejar as entradas menos usadas até respeitar o limite
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+        return True
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Retorna o valor em cache ou calcula, armazena e retorna um novo valor."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Retorna uma cópia dos pares (chave, valor), do menos ao mais usado."""
+        with self._lock:
+            return [(key, value) for key, (value, _) in self._entries.items()]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna estatísticas de uso do cache."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
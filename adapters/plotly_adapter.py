@@ -2,23 +2,33 @@
 Adaptador para a biblioteca Plotly.
 Isola a lógica de visualização do resto da aplicação.
 """
-from typing import List, Dict, Optional, Tuple, Any
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple, Any
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import sympy as sp
 from domain.models import Expression, PartialDerivativeResult
+from adapters.grid_evaluator import GridEvaluator
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 
 class PlotlyAdapter:
     """Adaptador para a biblioteca Plotly."""
     
+    def __init__(self, grid_evaluator: Optional[GridEvaluator] = None):
+        self.grid_evaluator = grid_evaluator if grid_evaluator is not None else GridEvaluator()
+    
     def create_3d_visualization(
         self, 
         expression: Expression, 
-        partial_derivatives: PartialDerivativeResult
-    ) -> Tuple[Optional[go.Figure], Optional[str]]:
+        partial_derivatives: PartialDerivativeResult,
+        domain: Tuple[float, float] = (-3, 3),
+        resolution: int = 50
+    ) -> Tuple[Optional["go.Figure"], Optional[str]]:
         """Cria visualização 3D para funções de duas variáveis e suas derivadas parciais."""
+        # Importado sob demanda: o Plotly só é carregado quando uma figura é criada
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
         try:
             # Verificar se a expressão tem exatamente duas variáveis
             variables = expression.variables
@@ -36,20 +46,15 @@ class PlotlyAdapter:
             if not dx or not dy:
                 return None, "Não foi possível obter as derivadas parciais necessárias."
             
-            # Converter para funções numéricas
-            f_expr = sp.lambdify((x, y), expr, "numpy")
-            f_dx = sp.lambdify((x, y), dx, "numpy")
-            f_dy = sp.lambdify((x, y), dy, "numpy")
-            
             # Criar grade de pontos
-            x_range = np.linspace(-3, 3, 50)
-            y_range = np.linspace(-3, 3, 50)
+            x_range = np.linspace(domain[0], domain[1], resolution)
+            y_range = np.linspace(domain[0], domain[1], resolution)
             X, Y = np.meshgrid(x_range, y_range)
             
-            # Calcular valores da função e derivadas
-            Z = f_expr(X, Y)
-            Z_dx = f_dx(X, Y)
-            Z_dy = f_dy(X, Y)
+            # Calcular valores da função e derivadas em blocos paralelos
+            Z = self.grid_evaluator.evaluate(expr, x_range, y_range)
+            Z_dx = self.grid_evaluator.evaluate(dx, x_range, y_range)
+            Z_dy = self.grid_evaluator.evaluate(dy, x_range, y_range)
             
             # Lidar com valores infinitos ou NaN
             Z = np.nan_to_num(Z, nan=0, posinf=10, neginf=-10)
@@ -128,9 +133,13 @@ class PlotlyAdapter:
     def create_gradient_visualization(
         self, 
         expression: Expression, 
-        partial_derivatives: PartialDerivativeResult
-    ) -> Tuple[Optional[go.Figure], Optional[str]]:
+        partial_derivatives: PartialDerivativeResult,
+        domain: Tuple[float, float] = (-3, 3),
+        resolution: int = 20
+    ) -> Tuple[Optional["go.Figure"], Optional[str]]:
         """Cria visualização 2D do gradiente (vetores de derivadas parciais)."""
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
         try:
             # Verificar se a expressão tem exatamente duas variáveis
             variables = expression.variables
@@ -148,20 +157,15 @@ class PlotlyAdapter:
             if not dx or not dy:
                 return None, "Não foi possível obter as derivadas parciais necessárias."
             
-            # Converter para funções numéricas
-            f_expr = sp.lambdify((x, y), expr, "numpy")
-            f_dx = sp.lambdify((x, y), dx, "numpy")
-            f_dy = sp.lambdify((x, y), dy, "numpy")
-            
             # Criar grade de pontos
-            x_range = np.linspace(-3, 3, 20)
-            y_range = np.linspace(-3, 3, 20)
+            x_range = np.linspace(domain[0], domain[1], resolution)
+            y_range = np.linspace(domain[0], domain[1], resolution)
             X, Y = np.meshgrid(x_range, y_range)
             
-            # Calcular valores da função e derivadas
-            Z = f_expr(X, Y)
-            U = f_dx(X, Y)  # Componente x do gradiente
-            V = f_dy(X, Y)  # Componente y do gradiente
+            # Calcular valores da função e derivadas em blocos paralelos
+            Z = self.grid_evaluator.evaluate(expr, x_range, y_range)
+            U = self.grid_evaluator.evaluate(dx, x_range, y_range)  # Componente x do gradiente
+            V = self.grid_evaluator.evaluate(dy, x_range, y_range)  # Componente y do gradiente
             
             # Lidar com valores infinitos ou NaN
             Z = np.nan_to_num(Z, nan=0, posinf=10, neginf=-10)
@@ -225,4 +229,131 @@ class PlotlyAdapter:
             return fig, None
         
         except Exception as e:
-            return None, f"Erro ao criar visualização do gradiente: {str(e)}"
\ No newline at end of file
+            return None, f"Erro ao criar visualização do gradiente: {str(e)}"
+    
+    def create_derivative_curves(
+        self,
+        variable: str,
+        x_values: np.ndarray,
+        curves: np.ndarray,
+        orders: List[int]
+    ) -> Tuple[Optional["go.Figure"], Optional[str]]:
+        """Cria o gráfico de f e de suas derivadas a partir de amostras já avaliadas."""
+        import plotly.graph_objects as go
+        try:
+            colors = ['#7eefc4', '#d070d0', '#f0c050', '#70a0f0']
+            fig = go.Figure()
+            
+            for i, order in enumerate(orders):
+                fig.add_trace(
+                    go.Scatter(
+                        x=x_values, y=curves[i],
+                        mode='lines',
+                        line=dict(width=2, color=colors[i % len(colors)]),
+                        connectgaps=False,
+                        name=f'{derivative_label(order)}({variable})'
+                    )
+                )
+            
+            # Configurar layout
+            fig.update_layout(
+                title_text="Função e suas Derivadas",
+                height=450,
+                template="plotly_dark",
+                xaxis=dict(title=variable),
+                yaxis=dict(title='valor'),
+                legend=dict(orientation='h', y=-0.2)
+            )
+            
+            return fig, None
+        
+        except Exception as e:
+            return None, f"Erro ao criar gráfico das derivadas: {str(e)}"
+
+    
+    def create_order_slider_figure(
+        self,
+        variable: str,
+        x_values: np.ndarray,
+        curves: np.ndarray,
+        orders: List[int]
+    ) -> Tuple[Optional["go.Figure"], Optional[str]]:
+        """
+        Cria um gráfico com um controle deslizante de ordens, calculado inteiramente no servidor.
+        
+        A primeira curva (ordem 0) fica sempre visível; cada passo do controle apenas
+        alterna a visibilidade das curvas já enviadas, sem voltar ao servidor.
+        """
+        import plotly.graph_objects as go
+        try:
+            fig = go.Figure()
+            
+            # Função original, sempre visível
+            fig.add_trace(
+                go.Scatter(
+                    x=x_values, y=curves[0],
+                    mode='lines',
+                    line=dict(width=2, color='#7eefc4'),
+                    connectgaps=False,
+                    name=f'{derivative_label(orders[0])}({variable})'
+                )
+            )
+            
+            # Uma curva por ordem de derivada, apenas a primeira visível
+            for i, order in enumerate(orders[1:], start=1):
+                fig.add_trace(
+                    go.Scatter(
+                        x=x_values, y=curves[i],
+                        mode='lines',
+                        line=dict(width=2, color='#d070d0'),
+                        connectgaps=False,
+                        visible=(i == 1),
+                        name=f'{derivative_label(order)}({variable})'
+                    )
+                )
+            
+            # Passos do controle deslizante: alternar visibilidade no navegador
+            steps = []
+            for i, order in enumerate(orders[1:], start=1):
+                visible = [True] + [j == i for j in range(1, len(orders))]
+                steps.append(dict(
+                    method='update',
+                    label=str(order),
+                    args=[
+                        {'visible': visible},
+                        {'title.text': f'Derivada de ordem {order}', 'yaxis.autorange': True}
+                    ]
+                ))
+            
+            # Configurar layout
+            fig.update_layout(
+                title_text=f'Derivada de ordem {orders[1]}',
+                height=500,
+                template="plotly_dark",
+                xaxis=dict(title=variable),
+                yaxis=dict(title='valor'),
+                legend=dict(orientation='h', y=-0.35),
+                sliders=[dict(
+                    active=0,
+                    currentvalue=dict(prefix='Ordem: '),
+                    pad=dict(t=40),
+                    steps=steps
+                )]
+            )
+            
+            return fig, None
+        
+        except Exception as e:
+            return None, f"Erro ao criar gráfico de exploração de ordens: {str(e)}"
+
+
+def derivative_label(order: int) -> str:
+    """Retorna o rótulo f, f′, f″ ou f⁽ⁿ⁾ para a ordem da derivada."""
+    if order == 0:
+        return 'f'
+    if order == 1:
+        return 'f′'
+    if order == 2:
+        return 'f″'
+    superscripts = str.maketrans('0123456789', '⁰¹²³⁴⁵⁶⁷⁸⁹')
+    return f'f⁽{str(order).translate(superscripts)}⁾'
@@ -0,0 +1,135 @@
+"""
+Execução única de cálculos idênticos simultâneos (single-flight).
+Se um cálculo para a mesma chave já está em andamento, as chamadas seguintes
+aguardam o seu resultado em vez de repeti-lo.
+"""
+from concurrent.futures import Future
+from threading import Lock, get_ident
+from typing import Any, Callable, Dict, Hashable, Optional
+from adapters.futures import copy_outcome
+
+
+class _Call:
+    """Um cálculo em andamento: o Future compartilhado, a thread líder e quantos o aguardam."""
+
+    __slots__ = ("future", "owner", "waiters", "source")
+
+    def __init__(self, owner: Optional[int]):
+        self.future: Future = Future()
+        # Thread que calcula em `do`; None para os cálculos iniciados por `submit`
+        self.owner = owner
+        self.waiters = 1
+        # Future do cálculo iniciado por `submit` (por exemplo, no escalonador)
+        self.source: Optional[Future] = None
+
+
+class SingleFlight:
+    """Agrupa chamadas simultâneas pela chave: uma calcula, as demais aguardam o mesmo resultado."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.withdrawn = 0
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Executa `compute` ou aguarda a execução em andamento para a mesma chave."""
+        with self._lock:
+            call = self._calls.get(key)
+            # Uma chamada reentrante da própria thread líder calcula diretamente, sem esperar por si mesma
+            if call is not None and call.owner != get_ident():
+                self.followers += 1
+                call.waiters += 1
+                leader = False
+            else:
+                self.leaders += 1
+                call = _Call(get_ident())
+                self._calls.setdefault(key, call)
+                leader = True
+
+        if not leader:
+            return call.future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            call.future.set_exception(e)
+            raise
+        else:
+            call.future.set_result(value)
+            return value
+        finally:
+            self._forget(key, call)
+
+    def submit(self, key: Hashable, start: Callable[[], Future]) -> Future:
+        """
+        Versão assíncrona de `do`: retorna um Future sem bloquear a thread.
+
+        `start` inicia o cálculo (por exemplo, no escalonador) e retorna o seu
+        Future. Se o cálculo da mesma chave já está em andamento, por `do` ou
+        por `submit`, acompanha-o sem chamar `start`. Cada chamada recebe o seu
+        próprio Future: cancelá-lo não afeta as demais, e quando todas as que
+        aguardam o cálculo desistem, ele é cancelado (se ainda estiver na fila).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.followers += 1
+                call.waiters += 1
+                leader = False
+            else:
+                self.leaders += 1
+                call = self._calls[key] = _Call(None)
+                leader = True
+
+        if leader:
+            try:
+                source = start()
+            except BaseException as e:
+                self._forget(key, call)
+                call.future.set_exception(e)
+            else:
+                call.source = source
+                # O callback de quem iniciou o cálculo (guardar em cache) roda antes deste
+                source.add_done_callback(lambda done: self._settle(key, call, done))
+
+        view: Future = Future()
+        call.future.add_done_callback(lambda done: copy_outcome(done, view))
+        view.add_done_callback(lambda done: self._leave(call, done))
+        return view
+
+    def _settle(self, key: Hashable, call: _Call, source: Future) -> None:
+        self._forget(key, call)
+        copy_outcome(source, call.future)
+
+    def _leave(self, call: _Call, view: Future) -> None:
+        """Quem aguardava desistiu; sem ninguém aguardando, o cálculo na fila é cancelado."""
+        if not view.cancelled() or call.future.done():
+            return
+        with self._lock:
+            call.waiters -= 1
+            source = call.source if call.waiters == 0 else None
+        if source is not None and source.cancel():
+            with self._lock:
+                self.withdrawn += 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Número de cálculos em andamento."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Cálculos executados, chamadas que aguardaram um cálculo em andamento e cálculos retirados da fila."""
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "followers": self.followers,
+                "withdrawn": self.withdrawn,
+                "in_flight": len(self._calls)
+            }
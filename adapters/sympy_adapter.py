@@ -4,7 +4,7 @@ Isola a lógica de interação com o SymPy do resto da aplicação.
 """
 from typing import List, Dict, Optional, Tuple, Any
 import sympy as sp
-from domain.models import Expression, DerivativeResult, PartialDerivativeResult, CriticalPoint
+from domain.models import Expression, DerivativeResult, PartialDerivativeResult, CriticalPoint, hessian_matrix
 
 
 class SymPyAdapter:
@@ -53,8 +53,17 @@ class SymPyAdapter:
             return None
     
     @staticmethod
-    def find_critical_points(expression: Expression) -> List[CriticalPoint]:
-        """Encontra pontos críticos de uma função multivariável."""
+    def calculate_hessian(expression: Expression) -> Optional[sp.Matrix]:
+        """Calcula a matriz Hessiana de uma função multivariável."""
+        try:
+            return hessian_matrix(expression.sympy_expr, expression.variables)
+        except Exception as e:
+            print(f"Erro ao calcular a matriz Hessiana: {str(e)}")
+            return None
+    
+    @staticmethod
+    def find_critical_points(expression: Expression) -> Optional[List[CriticalPoint]]:
+        """Encontra pontos críticos de uma função multivariável (None se o sistema não puder ser resolvido)."""
         try:
             expr = expression.sympy_expr
             variables = expression.variables
@@ -67,6 +76,8 @@ class SymPyAdapter:
             
             critical_points = []
             for solution in solutions:
+                # As chaves de sp.solve são símbolos; as variáveis da expressão, strings
+                solution = {str(var): value for var, value in solution.items()}
                 # Verificar se a solução é completa (tem valores para todas as variáveis)
                 if all(var in solution for var in variables):
                     # Classificar o ponto crítico se possível
@@ -76,7 +87,7 @@ class SymPyAdapter:
             return critical_points
         except Exception as e:
             print(f"Erro ao encontrar pontos críticos: {str(e)}")
-            return []
+            return None
     
     @staticmethod
     def _generate_derivative_steps(expr: sp.Expr, variable: str, order: int = 1) -> List[str]:
@@ -147,12 +158,7 @@ class SymPyAdapter:
         """Classifica um ponto crítico como mínimo, máximo ou ponto de sela."""
         try:
             # Calcular a matriz Hessiana no ponto crítico
-            n = len(variables)
-            hessian = sp.zeros(n, n)
-            
-            for i, var_i in enumerate(variables):
-                for j, var_j in enumerate(variables):
-                    hessian[i, j] = sp.diff(expr, var_i, var_j)
+            hessian = hessian_matrix(expr, variables)
             
             # Substituir os valores do ponto crítico na matriz Hessiana
             hessian_at_point = hessian.subs(point)
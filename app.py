@@ -4,22 +4,56 @@ Aplicação principal Derivata - Calculadora de Derivadas Cyberpunk.
 import streamlit as st
 import sympy as sp
 
-# Importar adaptadores
-from adapters.sympy_adapter import SymPyAdapter
-from adapters.plotly_adapter import PlotlyAdapter
-
-# Importar serviços
-from use_cases.derivative_service import DerivativeService
-from use_cases.partial_derivative_service import PartialDerivativeService
-from use_cases.visualization_service import VisualizationService
+# Importar recursos compartilhados entre execuções
+from presentation.resources import get_services
+from presentation.session_store import persistent_widgets, session_identity
 
 # Importar componentes de apresentação
-from presentation.components.normal_derivatives_tab import render_normal_derivatives_tab
-from presentation.components.partial_derivatives_tab import render_partial_derivatives_tab
-from presentation.components.higher_order_tab import render_higher_order_tab
+from presentation.components.normal_derivatives_tab import (
+    PERSISTENT_WIDGETS as NORMAL_WIDGETS,
+    render_normal_derivatives_tab
+)
+from presentation.components.partial_derivatives_tab import (
+    PERSISTENT_WIDGETS as PARTIAL_WIDGETS,
+    render_partial_derivatives_tab
+)
+from presentation.components.higher_order_tab import (
+    PERSISTENT_WIDGETS as HIGHER_WIDGETS,
+    render_higher_order_tab
+)
 from presentation.styles.cyberpunk_theme import apply_cyberpunk_theme, display_header, display_footer
 
 
+# Abas disponíveis (rótulo -> identificador)
+TABS = {
+    "Derivada Normal": "normal",
+    "Derivada Parcial": "partial",
+    "Derivada de Ordem Superior": "higher"
+}
+
+
+# Cada aba é um fragmento: interações dentro dela reexecutam só a própria aba
+@st.fragment
+def normal_tab_fragment(derivative_service, visualization_service, prefetcher):
+    """Renderiza a aba de derivadas normais."""
+    with persistent_widgets(NORMAL_WIDGETS), session_identity():
+        render_normal_derivatives_tab(derivative_service, visualization_service, prefetcher)
+
+
+@st.fragment
+def partial_tab_fragment(partial_derivative_service, visualization_service, prefetcher):
+    """Renderiza a aba de derivadas parciais."""
+    with persistent_widgets(PARTIAL_WIDGETS), session_identity():
+        render_partial_derivatives_tab(partial_derivative_service, visualization_service, prefetcher)
+
+
+@st.fragment
+def higher_order_tab_fragment(derivative_service, visualization_service, prefetcher):
+    """Renderiza a aba de derivadas de ordem superior."""
+    with persistent_widgets(HIGHER_WIDGETS), session_identity():
+        render_higher_order_tab(derivative_service, visualization_service, prefetcher)
+
+
 def main():
     """Função principal da aplicação."""
     # Configurar a página
@@ -36,30 +70,34 @@ def main():
     # Exibir cabeçalho
     display_header()
     
-    # Inicializar adaptadores
-    sympy_adapter = SymPyAdapter()
-    plotly_adapter = PlotlyAdapter()
-    
-    # Inicializar serviços
-    derivative_service = DerivativeService(sympy_adapter)
-    partial_derivative_service = PartialDerivativeService(sympy_adapter)
-    visualization_service = VisualizationService(plotly_adapter, sympy_adapter)
+    # Obter serviços, construídos uma única vez por processo
+    services = get_services()
+    derivative_service = services.derivative_service
+    partial_derivative_service = services.partial_derivative_service
+    visualization_service = services.visualization_service
+    prefetcher = services.prefetcher
     
     # Layout em colunas para melhor organização
     col1, col2 = st.columns([3, 1])
     
     with col1:
-        # Abas para diferentes tipos de derivadas
-        tab1, tab2, tab3 = st.tabs(["Derivada Normal", "Derivada Parcial", "Derivada de Ordem Superior"])
-        
-        with tab1:
-            render_normal_derivatives_tab(derivative_service)
-        
-        with tab2:
-            render_partial_derivatives_tab(partial_derivative_service, visualization_service)
+        # Seletor de abas: apenas a aba ativa é executada em cada reexecução
+        # (st.tabs executaria o conteúdo das três abas)
+        active_tab = st.radio(
+            "Tipo de derivada",
+            list(TABS.keys()),
+            horizontal=True,
+            label_visibility="collapsed",
+            key="active_tab"
+        )
         
-        with tab3:
-            render_higher_order_tab(derivative_service)
+        with st.container(border=True):
+            if TABS[active_tab] == "normal":
+                normal_tab_fragment(derivative_service, visualization_service, prefetcher)
+            elif TABS[active_tab] == "partial":
+                partial_tab_fragment(partial_derivative_service, visualization_service, prefetcher)
+            else:
+                higher_order_tab_fragment(derivative_service, visualization_service, prefetcher)
     
     with col2:
         # Adicionar informações sobre notação
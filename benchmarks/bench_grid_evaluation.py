@@ -0,0 +1,75 @@
+"""
+Benchmark da avaliação de grades em blocos paralelos.
+Mede o tempo e o ganho em relação a uma thread para grades 500x500 e 2000x2000.
+
+Uso:
+    python benchmarks/bench_grid_evaluation.py [--backend numpy] [--block-rows 128]
+"""
+from pathlib import Path
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import sympy as sp
+from adapters.grid_evaluator import GridEvaluator, available_backends
+
+
+EXPRESSION = "sin(x*y) + exp(-(x**2 + y**2)/4)*cos(3*x) + log(x**2 + y**2 + 1)"
+SIZES = (500, 2000)
+
+
+def worker_counts():
+    """Potências de dois até o número de núcleos disponíveis."""
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def best_time(evaluator, kernel, axis, repeats):
+    """Menor tempo entre as repetições, para reduzir o ruído."""
+    out = np.empty((len(axis), len(axis)))
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        evaluator.evaluate_kernel(kernel, axis, axis, out=out)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="numpy", choices=["auto", "numpy", "numexpr", "numba"])
+    parser.add_argument("--block-rows", type=int, default=128)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workers", help="Lista de contagens de threads, ex.: 1,2,4 (padrão: até o número de núcleos)")
+    args = parser.parse_args()
+
+    expr = sp.sympify(EXPRESSION)
+    print(f"Expressão: {EXPRESSION}")
+    print(f"Backend: {args.backend} (instalados: {', '.join(available_backends())})")
+    print(f"Núcleos: {os.cpu_count()}  Linhas por bloco: {args.block_rows}\n")
+    print(f"{'grade':>11} {'threads':>7} {'tempo (ms)':>11} {'ganho':>6}")
+
+    for size in SIZES:
+        axis = np.linspace(-3, 3, size)
+        baseline = None
+        counts = [int(count) for count in args.workers.split(",")] if args.workers else worker_counts()
+        for workers in counts:
+            evaluator = GridEvaluator(workers=workers, block_rows=args.block_rows, backend=args.backend)
+            kernel = evaluator.compile(expr)
+            elapsed = best_time(evaluator, kernel, axis, args.repeats)
+            evaluator.shutdown()
+            baseline = baseline or elapsed
+            print(f"{size:>5}x{size:<5} {workers:>7} {elapsed * 1000:>11.1f} {baseline / elapsed:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark do tempo de importação da aplicação (início a frio).
+Importa app.py em um processo novo com `python -X importtime`, resume o tempo
+acumulado dos pacotes mais pesados e falha se o orçamento for excedido ou se a
+aplicação importar, antes da primeira visualização, dependências carregadas sob
+demanda (plotly.subplots, pandas) que o próprio Streamlit não importa.
+
+O SymPy responde pela maior parte do tempo da aplicação e não pode ser
+adiado: a primeira execução já converte e exibe expressões. Os clientes leves
+(derivata, derivata.client, derivata.http_api) não o importam.
+
+Uso:
+    python benchmarks/bench_import_time.py [--repeats 5] [--budget-ms 750]
+"""
+from pathlib import Path
+import argparse
+import statistics
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Pacotes resumidos no relatório
+REPORTED_PACKAGES = ("streamlit", "sympy", "numpy", "plotly", "plotly.graph_objects", "pandas")
+
+# Módulos que não devem ser importados na inicialização
+LAZY_MODULES = ("plotly.graph_objects", "plotly.subplots", "plotly.io", "pandas")
+
+# Orçamento padrão do tempo de importação da própria aplicação, além do Streamlit (ms).
+# Referência medida: mediana de 360-370 ms (SymPy 280-290 ms) em 1 núcleo, com
+# picos perto de 500 ms em máquina carregada; o orçamento deixa folga para essa variação
+DEFAULT_BUDGET_MS = 750.0
+
+
+def import_profile(module):
+    """Importa o módulo em um processo novo e retorna {módulo: tempo acumulado em ms}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if cumulative_us.strip().isdigit():
+            cumulative[name.strip()] = int(cumulative_us) / 1000
+    return cumulative
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o tempo de importação de app.py.")
+    parser.add_argument("--repeats", type=int, default=5, help="Processos medidos (padrão: 5)")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Orçamento da importação da aplicação, descontado o Streamlit (padrão: {DEFAULT_BUDGET_MS:.0f})"
+    )
+    args = parser.parse_args(argv)
+
+    # Primeira importação descartada: aquece o cache de bytecode e do sistema de arquivos
+    import_profile("app")
+    streamlit_modules = set(import_profile("streamlit"))
+    profiles = [import_profile("app") for _ in range(args.repeats)]
+
+    def median(name):
+        return statistics.median(profile.get(name, 0.0) for profile in profiles)
+
+    total = median("app")
+    own = statistics.median(profile["app"] - profile.get("streamlit", 0.0) for profile in profiles)
+
+    print(f"{'módulo':<24}{'acumulado (ms)':>16}")
+    for name in REPORTED_PACKAGES:
+        value = median(name)
+        print(f"{name:<24}{value:>16.1f}" if value else f"{name:<24}{'não importado':>16}")
+    print(f"{'app (total)':<24}{total:>16.1f}")
+    print(f"{'app (sem streamlit)':<24}{own:>16.1f}   orçamento: {args.budget_ms:.0f}")
+
+    failures = []
+    # O Streamlit já importa parte do Plotly; só conta o que a aplicação acrescenta
+    eager = [
+        name for name in LAZY_MODULES
+        if name not in streamlit_modules and any(name in profile for profile in profiles)
+    ]
+    if eager:
+        failures.append(f"importados na inicialização: {', '.join(eager)}")
+    if own > args.budget_ms:
+        failures.append(f"orçamento excedido: {own:.1f} ms > {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FALHA: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
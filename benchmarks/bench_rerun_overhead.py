@@ -0,0 +1,78 @@
+"""
+Benchmark do custo fixo de cada reexecução do script Streamlit.
+Compara, por componente, a construção a cada execução (comportamento anterior)
+com os recursos compartilhados pelo processo, e mede reexecuções completas da
+aplicação ociosa com o AppTest do Streamlit.
+
+Uso:
+    python benchmarks/bench_rerun_overhead.py [--repeats 20]
+"""
+from pathlib import Path
+import argparse
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from streamlit.testing.v1 import AppTest
+from presentation import resources
+from presentation.styles import cyberpunk_theme
+
+
+def mean_ms(function, repeats):
+    """Tempo médio de uma chamada, em milissegundos."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def clear_resources():
+    """Descarta os recursos compartilhados, simulando a reconstrução a cada execução."""
+    resources.get_services.clear()
+    cyberpunk_theme.compile_cyberpunk_css.cache_clear()
+    cyberpunk_theme.get_svg_base64.cache_clear()
+
+
+def rerun_ms(repeats, cached):
+    """Tempo médio de uma reexecução da aplicação sem nenhuma interação."""
+    app = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+    app.run()
+    timings = []
+    for _ in range(repeats):
+        if not cached:
+            clear_resources()
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    components = [
+        ("serviços", resources.build_services, resources.get_services),
+        ("CSS do tema", cyberpunk_theme.compile_cyberpunk_css.__wrapped__, cyberpunk_theme.compile_cyberpunk_css),
+        ("logo base64", cyberpunk_theme.get_svg_base64.__wrapped__, cyberpunk_theme.get_svg_base64),
+    ]
+
+    print(f"{'componente':<22} {'antes (ms)':>11} {'depois (ms)':>12}")
+    for name, uncached, cached in components:
+        cached()
+        print(f"{name:<22} {mean_ms(uncached, args.repeats):>11.3f} {mean_ms(cached, args.repeats):>12.4f}")
+
+    raw_bytes = len(cyberpunk_theme.CYBERPUNK_CSS.encode("utf-8"))
+    compiled_bytes = len(cyberpunk_theme.compile_cyberpunk_css().encode("utf-8"))
+    print(f"{'CSS enviado (bytes)':<22} {raw_bytes:>11} {compiled_bytes:>12}")
+
+    before = rerun_ms(args.repeats, cached=False)
+    after = rerun_ms(args.repeats, cached=True)
+    print(f"{'reexecução completa':<22} {before:>11.1f} {after:>12.1f}  (mediana)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark da serialização dos resultados simbólicos.
+Compara o codec binário com o pickle (protocolo 5) e com o srepr em JSON (o
+formato anterior dos nós remotos), em tamanho (bruto e com zlib) e em tempo de
+codificação e decodificação, para resultados pequenos e grandes.
+
+Uso:
+    python benchmarks/bench_serialization.py [--repeats 50]
+"""
+from pathlib import Path
+import argparse
+import json
+import pickle
+import sys
+import time
+import zlib
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain.models import Expression
+from adapters.sympy_adapter import SymPyAdapter
+from use_cases import binary_codec, wire_codec
+
+
+# (descrição, expressão, variáveis, ordem; None para derivadas parciais)
+CASES = [
+    ("derivada simples", "x**2*sin(x)", ["x"], 1),
+    ("derivada de ordem 4", "sin(x)**5*exp(x**2)*log(x)", ["x"], 4),
+    ("derivada de ordem 8", "exp(sin(x))*atan(x)/(1 + x**2)", ["x"], 8),
+    ("derivadas parciais", "exp(x*y)*sin(x + y)*log(1 + x**2 + y**2)", ["x", "y"], None),
+]
+
+FORMATS = {
+    "pickle": (
+        lambda value: pickle.dumps(value, protocol=5),
+        pickle.loads
+    ),
+    "srepr/json": (
+        lambda value: json.dumps(wire_codec.encode_value(value)).encode("utf-8"),
+        lambda data: wire_codec.decode_value(json.loads(data))
+    ),
+    "binário": (binary_codec.encode, binary_codec.decode),
+}
+
+
+def build(expression: str, variables, order):
+    if order is None:
+        return SymPyAdapter.calculate_partial_derivatives(Expression(expression, variables))
+    return SymPyAdapter.calculate_derivative(Expression(expression, variables), variables[0], order)
+
+
+def mean_us(function, repeats):
+    """Tempo médio de uma chamada, em microssegundos."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'caso':<22} {'formato':<11} {'bytes':>8} {'zlib':>7} {'codif. (µs)':>12} {'decodif. (µs)':>14}")
+    for description, expression, variables, order in CASES:
+        value = build(expression, variables, order)
+        for name, (dumps, loads) in FORMATS.items():
+            data = dumps(value)
+            assert loads(data) == value, f"{name} não reconstrói {description}"
+            encode_time = mean_us(lambda: dumps(value), args.repeats)
+            decode_time = mean_us(lambda: loads(data), args.repeats)
+            print(
+                f"{description:<22} {name:<11} {len(data):>8} {len(zlib.compress(data, 6)):>7}"
+                f" {encode_time:>12.1f} {decode_time:>14.1f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Gera o snapshot pré-calculado dos resultados dos exemplos da aplicação.
+
+Executado na construção da imagem Docker; a aplicação carrega o snapshot
+nos caches ao iniciar.
+
+Exemplo:
+    python build_example_snapshot.py --output data/example_snapshot.bin
+"""
+import argparse
+import sys
+import time
+
+from use_cases.example_snapshot import SNAPSHOT_PATH, build_snapshot, write_snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pré-calcula os resultados dos exemplos e os grava em um snapshot comprimido."
+    )
+    parser.add_argument("--output", default=str(SNAPSHOT_PATH), help=f"Arquivo de saída (padrão: {SNAPSHOT_PATH})")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    snapshot = build_snapshot()
+    size = write_snapshot(snapshot, args.output)
+
+    print(
+        f"Snapshot gerado em {time.perf_counter() - start:.1f}s: "
+        f"{len(snapshot['results'])} resultados, {len(snapshot['figures'])} figuras, "
+        f"{size / 1024:.0f} KiB em {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
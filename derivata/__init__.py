@@ -0,0 +1,24 @@
+"""
+Derivata como biblioteca: derivadas, gradientes, Hessianas e pontos críticos
+sem a interface web.
+
+O pacote usa os mesmos serviços e o mesmo cache de resultados da aplicação, e
+não importa Streamlit, Plotly nem pandas.
+
+Exemplo:
+    >>> import derivata
+    >>> derivata.diff("x**3", "x", order=2).result
+    6*x
+    >>> derivata.gradient("x**2 + x*y").derivatives
+    {'x': 2*x + y, 'y': x}
+"""
+__all__ = ["diff", "gradient", "hessian", "critical_points", "cache_stats"]
+
+
+def __getattr__(name):
+    # O SymPy só é importado no primeiro uso da API: clientes leves (derivata.client)
+    # importam o pacote sem pagar o custo de inicialização
+    if name in __all__:
+        from derivata import api
+        return getattr(api, name)
+    raise AttributeError(f"module 'derivata' has no attribute {name!r}")
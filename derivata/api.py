@@ -0,0 +1,78 @@
+"""
+Funções da biblioteca Derivata sobre os serviços de derivadas.
+Os serviços são compartilhados pelo processo e gravam no mesmo cache de
+resultados da aplicação web.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+import sympy as sp
+from domain.models import DerivativeResult, PartialDerivativeResult, CriticalPoint, parse_expression
+from adapters.sympy_adapter import SymPyAdapter
+from use_cases.derivative_service import DerivativeService
+from use_cases.partial_derivative_service import PartialDerivativeService
+from use_cases.result_cache import shared_result_cache
+
+
+_sympy_adapter = SymPyAdapter()
+_derivative_service = DerivativeService(_sympy_adapter)
+_partial_derivative_service = PartialDerivativeService(_sympy_adapter)
+
+
+def diff(expression: str, variable: str = "x", order: int = 1) -> DerivativeResult:
+    """
+    Derivada de ordem `order` da expressão em relação a `variable`, com os passos.
+
+    Lança ValueError se a expressão não puder ser derivada.
+    """
+    if order < 1:
+        raise ValueError(f"A ordem da derivada deve ser positiva: {order}")
+    result = _derivative_service.calculate_derivative(str(expression), variable, order)
+    if result is None:
+        raise ValueError(f"Não foi possível derivar a expressão: {expression}")
+    return result
+
+
+def gradient(expression: str, variables: Optional[Sequence[str]] = None) -> PartialDerivativeResult:
+    """
+    Derivadas parciais da expressão em relação a cada variável, com os passos.
+
+    Sem `variables`, usa as variáveis livres da expressão em ordem alfabética.
+    """
+    variables = _resolve_variables(expression, variables)
+    result = _partial_derivative_service.calculate_partial_derivatives(str(expression), variables)
+    if result is None:
+        raise ValueError(f"Não foi possível calcular o gradiente da expressão: {expression}")
+    return result
+
+
+def hessian(expression: str, variables: Optional[Sequence[str]] = None) -> sp.Matrix:
+    """Matriz Hessiana da expressão, nas variáveis informadas ou nas variáveis livres."""
+    variables = _resolve_variables(expression, variables)
+    result = _partial_derivative_service.calculate_hessian(str(expression), variables)
+    if result is None:
+        raise ValueError(f"Não foi possível calcular a Hessiana da expressão: {expression}")
+    return result
+
+
+def critical_points(expression: str, variables: Optional[Sequence[str]] = None) -> List[CriticalPoint]:
+    """Pontos críticos da expressão, classificados pela Hessiana quando possível."""
+    variables = _resolve_variables(expression, variables)
+    result = _partial_derivative_service.find_critical_points(str(expression), variables)
+    if result is None:
+        raise ValueError(f"Não foi possível encontrar os pontos críticos da expressão: {expression}")
+    return result
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Estatísticas do cache de resultados compartilhado."""
+    return shared_result_cache().stats()
+
+
+def _resolve_variables(expression: str, variables: Optional[Sequence[str]]) -> List[str]:
+    """Variáveis informadas ou, na falta delas, as variáveis livres da expressão."""
+    if variables:
+        return list(variables)
+    try:
+        expr = parse_expression(str(expression))
+    except Exception as e:
+        raise ValueError(f"Expressão inválida: {expression}") from e
+    return sorted(str(symbol) for symbol in expr.free_symbols)
@@ -0,0 +1,145 @@
+"""
+Processamento em lote de derivadas com um pool de processos.
+As entradas são lidas de CSV ou JSONL sob demanda e os resultados são emitidos
+à medida que ficam prontos, com um número limitado de blocos em andamento, de
+modo que a memória usada não depende do tamanho do arquivo.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+import csv
+import json
+import os
+import sys
+from derivata.dispatch import handle_request, parse_request_line
+
+
+# Itens enviados a um processo por vez
+DEFAULT_CHUNK_SIZE = 16
+
+# Blocos em andamento por processo do pool
+PENDING_CHUNKS_PER_WORKER = 2
+
+# Tempo máximo padrão de cálculo de um item (segundos)
+DEFAULT_ITEM_TIMEOUT = 30.0
+
+# Campos lidos de cada linha da entrada
+INPUT_FIELDS = ("id", "expression", "variable", "order")
+
+
+def detect_format(path: str) -> str:
+    """Formato da entrada ('csv' ou 'jsonl') a partir da extensão do arquivo."""
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def read_items(stream: IO[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lê os itens da entrada, um por linha, sem carregar o arquivo inteiro.
+
+    Linhas JSON inválidas viram itens com `parse_error`, para que uma linha
+    ruim não interrompa o lote.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield {field: row[field] for field in INPUT_FIELDS if row.get(field) not in (None, "")}
+        return
+
+    for line in stream:
+        item = parse_request_line(line)
+        if item is not None:
+            yield item
+
+
+def process_chunk(
+    chunk: List[Tuple[int, Dict[str, Any]]],
+    include_steps: bool,
+    timeout: Optional[float]
+) -> List[Dict[str, Any]]:
+    """Processa um bloco de itens (índice, item) em um processo do pool."""
+    results = []
+    for index, item in chunk:
+        record = handle_request(item, include_steps, timeout)
+        record["index"] = index
+        results.append(record)
+    return results
+
+
+def _init_worker() -> None:
+    """Os serviços registram erros com print; no pool, eles vão para stderr e não para a saída JSONL."""
+    sys.stdout = sys.stderr
+
+
+def run_batch(
+    items: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    include_steps: bool = False,
+    timeout: Optional[float] = DEFAULT_ITEM_TIMEOUT,
+    ordered: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Distribui os itens entre processos e gera os registros de saída.
+
+    Cada registro traz o `index` do item na entrada. Com `ordered`, os registros
+    saem na ordem da entrada; sem ele, saem assim que ficam prontos. Em ambos os
+    casos, no máximo `workers * PENDING_CHUNKS_PER_WORKER` blocos ficam em
+    andamento.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * PENDING_CHUNKS_PER_WORKER
+    chunks = _chunked(enumerate(items), chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return None
+            return executor.submit(process_chunk, chunk, include_steps, timeout)
+
+        if ordered:
+            pending = deque()
+            while True:
+                while len(pending) < max_pending:
+                    future = submit_next()
+                    if future is None:
+                        break
+                    pending.append(future)
+                if not pending:
+                    return
+                yield from pending.popleft().result()
+        else:
+            pending = set()
+            while True:
+                while len(pending) < max_pending:
+                    future = submit_next()
+                    if future is None:
+                        break
+                    pending.add(future)
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], stream: IO[str]) -> Dict[str, int]:
+    """Grava os registros como JSONL à medida que chegam; retorna a contagem de itens e erros."""
+    counts = {"items": 0, "errors": 0}
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        counts["items"] += 1
+        if record.get("error"):
+            counts["errors"] += 1
+    stream.flush()
+    return counts
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """Agrupa o iterável em listas de até `size` elementos, sob demanda."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
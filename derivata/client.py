@@ -0,0 +1,119 @@
+"""
+Cliente do daemon de derivadas.
+Não importa o SymPy: encaminha as requisições ao daemon pelo socket Unix e o
+inicia sob demanda, de modo que chamadas repetidas da linha de comando levam
+poucos milissegundos.
+"""
+from pathlib import Path
+from typing import Any, Dict, Optional
+import os
+import socket
+import subprocess
+import sys
+import time
+from derivata.daemon import DEFAULT_IDLE_TIMEOUT, default_socket_path
+from derivata.framing import recv_message, send_message, FrameError
+
+
+# Tempo máximo de espera pelo daemon recém-iniciado (segundos)
+DEFAULT_START_TIMEOUT = 30.0
+
+# Raiz do projeto, de onde o daemon é iniciado
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+class DaemonUnavailable(Exception):
+    """O daemon não está em execução e não pôde ser iniciado."""
+
+
+class DaemonClient:
+    """Conexão com o daemon; a mesma conexão atende várias requisições."""
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        autostart: bool = True,
+        start_timeout: float = DEFAULT_START_TIMEOUT,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    ):
+        self.socket_path = socket_path or default_socket_path()
+        self.autostart = autostart
+        self.start_timeout = start_timeout
+        self.idle_timeout = idle_timeout
+        self._sock: Optional[socket.socket] = None
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Envia uma requisição e aguarda a resposta."""
+        sock = self._connection()
+        try:
+            send_message(sock, message)
+            response = recv_message(sock)
+        except (OSError, FrameError):
+            self.close()
+            raise
+        if response is None:
+            self.close()
+            raise DaemonUnavailable("O daemon encerrou a conexão")
+        return response
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connection(self) -> socket.socket:
+        if self._sock is None:
+            self._sock = self._connect()
+        return self._sock
+
+    def _connect(self) -> socket.socket:
+        sock = _try_connect(self.socket_path)
+        if sock is not None:
+            return sock
+        if not self.autostart:
+            raise DaemonUnavailable(f"Nenhum daemon em {self.socket_path}")
+
+        process = self._start_daemon()
+        deadline = time.monotonic() + self.start_timeout
+        while time.monotonic() < deadline:
+            sock = _try_connect(self.socket_path)
+            if sock is not None:
+                return sock
+            if process.poll() not in (None, 0):
+                break
+            time.sleep(0.02)
+        raise DaemonUnavailable(f"Não foi possível iniciar o daemon em {self.socket_path}")
+
+    def _start_daemon(self) -> subprocess.Popen:
+        """Inicia o daemon em uma sessão própria, desligado do terminal do cliente."""
+        return subprocess.Popen(
+            [
+                sys.executable, "-m", "derivata.daemon",
+                "--socket", self.socket_path,
+                "--idle-timeout", str(self.idle_timeout)
+            ],
+            cwd=PROJECT_ROOT,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True
+        )
+
+
+def _try_connect(socket_path: str) -> Optional[socket.socket]:
+    if not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
@@ -0,0 +1,165 @@
+"""
+Daemon local que atende as operações de derivadas por um socket Unix.
+O processo fica vivo entre as chamadas da linha de comando, com o SymPy já
+importado e os caches aquecidos e compartilhados por todos os clientes. O
+protocolo é o de derivata.framing: uma mensagem JSON por requisição e por
+resposta, várias por conexão.
+
+Uso:
+    python -m derivata.daemon [--socket CAMINHO] [--idle-timeout 900]
+"""
+from typing import Any, Dict
+import argparse
+import fcntl
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from derivata.dispatch import handle_request
+from derivata.framing import FrameError, recv_message, send_message
+
+
+# Encerrar o daemon após este tempo sem requisições (segundos)
+DEFAULT_IDLE_TIMEOUT = 900.0
+
+
+def default_socket_path() -> str:
+    """Caminho do socket: DERIVATA_SOCKET, ou um arquivo por usuário no diretório de runtime."""
+    if os.environ.get("DERIVATA_SOCKET"):
+        return os.environ["DERIVATA_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"derivata-{os.getuid()}.sock")
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Atende as mensagens de uma conexão até o cliente encerrá-la."""
+
+    def handle(self):
+        server: DerivativeDaemon = self.server
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (FrameError, OSError):
+                return
+            if request is None:
+                return
+            server.touch()
+            try:
+                send_message(self.request, server.respond(request))
+            except (FrameError, OSError):
+                return
+
+
+class DerivativeDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Servidor de derivadas em um socket Unix, com uma thread por conexão.
+
+    Todas as conexões usam os mesmos serviços e, portanto, os mesmos caches de
+    expressões e de resultados. Além das operações de derivata.dispatch, aceita
+    `ping`, `stats` e `shutdown`.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.started_at = time.time()
+        self.requests = 0
+        self._last_activity = time.monotonic()
+        self._lock = threading.Lock()
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def touch(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self._last_activity = time.monotonic()
+
+    def respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Resposta a uma mensagem: comandos de controle ou operações de derivadas."""
+        op = request.get("op")
+        if op == "ping":
+            return {"id": request.get("id"), "pong": True, "pid": os.getpid(), "error": None}
+        if op == "stats":
+            import derivata
+            return {
+                "id": request.get("id"),
+                "pid": os.getpid(),
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "requests": self.requests,
+                "result_cache": derivata.cache_stats(),
+                "error": None
+            }
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"id": request.get("id"), "stopping": True, "error": None}
+        return handle_request(request)
+
+    def idle_for(self) -> float:
+        with self._lock:
+            return time.monotonic() - self._last_activity
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def serve(socket_path: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> int:
+    """Inicia o daemon e atende até `shutdown` ou até ficar ocioso por `idle_timeout` segundos."""
+    # O lock é mantido enquanto o daemon vive: clientes que o iniciam ao mesmo tempo
+    # disputam o lock, e só um deles cria o socket
+    lock_file = open(socket_path + ".lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        print(f"Já há um daemon em {socket_path}", file=sys.stderr)
+        return 0
+    if os.path.exists(socket_path):
+        # Socket de um daemon que terminou sem limpar
+        os.unlink(socket_path)
+
+    # Importar o SymPy e os serviços antes de aceitar conexões
+    import derivata.api  # noqa: F401
+
+    server = DerivativeDaemon(socket_path, idle_timeout)
+
+    def watch_idle():
+        while True:
+            time.sleep(min(idle_timeout, 5.0))
+            if server.idle_for() >= idle_timeout:
+                server.shutdown()
+                return
+
+    if idle_timeout:
+        threading.Thread(target=watch_idle, name="derivata-idle", daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        lock_file.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daemon local de derivadas em um socket Unix.")
+    parser.add_argument("--socket", default=None, help="Caminho do socket (padrão: DERIVATA_SOCKET ou diretório de runtime)")
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help=f"Encerra após este tempo ocioso em segundos, 0 desativa (padrão: {DEFAULT_IDLE_TIMEOUT:g})"
+    )
+    args = parser.parse_args(argv)
+    # Mensagens de erro dos serviços vão para o log do daemon, não para os clientes
+    sys.stdout = sys.stderr
+    return serve(args.socket or default_socket_path(), args.idle_timeout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
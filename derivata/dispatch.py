@@ -0,0 +1,219 @@
+"""
+Despacho de requisições JSON para a biblioteca Derivata.
+Cada requisição é um dicionário com a operação (`op`) e seus parâmetros; a
+resposta é um dicionário serializável em JSON com o resultado ou o erro. É o
+formato comum ao modo em lote e ao modo pipe do derivative_calculator.
+"""
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+import json
+import signal
+import threading
+import time
+
+
+# Campos da requisição repetidos na resposta
+ECHO_FIELDS = ("id", "op", "expression", "variable", "order", "variables", "kind")
+
+# Tipos de figura aceitos pela operação `figure`
+FIGURE_KINDS = ("surface_3d", "gradient", "derivatives")
+
+
+class ItemTimeout(BaseException):
+    """
+    Tempo limite de uma requisição esgotado.
+
+    Deriva de BaseException para atravessar os `except Exception` dos serviços,
+    que de outra forma guardariam um resultado vazio no cache.
+    """
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]):
+    """Interrompe o bloco com ItemTimeout após `seconds` (somente na thread principal, com SIGALRM)."""
+    if (
+        not seconds
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise ItemTimeout()
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _diff(request: Dict[str, Any], include_steps: bool) -> Dict[str, Any]:
+    import derivata
+
+    variable = str(request.get("variable", "x"))
+    order = int(request.get("order", 1))
+    result = derivata.diff(request["expression"], variable, order)
+    response = {"variable": variable, "order": order, "derivative": str(result.result), "latex": result.latex}
+    if include_steps:
+        response["steps"] = list(result.steps)
+    return response
+
+
+def _gradient(request: Dict[str, Any], include_steps: bool) -> Dict[str, Any]:
+    import derivata
+    import sympy as sp
+
+    result = derivata.gradient(request["expression"], request.get("variables"))
+    response = {
+        "derivatives": {var: str(expr) for var, expr in result.derivatives.items()},
+        "latex": {var: sp.latex(expr) for var, expr in result.derivatives.items()}
+    }
+    if include_steps:
+        response["steps"] = {var: list(steps) for var, steps in result.steps.items()}
+    return response
+
+
+def _hessian(request: Dict[str, Any], include_steps: bool) -> Dict[str, Any]:
+    import derivata
+    import sympy as sp
+
+    matrix = derivata.hessian(request["expression"], request.get("variables"))
+    return {
+        "hessian": [[str(matrix[i, j]) for j in range(matrix.cols)] for i in range(matrix.rows)],
+        "latex": sp.latex(matrix)
+    }
+
+
+def _critical_points(request: Dict[str, Any], include_steps: bool) -> Dict[str, Any]:
+    import derivata
+
+    points = derivata.critical_points(request["expression"], request.get("variables"))
+    return {
+        "critical_points": [
+            {
+                "coordinates": {var: str(value) for var, value in point.coordinates.items()},
+                "classification": point.classification
+            }
+            for point in points
+        ]
+    }
+
+
+@lru_cache(maxsize=None)
+def _visualization_service():
+    """Serviço de visualização do processo, criado no primeiro pedido de figura (importa o Plotly)."""
+    from adapters.sympy_adapter import SymPyAdapter
+    from adapters.plotly_adapter import PlotlyAdapter
+    from use_cases.visualization_service import VisualizationService
+
+    return VisualizationService(PlotlyAdapter(), SymPyAdapter())
+
+
+def _figure(request: Dict[str, Any], include_steps: bool) -> Dict[str, Any]:
+    import derivata
+
+    kind = request.get("kind", "surface_3d")
+    if kind not in FIGURE_KINDS:
+        raise ValueError(f"Tipo de figura desconhecido: {kind} (use {', '.join(FIGURE_KINDS)})")
+    service = _visualization_service()
+    expression = request["expression"]
+    domain = request.get("domain")
+    options = {"domain": tuple(float(limit) for limit in domain)} if domain else {}
+
+    if kind == "derivatives":
+        variable = str(request.get("variable", "x"))
+        max_order = int(request.get("order", 1))
+        derivatives = {
+            order: derivata.diff(expression, variable, order).result for order in range(1, max_order + 1)
+        }
+        fig, error = service.create_derivative_plot(expression, variable, derivatives, **options)
+    else:
+        variables = list(derivata.gradient(expression, request.get("variables")).derivatives)
+        if len(variables) != 2:
+            raise ValueError("As figuras de superfície e de gradiente exigem exatamente duas variáveis")
+        create = service.create_3d_visualization if kind == "surface_3d" else service.create_gradient_visualization
+        fig, error = create(expression, variables, **options)
+
+    if fig is None:
+        raise ValueError(error or "Não foi possível criar a figura")
+    response = {"figure": json.loads(fig.to_json())}
+    if error:
+        response["warning"] = error
+    return response
+
+
+# Operações aceitas no campo `op`
+OPERATIONS: Dict[str, Callable[[Dict[str, Any], bool], Dict[str, Any]]] = {
+    "diff": _diff,
+    "gradient": _gradient,
+    "hessian": _hessian,
+    "critical_points": _critical_points,
+    "figure": _figure
+}
+
+
+def handle_request(
+    request: Dict[str, Any],
+    include_steps: bool = False,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Executa uma requisição e retorna a resposta; erros nunca são lançados.
+
+    A resposta repete os campos de identificação da requisição e traz `error`
+    (None em caso de sucesso) e `elapsed_ms`. Os passos são incluídos com
+    `include_steps` ou com `"steps": true` na requisição.
+    """
+    response = {field: request[field] for field in ECHO_FIELDS if field in request}
+    start = time.perf_counter()
+    try:
+        if "parse_error" in request:
+            raise ValueError(request["parse_error"])
+        operation = OPERATIONS.get(request.get("op", "diff"))
+        if operation is None:
+            raise ValueError(f"Operação desconhecida: {request.get('op')} (use {', '.join(OPERATIONS)})")
+        if not str(request.get("expression", "")).strip():
+            raise ValueError("Campo 'expression' ausente")
+        request = dict(request, expression=str(request["expression"]))
+        if isinstance(request.get("variables"), str):
+            request["variables"] = request["variables"].replace(",", " ").split()
+
+        with time_limit(timeout):
+            response.update(operation(request, include_steps or bool(request.get("steps"))))
+        response["error"] = None
+    except ItemTimeout:
+        response["error"] = f"Tempo limite de {timeout:g}s excedido"
+    except (ValueError, TypeError, KeyError) as e:
+        response["error"] = str(e)
+    except Exception as e:
+        # Qualquer outra falha fica restrita a esta requisição: o lote e o pipe seguem
+        response["error"] = f"Erro inesperado ({type(e).__name__}): {str(e)}"
+    response["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return response
+
+
+def invalid_request(message: str) -> Dict[str, Any]:
+    """Requisição que resulta apenas no erro informado (por exemplo, uma linha JSON inválida)."""
+    return {"parse_error": message}
+
+
+def parse_request_line(line: str) -> Optional[Dict[str, Any]]:
+    """Converte uma linha JSON em requisição; uma string simples é tratada como expressão."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return invalid_request(f"JSON inválido: {str(e)}")
+    if isinstance(request, str):
+        return {"expression": request}
+    if not isinstance(request, dict):
+        return invalid_request("Cada linha deve ser um objeto JSON")
+    return request
+
@@ -0,0 +1,77 @@
+"""
+Protocolo de mensagens com prefixo de tamanho usado entre clientes e o daemon.
+Cada mensagem é um inteiro de 4 bytes (big-endian) com o tamanho do corpo,
+seguido do corpo em JSON compacto (UTF-8). Quadros brutos (send_frame) levam
+dados binários com o mesmo prefixo, por exemplo após uma mensagem JSON que os
+anuncia.
+"""
+from typing import Any, Dict, Optional, Sequence, Union
+import json
+import socket
+import struct
+
+
+# Cabeçalho de cada mensagem: tamanho do corpo, em bytes
+HEADER = struct.Struct(">I")
+
+# Maior corpo aceito (16 MiB); protege contra cabeçalhos corrompidos
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+class FrameError(Exception):
+    """Mensagem malformada ou conexão encerrada no meio de uma mensagem."""
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]) -> None:
+    """Envia uma mensagem JSON com o prefixo de tamanho."""
+    send_frame(sock, [json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")])
+
+
+def send_frame(sock: socket.socket, parts: Sequence[Union[bytes, bytearray, memoryview]]) -> None:
+    """Envia as partes como um único quadro bruto, sem concatená-las."""
+    size = sum(memoryview(part).nbytes for part in parts)
+    if size > MAX_FRAME_BYTES:
+        raise FrameError(f"Mensagem de {size} bytes excede o limite de {MAX_FRAME_BYTES}")
+    if len(parts) == 1:
+        sock.sendall(HEADER.pack(size) + parts[0])
+        return
+    sock.sendall(HEADER.pack(size))
+    for part in parts:
+        sock.sendall(part)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Recebe uma mensagem; retorna None se a conexão for encerrada entre mensagens."""
+    body = recv_frame(sock)
+    if body is None:
+        return None
+    try:
+        return json.loads(body.decode("utf-8"))
+    except ValueError as e:
+        raise FrameError(f"Corpo da mensagem não é JSON válido: {str(e)}") from e
+
+
+def recv_frame(sock: socket.socket) -> Optional[bytearray]:
+    """Recebe um quadro bruto; retorna None se a conexão for encerrada entre quadros."""
+    header = _recv_exactly(sock, HEADER.size, allow_eof=True)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_BYTES:
+        raise FrameError(f"Mensagem de {size} bytes excede o limite de {MAX_FRAME_BYTES}")
+    return _recv_exactly(sock, size)
+
+
+def _recv_exactly(sock: socket.socket, size: int, allow_eof: bool = False) -> Optional[bytearray]:
+    # Lê direto no buffer final: quadros grandes não são copiados pedaço a pedaço
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            if allow_eof and not received:
+                return None
+            raise FrameError("Conexão encerrada no meio de uma mensagem")
+        received += count
+    return buffer
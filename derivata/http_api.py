@@ -0,0 +1,341 @@
+"""
+API HTTP/JSON assíncrona sobre os serviços de derivadas.
+O laço de eventos só lê requisições e escreve respostas: o cálculo simbólico
+roda em um pool de processos, e requisições idênticas simultâneas compartilham
+um único cálculo. Roda como um serviço próprio (`derivata-api` no
+docker-compose), em outro contêiner criado da mesma imagem da aplicação.
+
+Rotas (POST com corpo JSON, ou GET com os mesmos campos na query string):
+    /derivative       expression, variable, order, steps
+    /partial          expression, variables, steps
+    /hessian          expression, variables
+    /critical-points  expression, variables
+    /figure           expression, kind (surface_3d, gradient, derivatives), variables, variable, order, domain
+                      (com kind=derivatives, order vai de 1 a MAX_DERIVATIVE_ORDER)
+    GET /health, GET /stats
+
+Por padrão o pool usa metade dos núcleos, pois divide a máquina com o pool da
+aplicação; DERIVATA_API_WORKERS ou `--workers` escolhem outro tamanho.
+
+Uso:
+    python -m derivata.http_api [--host 0.0.0.0] [--port 8000] [--workers N]
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from derivata.dispatch import handle_request
+from domain.examples import MAX_DERIVATIVE_ORDER
+
+
+# Porta padrão da API (a do Streamlit é 8501)
+DEFAULT_PORT = 8000
+
+# Tempo máximo de cálculo de uma requisição (segundos)
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+# Maior corpo de requisição aceito (1 MiB)
+MAX_BODY_BYTES = 1024 * 1024
+
+# Tempo máximo de espera pelos cabeçalhos de uma conexão aberta (segundos)
+HEADER_TIMEOUT = 15.0
+
+# Fração dos núcleos usada pelo pool da API quando o tamanho não é informado
+DEFAULT_WORKER_FRACTION = 0.5
+
+# Rota -> operação de derivata.dispatch
+ROUTES = {
+    "/derivative": "diff",
+    "/partial": "gradient",
+    "/hessian": "hessian",
+    "/critical-points": "critical_points",
+    "/figure": "figure"
+}
+
+# Campos da query string convertidos de texto
+_LIST_FIELDS = ("variables", "domain")
+
+
+class HttpError(Exception):
+    """Erro de protocolo respondido diretamente com o status informado."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RequestCoalescer:
+    """
+    Compartilha o cálculo entre requisições idênticas em andamento.
+
+    A primeira requisição de uma chave inicia o cálculo; as seguintes aguardam
+    o mesmo resultado. O cálculo é protegido de cancelamento, para que a
+    desconexão de um cliente não interrompa os demais.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self.computed = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._pending.get(key)
+        if future is None:
+            self.computed += 1
+            future = asyncio.ensure_future(compute())
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, int]:
+        return {"computed": self.computed, "coalesced": self.coalesced, "in_flight": len(self._pending)}
+
+
+def default_workers() -> int:
+    """Tamanho do pool: DERIVATA_API_WORKERS ou metade dos núcleos (ao menos um)."""
+    configured = os.environ.get("DERIVATA_API_WORKERS", "").strip()
+    if configured:
+        try:
+            return max(1, int(configured))
+        except ValueError:
+            raise ValueError(f"DERIVATA_API_WORKERS inválido: {configured!r} (use um inteiro)")
+    return max(1, int((os.cpu_count() or 1) * DEFAULT_WORKER_FRACTION))
+
+
+def _init_worker() -> None:
+    """Importa o SymPy e os serviços ao criar o processo, e não na primeira requisição."""
+    sys.stdout = sys.stderr
+    import derivata.api  # noqa: F401
+
+
+class DerivativeApi:
+    """Servidor HTTP/1.1 mínimo (com keep-alive) que despacha as rotas para o pool."""
+
+    def __init__(self, workers: Optional[int] = None, timeout: float = DEFAULT_REQUEST_TIMEOUT):
+        self.workers = workers or default_workers()
+        self.timeout = timeout
+        self.coalescer = RequestCoalescer()
+        self.started_at = time.time()
+        self.requests = 0
+        self.executor = self._new_executor()
+        self.pool_restarts = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # forkserver: os processos não herdam as threads do laço de eventos
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        return ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker)
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> None:
+        """Troca o pool quebrado (um processo morreu, por exemplo por falta de memória) por um novo."""
+        if self.executor is not broken:
+            return
+        self.executor = self._new_executor()
+        self.pool_restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        print("Pool de processos da API recriado após a morte de um processo", file=sys.stderr)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HEADER_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                keep_alive = await self._serve_one(head, reader, writer)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def _serve_one(self, head: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Atende uma requisição; retorna se a conexão deve continuar aberta."""
+        keep_alive = False
+        try:
+            method, target, version, headers = _parse_head(head)
+            keep_alive = (
+                headers.get("connection", "").lower() != "close"
+                if version == "HTTP/1.1"
+                else headers.get("connection", "").lower() == "keep-alive"
+            )
+            body = await self._read_body(headers, reader)
+            status, payload = await self.route(method, target, body)
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+            keep_alive = False
+        except Exception as e:
+            # Falha inesperada: o cliente recebe uma resposta, e não uma conexão derrubada
+            print(f"Erro interno da API: {type(e).__name__}: {str(e)}", file=sys.stderr)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Erro interno: {str(e) or type(e).__name__}"}
+            keep_alive = False
+        self.requests += 1
+
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        writer.write(
+            (
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            ).encode("latin-1") + data
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            return False
+        return keep_alive
+
+    async def _read_body(self, headers: Dict[str, str], reader: asyncio.StreamReader) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(HTTPStatus.LENGTH_REQUIRED, "Envie o corpo com Content-Length")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Corpo maior que {MAX_BODY_BYTES} bytes")
+        if not length:
+            return b""
+        try:
+            return await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Corpo incompleto")
+
+    async def route(self, method: str, target: str, body: bytes) -> Tuple[HTTPStatus, Dict[str, Any]]:
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        if path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        if path == "/stats":
+            return HTTPStatus.OK, {
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "requests": self.requests,
+                "workers": self.workers,
+                "pool_restarts": self.pool_restarts,
+                "coalescing": self.coalescer.stats()
+            }
+        op = ROUTES.get(path)
+        if op is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Rota desconhecida: {path} (use {', '.join(ROUTES)})")
+        if method not in ("GET", "POST"):
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET ou POST")
+
+        request = _query_params(url.query) if method == "GET" else _json_body(body)
+        request["op"] = op
+        if op == "figure" and request.get("kind") == "derivatives":
+            _check_order(request.get("order", 1))
+        response = await self.compute(request)
+        return (HTTPStatus.UNPROCESSABLE_ENTITY if response.get("error") else HTTPStatus.OK), response
+
+    async def compute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Calcula no pool, compartilhando o cálculo com requisições idênticas em andamento."""
+        request_id = request.pop("id", None)
+        key = json.dumps(request, sort_keys=True)
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            response = await self.coalescer.run(
+                key, lambda: loop.run_in_executor(executor, handle_request, request, False, self.timeout)
+            )
+        except BrokenProcessPool:
+            # Só as requisições em andamento no pool quebrado falham; as próximas usam um pool novo
+            self._replace_executor(executor)
+            raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, "Um processo de cálculo foi encerrado; tente novamente")
+        # A resposta é compartilhada: cada cliente recebe uma cópia com o próprio id
+        return dict(response, id=request_id) if request_id is not None else response
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"API de derivadas em http://{host}:{port} com {self.workers} processo(s)", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_head(head: bytes) -> Tuple[str, str, str, Dict[str, str]]:
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Linha de requisição inválida")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method.upper(), target, version, headers
+
+
+def _json_body(body: bytes) -> Dict[str, Any]:
+    try:
+        request = json.loads(body.decode("utf-8")) if body else {}
+    except ValueError as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"JSON inválido: {str(e)}")
+    if not isinstance(request, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "O corpo deve ser um objeto JSON")
+    return request
+
+
+def _check_order(order: Any) -> None:
+    """A figura de derivadas calcula todas as ordens até `order`: fora do intervalo, a requisição é recusada."""
+    try:
+        value = int(order)
+    except (TypeError, ValueError):
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Ordem inválida: {order!r}")
+    if not 1 <= value <= MAX_DERIVATIVE_ORDER:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"A ordem deve estar entre 1 e {MAX_DERIVATIVE_ORDER}: {value}")
+
+
+def _query_params(query: str) -> Dict[str, Any]:
+    request: Dict[str, Any] = dict(parse_qsl(query))
+    for field in _LIST_FIELDS:
+        if field in request:
+            request[field] = [part for part in request[field].replace(",", " ").split() if part]
+    if "steps" in request:
+        request["steps"] = request["steps"].lower() in ("1", "true", "yes", "sim")
+    return request
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON de derivadas com um pool de processos.")
+    parser.add_argument("--host", default="0.0.0.0", help="Endereço de escuta (padrão: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Porta (padrão: {DEFAULT_PORT})")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processos de cálculo (padrão: DERIVATA_API_WORKERS ou metade dos núcleos)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_REQUEST_TIMEOUT,
+        help=f"Tempo máximo de cálculo por requisição em segundos, 0 desativa (padrão: {DEFAULT_REQUEST_TIMEOUT:g})"
+    )
+    args = parser.parse_args(argv)
+
+    api = DerivativeApi(args.workers, args.timeout or None)
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
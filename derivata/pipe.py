@@ -0,0 +1,84 @@
+"""
+Modo pipe: requisições JSON pela entrada padrão, respostas JSON pela saída padrão.
+O processo fica vivo entre as requisições, com os caches de expressões e de
+resultados aquecidos, para ser usado como coprocesso por outros serviços.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Any, Dict, IO, Optional
+import json
+import os
+import sys
+from derivata.dispatch import handle_request, parse_request_line
+
+
+# Requisições em andamento por processo do pool
+IN_FLIGHT_PER_WORKER = 4
+
+
+def _init_worker() -> None:
+    """Os serviços registram erros com print; no pool, eles vão para stderr e não para as respostas."""
+    sys.stdout = sys.stderr
+
+
+def serve_pipe(
+    source: IO[str],
+    target: IO[str],
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    timeout: Optional[float] = None,
+    include_steps: bool = False
+) -> Dict[str, int]:
+    """
+    Atende uma requisição por linha de `source` e escreve uma resposta por linha em `target`.
+
+    Com `workers=0`, as requisições são atendidas em sequência no próprio
+    processo. Caso contrário, vão para um pool de processos, e as respostas
+    saem assim que ficam prontas (identificadas pelo `id` da requisição e pelo
+    `index` da linha). A leitura da entrada para enquanto houver
+    `max_in_flight` requisições em andamento, o que propaga a contrapressão
+    para quem escreve no pipe. Retorna a contagem de requisições e erros.
+    """
+    counts = {"requests": 0, "errors": 0}
+    write_lock = Lock()
+
+    def respond(response: Dict[str, Any]) -> None:
+        with write_lock:
+            counts["requests"] += 1
+            if response.get("error"):
+                counts["errors"] += 1
+            target.write(json.dumps(response, ensure_ascii=False) + "\n")
+            target.flush()
+
+    if workers == 0:
+        for index, line in enumerate(iter(source.readline, "")):
+            request = parse_request_line(line)
+            if request is not None:
+                respond(dict(handle_request(request, include_steps, timeout), index=index))
+        return counts
+
+    workers = workers or os.cpu_count() or 1
+    slots = BoundedSemaphore(max_in_flight or workers * IN_FLIGHT_PER_WORKER)
+
+    def on_done(future: Future, index: int, request: Dict[str, Any]) -> None:
+        try:
+            response = future.result()
+        except Exception as e:
+            # Falha do próprio pool (por exemplo, um processo encerrado)
+            response = {field: request[field] for field in ("id", "op") if field in request}
+            response["error"] = f"Falha ao processar a requisição: {str(e)}"
+        try:
+            respond(dict(response, index=index))
+        finally:
+            slots.release()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        # readline em vez de iterar o arquivo: não lê adiante, então cada linha é atendida assim que chega
+        for index, line in enumerate(iter(source.readline, "")):
+            request = parse_request_line(line)
+            if request is None:
+                continue
+            slots.acquire()
+            future = executor.submit(handle_request, request, include_steps, timeout)
+            future.add_done_callback(lambda f, index=index, request=request: on_done(f, index, request))
+    return counts
@@ -0,0 +1,219 @@
+"""
+Nó de cálculo remoto para o RemoteBackend.
+Atende por TCP as tarefas de use_cases.compute_tasks, com o protocolo de
+derivata.framing: cada mensagem traz o nome da tarefa, os argumentos, a
+prioridade e a sessão de origem. Com `"encoding": "binary"`, a resposta JSON é
+seguida de um quadro bruto com o resultado no formato de
+use_cases.binary_codec; sem ele, o resultado vai no próprio JSON, codificado por
+use_cases.wire_codec. O nó não guarda estado de sessão: vários nós podem
+atender as mesmas instâncias da interface, e cada um tem o seu cache.
+
+Uso:
+    python -m derivata.worker [--host 127.0.0.1] [--port 8765] [--workers N]
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import argparse
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from derivata.framing import FrameError, recv_message, send_frame, send_message
+
+
+# Porta padrão dos nós de cálculo
+DEFAULT_PORT = 8765
+
+# Tempo máximo de espera por um nó local recém-iniciado (segundos)
+LAUNCH_TIMEOUT = 60.0
+
+# Raiz do projeto, de onde os nós locais são iniciados
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+class _TaskHandler(socketserver.BaseRequestHandler):
+    """Atende as tarefas de uma conexão até o cliente encerrá-la."""
+
+    def handle(self):
+        server: ComputeWorker = self.server
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (FrameError, OSError):
+                return
+            if request is None:
+                return
+            response, payload = server.respond(request)
+            try:
+                send_message(self.request, response)
+                if payload is not None:
+                    send_frame(self.request, payload)
+            except (FrameError, OSError):
+                return
+
+
+class ComputeWorker(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Servidor de tarefas de cálculo, com uma thread por conexão.
+
+    As tarefas rodam no backend local do nó: na thread da conexão
+    (`workers=0`) ou no pool de processos do ComputeScheduler, que reparte os
+    processos entre as sessões de origem. Aceita também `ping` e `stats`.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, workers: Optional[int] = None):
+        from use_cases.compute_backend import InlineBackend, ProcessPoolBackend
+        from use_cases.compute_scheduler import ComputeScheduler
+
+        self.backend = InlineBackend() if workers == 0 else ProcessPoolBackend(ComputeScheduler(workers))
+        self.started_at = time.time()
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        super().__init__(address, _TaskHandler)
+
+    def respond(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[List[Any]]]:
+        """
+        Resposta a uma mensagem: comandos de controle ou o resultado da tarefa.
+
+        Retorna a resposta JSON e, se o cliente pediu o formato binário, as
+        partes do quadro bruto com o resultado.
+        """
+        from use_cases.compute_scheduler import ANONYMOUS_SESSION, LIGHT, session_scope
+        from use_cases import binary_codec
+        from use_cases.wire_codec import encode_value
+
+        response: Dict[str, Any] = {"id": request.get("id")}
+        if request.get("op") == "ping":
+            return dict(response, pong=True, pid=os.getpid(), error=None), None
+        if request.get("op") == "stats":
+            return dict(
+                response,
+                pid=os.getpid(),
+                uptime_s=round(time.time() - self.started_at, 1),
+                requests=self.requests,
+                failures=self.failures,
+                compute=self.backend.stats(),
+                error=None
+            ), None
+
+        with self._lock:
+            self.requests += 1
+        try:
+            args = request.get("args", [])
+            if not isinstance(args, list):
+                raise ValueError("O campo 'args' deve ser uma lista")
+            with session_scope(str(request.get("session") or ANONYMOUS_SESSION)):
+                value = self.backend.run(str(request.get("task")), *args, priority=int(request.get("priority", LIGHT)))
+            if request.get("encoding") == "binary":
+                try:
+                    return dict(response, encoding="binary", error=None), binary_codec.encode_parts(value)
+                except binary_codec.CodecError:
+                    # Valor fora do formato binário: segue no JSON, que o cliente também aceita
+                    pass
+            response.update(result=encode_value(value), error=None)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            response.update(result=None, error=str(e) or type(e).__name__)
+        return response, None
+
+    def server_close(self):
+        super().server_close()
+        self.backend.close()
+
+
+def serve(host: str, port: int, workers: Optional[int] = None) -> int:
+    """Atende até ser interrompido; anuncia `READY host:porta` na saída padrão ao começar."""
+    # Importar o SymPy e as tarefas antes de aceitar conexões
+    import use_cases.compute_tasks  # noqa: F401
+
+    server = ComputeWorker((host, port), workers)
+    bound_host, bound_port = server.server_address[:2]
+    print(f"READY {bound_host}:{bound_port}", flush=True)
+    # Mensagens de erro dos serviços vão para o log do nó
+    sys.stdout = sys.stderr
+    # SIGTERM (launch_local_workers, orquestradores) encerra o pool de processos junto
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+@contextmanager
+def launch_local_workers(count: int = 2, workers: int = 0, host: str = "127.0.0.1") -> Iterator[List[str]]:
+    """
+    Inicia `count` nós de cálculo locais em portas livres e os encerra na saída do bloco.
+
+    Produz os endereços (host:porta) para o RemoteBackend. Com `workers=0`,
+    cada nó calcula nas threads das conexões, sem pool de processos próprio.
+    """
+    processes: List[subprocess.Popen] = []
+    try:
+        for _ in range(count):
+            processes.append(
+                subprocess.Popen(
+                    [
+                        sys.executable, "-m", "derivata.worker",
+                        "--host", host, "--port", "0", "--workers", str(workers)
+                    ],
+                    cwd=PROJECT_ROOT,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    text=True
+                )
+            )
+        addresses = [_wait_ready(process) for process in processes]
+        yield addresses
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            if process.stdout is not None:
+                process.stdout.close()
+
+
+def _wait_ready(process: subprocess.Popen) -> str:
+    """Lê o anúncio `READY host:porta` do nó recém-iniciado."""
+    result: List[str] = []
+    reader = threading.Thread(target=lambda: result.append(process.stdout.readline()), daemon=True)
+    reader.start()
+    reader.join(LAUNCH_TIMEOUT)
+    line = result[0].strip() if result else ""
+    if not line.startswith("READY "):
+        raise RuntimeError(f"O nó de cálculo local não iniciou (código {process.poll()})")
+    return line.split(" ", 1)[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nó de cálculo remoto das derivadas (TCP).")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Porta, 0 escolhe uma livre (padrão: {DEFAULT_PORT})")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processos de cálculo; 0 calcula nas threads das conexões (padrão: núcleos)"
+    )
+    args = parser.parse_args(argv)
+    return serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Cliente de linha de comando do daemon de derivadas.
+Encaminha a requisição ao daemon local (iniciado sob demanda) e imprime a
+resposta em JSON; como não importa o SymPy, cada chamada leva milissegundos.
+
+Exemplos:
+    python derivata_client.py diff "x**3 + sin(x)" --order 2
+    python derivata_client.py gradient "x**2 + x*y" --variables x,y
+    python derivata_client.py stats
+    python derivata_client.py stop
+"""
+import argparse
+import json
+import sys
+
+from derivata.client import DaemonClient, DaemonUnavailable
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula derivadas pelo daemon local, iniciando-o se necessário.")
+    parser.add_argument("op", choices=["diff", "gradient", "hessian", "critical_points", "ping", "stats", "stop"])
+    parser.add_argument("expression", nargs="?", help="Expressão, ex.: x**2 + 3*x + 1")
+    parser.add_argument("--variable", default="x", help="Variável de diferenciação (padrão: x)")
+    parser.add_argument("--order", type=int, default=1, help="Ordem da derivada (padrão: 1)")
+    parser.add_argument("--variables", default=None, help="Variáveis separadas por vírgula (padrão: variáveis livres)")
+    parser.add_argument("--steps", action="store_true", help="Inclui os passos da derivação")
+    parser.add_argument("--socket", default=None, help="Caminho do socket do daemon")
+    parser.add_argument("--no-start", action="store_true", help="Não inicia o daemon se ele não estiver em execução")
+    args = parser.parse_args(argv)
+
+    if args.op in ("ping", "stats", "stop"):
+        message = {"op": "shutdown" if args.op == "stop" else args.op}
+    else:
+        if not args.expression:
+            parser.error(f"a operação {args.op} exige uma expressão")
+        message = {"op": args.op, "expression": args.expression, "steps": args.steps}
+        if args.op == "diff":
+            message.update(variable=args.variable, order=args.order)
+        elif args.variables:
+            message["variables"] = args.variables
+
+    # Parar um daemon que não está em execução não deve iniciá-lo
+    autostart = not args.no_start and args.op != "stop"
+    try:
+        with DaemonClient(args.socket, autostart=autostart) as client:
+            response = client.request(message)
+    except DaemonUnavailable as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    print(json.dumps(response, ensure_ascii=False))
+    return 1 if response.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,17 @@
-import sympy as sp
+import argparse
+import sys
+import time
+
+import derivata
 from derivative_steps import show_derivative_steps
 
 def calculate_derivative(expression, variable, order=1):
     """Calculate the derivative of an expression with respect to a variable."""
-    x, y, z = sp.symbols('x y z')
-    expr = sp.sympify(expression)
-    derivative = sp.diff(expr, variable, order)
-    return derivative
+    return derivata.diff(expression, variable, order).result
 
 def calculate_partial_derivative(expression, variable, order=1):
     """Calculate the partial derivative of an expression with respect to a variable."""
-    x, y, z = sp.symbols('x y z')
-    expr = sp.sympify(expression)
-    derivative = sp.diff(expr, variable, order)
-    return derivative
+    return derivata.diff(expression, variable, order).result
 
 def show_steps(expression, variable):
     """Show the steps of differentiation."""
@@ -90,5 +88,68 @@ def main():
         else:
             print("Escolha inválida. Por favor, tente novamente.")
 
+def batch_main(argv=None):
+    """Modos não interativos: lote (CSV/JSONL para JSONL) e pipe (JSON por linha na entrada e na saída padrão)."""
+    from derivata.batch import DEFAULT_CHUNK_SIZE, DEFAULT_ITEM_TIMEOUT, detect_format, read_items, run_batch, write_jsonl
+    from derivata.pipe import serve_pipe
+
+    parser = argparse.ArgumentParser(
+        description="Calcula derivadas sem o menu interativo. Cada requisição tem expression, variable (padrão: x), order (padrão: 1) e, opcionalmente, id."
+    )
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--batch", metavar="ENTRADA", help="Arquivo .csv ou .jsonl ('-' para a entrada padrão)")
+    mode.add_argument("--pipe", action="store_true", help="Lê uma requisição JSON por linha da entrada padrão e responde uma por linha na saída padrão (op: diff, gradient, hessian, critical_points)")
+    parser.add_argument("--output", default="-", help="Arquivo JSONL de saída do lote (padrão: saída padrão)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="Formato da entrada do lote (padrão: pela extensão)")
+    parser.add_argument("--workers", type=int, default=None, help="Processos do pool (padrão: núcleos; 0 no modo pipe atende no próprio processo)")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Requisições em andamento no modo pipe (padrão: 4 por processo)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_ITEM_TIMEOUT, help=f"Tempo máximo por item em segundos, 0 desativa (padrão: {DEFAULT_ITEM_TIMEOUT:g})")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"Itens do lote enviados a um processo por vez (padrão: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--steps", action="store_true", help="Inclui os passos da derivação")
+    parser.add_argument("--unordered", action="store_true", help="Emite os resultados do lote assim que ficam prontos, fora da ordem da entrada")
+    args = parser.parse_args(argv)
+
+    if args.pipe:
+        # As mensagens de erro dos serviços não podem se misturar às respostas
+        responses, sys.stdout = sys.stdout, sys.stderr
+        serve_pipe(
+            sys.stdin,
+            responses,
+            workers=args.workers,
+            max_in_flight=args.max_in_flight,
+            timeout=args.timeout or None,
+            include_steps=args.steps
+        )
+        return 0
+
+    fmt = args.format or detect_format(args.batch)
+    source = sys.stdin if args.batch == "-" else open(args.batch, newline="", encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    start = time.perf_counter()
+    try:
+        records = run_batch(
+            read_items(source, fmt),
+            workers=args.workers,
+            include_steps=args.steps,
+            timeout=args.timeout or None,
+            ordered=not args.unordered,
+            chunk_size=args.chunk_size
+        )
+        counts = write_jsonl(records, target)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    print(
+        f"{counts['items']} itens processados em {time.perf_counter() - start:.1f}s ({counts['errors']} com erro)",
+        file=sys.stderr
+    )
+    return 0
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(batch_main())
     main()
\ No newline at end of file
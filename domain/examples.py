@@ -0,0 +1,33 @@
+"""
+Exemplos de funções oferecidos em cada aba da aplicação.
+"""
+
+# Exemplos da aba de derivadas normais
+NORMAL_EXAMPLES = {
+    "Polinômio Simples": "x**2 + 3*x + 1",
+    "Função Trigonométrica": "sin(x) + cos(x)",
+    "Função Exponencial": "exp(x**2)",
+    "Função Logarítmica": "log(x**2 + 1)",
+    "Função Composta": "sin(exp(x))"
+}
+
+# Exemplos de funções multivariáveis da aba de derivadas parciais
+PARTIAL_EXAMPLES = {
+    "Função de Duas Variáveis": "x**2 + x*y + y**2",
+    "Função Exponencial Multivariável": "exp(x*y)",
+    "Função Trigonométrica Multivariável": "sin(x) + cos(y)",
+    "Função Composta Multivariável": "sin(x*y) + exp(x+y)"
+}
+
+# Exemplos da aba de derivadas de ordem superior
+HIGHER_ORDER_EXAMPLES = {
+    "Polinômio de Ordem 3": "x**3 + 2*x**2 + 3*x + 4",
+    "Função Trigonométrica": "sin(x)",
+    "Função Exponencial": "exp(x)"
+}
+
+# Variáveis usadas por padrão nos exemplos de derivadas parciais
+PARTIAL_EXAMPLE_VARIABLES = ["x", "y"]
+
+# Maior ordem de derivada oferecida pela aplicação
+MAX_DERIVATIVE_ORDER = 10
@@ -2,47 +2,209 @@
 Modelos de domínio para a aplicação Derivata.
 Contém as entidades principais e regras de negócio.
 """
-from dataclasses import dataclass
-from typing import List, Dict, Optional, Union, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache
+from threading import Lock
+from typing import Iterable, List, Dict, Mapping, Optional, TypeVar, Union, Tuple
+from weakref import WeakValueDictionary
+import sys
 import sympy as sp
 
 
-@dataclass(frozen=True)
+V = TypeVar("V")
+
+
+@lru_cache(maxsize=2048)
+def parse_expression(raw_expression: str) -> sp.Expr:
+    """Converte uma string em expressão SymPy, reaproveitando conversões anteriores."""
+    return sp.sympify(raw_expression)
+
+
+@lru_cache(maxsize=2048)
+def canonical_form(raw_expression: str) -> str:
+    """Forma canônica (srepr) da expressão, igual para strings equivalentes como 'x*y' e 'y*x'."""
+    try:
+        return sp.srepr(parse_expression(raw_expression))
+    except Exception:
+        return raw_expression.strip()
+
+
+def _intern_steps(steps: Iterable[str]) -> Tuple[str, ...]:
+    """Passos como tupla de strings internadas: as mesmas frases se repetem em milhares de resultados."""
+    return tuple(sys.intern(str(step)) for step in steps)
+
+
 class Expression:
-    """Representa uma expressão matemática."""
+    """
+    Representa uma expressão matemática.
+
+    Imutável e internada: construir a mesma expressão com as mesmas variáveis
+    devolve a instância já existente (enquanto ela estiver em uso), com a
+    forma SymPy e o hash já calculados. Duas expressões são iguais quando têm a
+    mesma forma canônica e as mesmas variáveis ('x*y' e 'y*x', por exemplo).
+    """
+    __slots__ = ("raw_expression", "variables", "_sympy", "_canonical", "_hash", "__weakref__")
+
+    _interned: "WeakValueDictionary[Tuple[str, Tuple[str, ...]], Expression]" = WeakValueDictionary()
+    _intern_lock = Lock()
+
     raw_expression: str
-    variables: List[str]
-    
+    variables: Tuple[str, ...]
+
+    def __new__(cls, raw_expression: str, variables: Iterable[str] = ()):
+        variables = tuple(str(var) for var in variables)
+        key = (raw_expression, variables)
+        instance = cls._interned.get(key)
+        if instance is not None:
+            return instance
+        instance = super().__new__(cls)
+        object.__setattr__(instance, "raw_expression", raw_expression)
+        object.__setattr__(instance, "variables", variables)
+        object.__setattr__(instance, "_sympy", None)
+        object.__setattr__(instance, "_canonical", None)
+        object.__setattr__(instance, "_hash", None)
+        with cls._intern_lock:
+            return cls._interned.setdefault(key, instance)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __reduce__(self):
+        # Na leitura, a instância passa de novo pelo internamento; os valores em cache não são serializados
+        return (Expression, (self.raw_expression, self.variables))
+
     @property
     def sympy_expr(self) -> sp.Expr:
-        """Converte a expressão para um objeto SymPy."""
-        return sp.sympify(self.raw_expression)
-    
+        """Converte a expressão para um objeto SymPy (uma vez por instância)."""
+        if self._sympy is None:
+            object.__setattr__(self, "_sympy", parse_expression(self.raw_expression))
+        return self._sympy
+
+    @property
+    def canonical(self) -> str:
+        """Forma canônica (srepr) da expressão, calculada uma vez por instância."""
+        if self._canonical is None:
+            object.__setattr__(self, "_canonical", canonical_form(self.raw_expression))
+        return self._canonical
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash((self.canonical, self.variables)))
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Expression):
+            return NotImplemented
+        return self.variables == other.variables and self.canonical == other.canonical
+
+    def __repr__(self) -> str:
+        return f"Expression(raw_expression={self.raw_expression!r}, variables={self.variables!r})"
+
     def __str__(self) -> str:
         return self.raw_expression
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DerivativeResult:
     """Resultado de uma operação de derivação."""
     original_expression: Expression
     variable: str
     order: int
     result: sp.Expr
-    steps: List[str]
+    steps: Tuple[str, ...]
+    # LaTeX do resultado, calculado no primeiro acesso (ou recebido já pronto do codec binário)
+    _latex: Optional[str] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "steps", _intern_steps(self.steps))
     
     @property
     def latex(self) -> str:
         """Retorna a representação LaTeX do resultado."""
-        return sp.latex(self.result)
+        if self._latex is None:
+            object.__setattr__(self, "_latex", sp.latex(self.result))
+        return self._latex
+
+
+def _sorted_pairs(mapping: Union[Mapping[str, V], Iterable[Tuple[str, V]]]) -> Tuple[Tuple[str, V], ...]:
+    """Pares (variável, valor) ordenados pelo nome da variável: a ordem de inserção não afeta igualdade nem hash."""
+    items = mapping.items() if isinstance(mapping, Mapping) else mapping
+    return tuple(sorted(((str(var), value) for var, value in items), key=lambda pair: pair[0]))
 
 
-@dataclass(frozen=True)
 class PartialDerivativeResult:
-    """Resultado de derivadas parciais para uma função multivariável."""
+    """
+    Resultado de derivadas parciais para uma função multivariável.
+
+    Imutável: as derivadas e os passos são guardados como tuplas de pares
+    ordenadas pela variável, e `derivatives` e `steps` são vistas em dicionário
+    na ordem das variáveis da expressão. O hash é calculado uma vez.
+    """
+    __slots__ = ("original_expression", "derivative_pairs", "step_pairs", "_hash")
+
     original_expression: Expression
-    derivatives: Dict[str, sp.Expr]
-    steps: Dict[str, List[str]]
+    derivative_pairs: Tuple[Tuple[str, sp.Expr], ...]
+    step_pairs: Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+    def __init__(
+        self,
+        original_expression: Expression,
+        derivatives: Union[Mapping[str, sp.Expr], Iterable[Tuple[str, sp.Expr]]],
+        steps: Union[Mapping[str, Iterable[str]], Iterable[Tuple[str, Iterable[str]]]]
+    ):
+        object.__setattr__(self, "original_expression", original_expression)
+        object.__setattr__(self, "derivative_pairs", _sorted_pairs(derivatives))
+        object.__setattr__(
+            self, "step_pairs", tuple((var, _intern_steps(var_steps)) for var, var_steps in _sorted_pairs(steps))
+        )
+        object.__setattr__(self, "_hash", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __reduce__(self):
+        # O hash em cache não é serializado: o hash de strings muda entre processos
+        return (PartialDerivativeResult, (self.original_expression, self.derivative_pairs, self.step_pairs))
+
+    @property
+    def derivatives(self) -> Dict[str, sp.Expr]:
+        """Derivadas parciais por variável, na ordem das variáveis da expressão."""
+        return _in_variable_order(self.derivative_pairs, self.original_expression.variables)
+
+    @property
+    def steps(self) -> Dict[str, Tuple[str, ...]]:
+        """Passos de cada derivada parcial, na ordem das variáveis da expressão."""
+        return _in_variable_order(self.step_pairs, self.original_expression.variables)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash((self.original_expression, self.derivative_pairs)))
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, PartialDerivativeResult):
+            return NotImplemented
+        return (
+            self.original_expression == other.original_expression
+            and self.derivative_pairs == other.derivative_pairs
+            and self.step_pairs == other.step_pairs
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"PartialDerivativeResult(original_expression={self.original_expression!r}, "
+            f"derivatives={self.derivatives!r})"
+        )
     
     @property
     def gradient(self) -> List[sp.Expr]:
@@ -51,24 +213,78 @@ class PartialDerivativeResult:
     
     def get_hessian(self) -> sp.Matrix:
         """Calcula a matriz Hessiana."""
-        variables = list(self.derivatives.keys())
-        n = len(variables)
-        hessian = sp.zeros(n, n)
-        
-        expr = self.original_expression.sympy_expr
-        for i, var_i in enumerate(variables):
-            for j, var_j in enumerate(variables):
-                hessian[i, j] = sp.diff(expr, var_i, var_j)
-                
-        return hessian
-
-
-@dataclass(frozen=True)
+        return hessian_matrix(self.original_expression.sympy_expr, list(self.derivatives.keys()))
+
+
 class CriticalPoint:
-    """Representa um ponto crítico de uma função multivariável."""
-    coordinates: Dict[str, sp.Expr]
-    classification: Optional[str] = None  # "minimum", "maximum", "saddle", or None if unknown
+    """
+    Representa um ponto crítico de uma função multivariável.
+
+    Imutável: as coordenadas são guardadas como tuplas de pares ordenadas pelo
+    nome da variável (as chaves de sp.solve, símbolos, viram strings), com
+    `coordinates` como vista em dicionário e o hash calculado uma vez.
+    """
+    __slots__ = ("coordinate_pairs", "classification", "_hash")
+
+    coordinate_pairs: Tuple[Tuple[str, sp.Expr], ...]
+    classification: Optional[str]  # "minimum", "maximum", "saddle", or None if unknown
+
+    def __init__(
+        self,
+        coordinates: Union[Mapping[str, sp.Expr], Iterable[Tuple[str, sp.Expr]]],
+        classification: Optional[str] = None
+    ):
+        object.__setattr__(self, "coordinate_pairs", _sorted_pairs(coordinates))
+        object.__setattr__(self, "classification", classification)
+        object.__setattr__(self, "_hash", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __reduce__(self):
+        return (CriticalPoint, (self.coordinate_pairs, self.classification))
+
+    @property
+    def coordinates(self) -> Dict[str, sp.Expr]:
+        """Coordenadas do ponto por variável."""
+        return dict(self.coordinate_pairs)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash((self.coordinate_pairs, self.classification)))
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, CriticalPoint):
+            return NotImplemented
+        return self.coordinate_pairs == other.coordinate_pairs and self.classification == other.classification
+
+    def __repr__(self) -> str:
+        return f"CriticalPoint(coordinates={self.coordinates!r}, classification={self.classification!r})"
     
     def __str__(self) -> str:
-        coords = ", ".join([f"{var}={val}" for var, val in self.coordinates.items()])
-        return f"({coords})"
\ No newline at end of file
+        coords = ", ".join([f"{var}={val}" for var, val in self.coordinate_pairs])
+        return f"({coords})"
+
+
+def _in_variable_order(pairs: Tuple[Tuple[str, V], ...], variables: Tuple[str, ...]) -> Dict[str, V]:
+    """Dicionário dos pares com as variáveis da expressão primeiro, na ordem dela."""
+    position = {var: index for index, var in enumerate(variables)}
+    return dict(sorted(pairs, key=lambda pair: position.get(pair[0], len(position))))
+
+
+def hessian_matrix(expr: sp.Expr, variables: List[str]) -> sp.Matrix:
+    """Monta a matriz das derivadas segundas de expr."""
+    n = len(variables)
+    hessian = sp.zeros(n, n)
+    
+    for i, var_i in enumerate(variables):
+        for j, var_j in enumerate(variables):
+            hessian[i, j] = sp.diff(expr, var_i, var_j)
+    
+    return hessian
@@ -0,0 +1,59 @@
+"""
+Exporta f e suas derivadas parciais amostradas em grades grandes para arquivos .npy.
+
+Exemplo:
+    python export_grid.py "sin(x*y) + exp(x+y)" --resolution 8000 --output saida/
+"""
+import argparse
+import sys
+import time
+
+from adapters.sympy_adapter import SymPyAdapter
+from adapters.plotly_adapter import PlotlyAdapter
+from adapters.grid_evaluator import GridEvaluator
+from use_cases.visualization_service import VisualizationService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Exporta f e suas derivadas parciais em grades para arquivos .npy mapeados em memória."
+    )
+    parser.add_argument("expression", help="Expressão de duas variáveis, ex.: x**2 + x*y + y**2")
+    parser.add_argument("--variables", default="x,y", help="Variáveis separadas por vírgula (padrão: x,y)")
+    parser.add_argument("--domain", nargs=2, type=float, default=(-3.0, 3.0), metavar=("MIN", "MAX"))
+    parser.add_argument("--resolution", type=int, default=1000, help="Pontos por eixo (padrão: 1000)")
+    parser.add_argument("--chunk-rows", type=int, default=256, help="Linhas avaliadas por bloco (padrão: 256)")
+    parser.add_argument("--workers", type=int, default=None, help="Threads de avaliação (padrão: núcleos)")
+    parser.add_argument("--backend", default="auto", choices=["auto", "numpy", "numexpr", "numba"])
+    parser.add_argument("--second-order", action="store_true", help="Inclui as derivadas parciais de segunda ordem")
+    parser.add_argument("--output", default="grid_export", help="Diretório de saída (padrão: grid_export)")
+    args = parser.parse_args(argv)
+
+    variables = [var.strip() for var in args.variables.split(",") if var.strip()]
+    evaluator = GridEvaluator(workers=args.workers, backend=args.backend)
+    service = VisualizationService(PlotlyAdapter(evaluator), SymPyAdapter())
+
+    start = time.perf_counter()
+    manifest, error = service.export_grid(
+        args.expression,
+        variables,
+        args.output,
+        domain=tuple(args.domain),
+        resolution=args.resolution,
+        chunk_rows=args.chunk_rows,
+        second_order=args.second_order
+    )
+    evaluator.shutdown()
+
+    if error:
+        print(error, file=sys.stderr)
+        return 1
+
+    print(f"Grade {args.resolution}x{args.resolution} exportada em {time.perf_counter() - start:.1f}s para {args.output}/")
+    for name, field in manifest["fields"].items():
+        print(f"  {field['file']}: {field['expression']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,9 @@
 import sympy as sp
+import derivata
 
 def calculate_partial_derivatives(expression, variables):
     """Calculate all partial derivatives for a multivariate function."""
-    x, y, z = sp.symbols('x y z')
-    expr = sp.sympify(expression)
-    
-    results = {}
-    for var in variables:
-        results[var] = sp.diff(expr, var)
-    
-    return results
+    return dict(derivata.gradient(expression, variables).derivatives)
 
 def show_partial_derivative_steps(expression, variable):
     """Show steps for calculating a partial derivative."""
@@ -0,0 +1,159 @@
+"""
+Integração das etapas em segundo plano com as reexecuções do Streamlit.
+Cada seção é preenchida assim que sua etapa termina, com progresso e cancelamento.
+"""
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional, Tuple
+import time
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from use_cases.background_jobs import JobGroup, BackgroundJob, DONE, FAILED, RUNNING, CANCELLED
+from presentation.session_store import SessionResultStore, widget_default
+
+
+# Intervalo entre as atualizações da aba enquanto há etapas em andamento (segundos)
+POLL_INTERVAL = 0.4
+
+# Espera desde a última alteração das entradas antes de calcular a pré-visualização ao vivo (segundos)
+LIVE_DEBOUNCE = 0.35
+
+_MISSING = object()
+
+
+def job_group(tab: str, inputs: Hashable, restart: bool = False, delay: float = 0.0) -> JobGroup:
+    """
+    Retorna o grupo de etapas da aba para as entradas atuais.
+
+    Um grupo de entradas anteriores (ou qualquer grupo, com `restart`) é
+    cancelado e substituído, para que cálculos obsoletos não ocupem o pool.
+    Com `delay`, as etapas do novo grupo só começam após o debounce.
+    """
+    state_key = f"_derivata_jobs_{tab}"
+    current = st.session_state.get(state_key)
+    if current is not None and current[0] == inputs and not restart:
+        return current[1]
+    if current is not None:
+        current[1].cancel()
+    group = JobGroup(delay=delay)
+    st.session_state[state_key] = (inputs, group)
+    return group
+
+
+def stage_result(
+    group: JobGroup,
+    name: str,
+    compute: Callable[..., Any],
+    *args: Any,
+    store: Optional[SessionResultStore] = None,
+    key: Optional[Hashable] = None,
+    cached: bool = False
+) -> Tuple[str, Any]:
+    """
+    Retorna (estado, valor) de uma etapa, submetendo-a ao pool se necessário.
+
+    Com `store` e `key`, o resultado concluído é guardado na sessão e servido
+    diretamente nas próximas execuções; None (falha do serviço) não é
+    guardado. Com `cached` (o resultado já está no
+    cache dos serviços, por exemplo por pré-cálculo), a etapa é executada na
+    própria execução, sem passar pelo pool. `compute` pode retornar um Future
+    (os métodos submit_* dos serviços): a etapa então não ocupa uma thread do
+    pool enquanto o cálculo espera no escalonador. Para etapas não concluídas,
+    o valor é o próprio job (para exibir o tempo decorrido).
+    """
+    if store is not None:
+        value = store.get(key, _MISSING)
+        if value is not _MISSING:
+            return DONE, value
+
+    if cached and name not in group.jobs:
+        value = compute(*args)
+        if isinstance(value, Future):
+            # Em cache, o Future já volta concluído
+            value = value.result()
+        if store is not None and value is not None:
+            store.put(key, value)
+        return DONE, value
+
+    job = group.ensure(name, compute, *args)
+    status = job.status
+    if status == DONE:
+        value = job.result()
+        if store is not None and value is not None:
+            store.put(key, value)
+        return DONE, value
+    if status == FAILED:
+        return FAILED, job.future.exception()
+    return status, job
+
+
+def live_toggle(tab: str) -> bool:
+    """Exibe a opção de pré-visualização ao vivo da aba e retorna se ela está ativa."""
+    return st.toggle(
+        "⚡ Pré-visualização ao vivo",
+        value=widget_default(f"{tab}_live", False),
+        key=f"{tab}_live",
+        help="Calcula a cada alteração das entradas, sem precisar clicar no botão de cálculo."
+    )
+
+
+def live_stage(
+    tab: str,
+    inputs: Hashable,
+    cached: bool,
+    compute: Callable[..., Any],
+    *args: Any,
+    store: Optional[SessionResultStore] = None,
+    key: Optional[Hashable] = None
+) -> Tuple[str, Any, JobGroup]:
+    """
+    Retorna (estado, valor, grupo) do cálculo da pré-visualização ao vivo.
+
+    Entradas novas cancelam o cálculo das entradas anteriores. Resultados que
+    já estão no cache dos serviços (`cached`) são servidos na própria execução;
+    os demais são calculados em segundo plano depois do debounce, de modo que
+    entradas intermediárias não chegam a ocupar o pool.
+    """
+    group = job_group(f"{tab}_live", inputs, delay=LIVE_DEBOUNCE)
+    status, value = stage_result(group, "preview", compute, *args, store=store, key=key, cached=cached)
+    return status, value, group
+
+
+def display_stage_placeholder(label: str, status: str, value: Any) -> None:
+    """Exibe o estado de uma etapa que ainda não tem resultado."""
+    if status == FAILED:
+        st.error(f"{label}: erro no cálculo ({value}).")
+    elif status == CANCELLED:
+        st.warning(f"{label}: cálculo cancelado.")
+    elif status == RUNNING and isinstance(value, BackgroundJob):
+        st.info(f"⏳ {label}: calculando... ({value.elapsed:.1f}s)")
+    else:
+        st.info(f"⏳ {label}: na fila...")
+
+
+def display_progress(group: JobGroup, cancel_key: str) -> None:
+    """Exibe o progresso das etapas e o botão de cancelamento enquanto houver etapas pendentes."""
+    finished, total = group.progress()
+    if not group.pending or total == 0:
+        return
+    col_progress, col_cancel = st.columns([4, 1])
+    with col_progress:
+        st.progress(finished / total, text=f"{finished} de {total} etapas concluídas")
+    with col_cancel:
+        if st.button("Cancelar", key=cancel_key):
+            group.cancel()
+            rerun_tab()
+
+
+def rerun_tab() -> None:
+    """Reexecuta apenas a aba (fragmento) ou, numa execução completa, o script inteiro."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+def poll_while_pending(group: JobGroup) -> None:
+    """Reexecuta a aba periodicamente até que todas as etapas terminem."""
+    if group.pending:
+        time.sleep(POLL_INTERVAL)
+        rerun_tab()
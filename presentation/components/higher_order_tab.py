@@ -1,34 +1,72 @@
 """
 Componente para a aba de derivadas de ordem superior.
 """
+from typing import Optional
 import streamlit as st
 import sympy as sp
 from domain.models import Expression
+from domain.examples import HIGHER_ORDER_EXAMPLES, MAX_DERIVATIVE_ORDER
+from adapters.futures import gather
 from use_cases.derivative_service import DerivativeService
-from presentation.styles.cyberpunk_theme import display_result, display_steps
+from use_cases.visualization_service import VisualizationService
+from use_cases.prefetcher import Prefetcher
+from presentation.styles.cyberpunk_theme import (
+    display_result,
+    display_steps,
+    display_derivative_plot,
+    display_order_exploration
+)
+from presentation.session_store import (
+    get_session_store,
+    submit_inputs,
+    submitted_inputs,
+    widget_default,
+    widget_index
+)
+from presentation.background_stages import live_toggle, live_stage, display_stage_placeholder, poll_while_pending
+from use_cases.background_jobs import DONE
 
 
-def render_higher_order_tab(derivative_service: DerivativeService):
+# Maior ordem amostrada no modo de exploração de ordens
+MAX_EXPLORATION_ORDER = 10
+
+# Widgets de entrada cujos valores são preservados enquanto a aba não é exibida
+PERSISTENT_WIDGETS = (
+    "higher_example",
+    "higher_expression",
+    "higher_variable",
+    "higher_order",
+    "higher_domain_min",
+    "higher_domain_max",
+    "higher_explore_orders",
+    "higher_live"
+)
+
+
+def render_higher_order_tab(
+    derivative_service: DerivativeService,
+    visualization_service: VisualizationService,
+    prefetcher: Optional[Prefetcher] = None
+):
     """Renderiza a aba de derivadas de ordem superior."""
     st.markdown('<h2>Derivada de Ordem Superior</h2>', unsafe_allow_html=True)
     
     # Exemplos de funções
-    examples = {
-        "Polinômio de Ordem 3": "x**3 + 2*x**2 + 3*x + 4",
-        "Função Trigonométrica": "sin(x)",
-        "Função Exponencial": "exp(x)"
-    }
+    examples = HIGHER_ORDER_EXAMPLES
     
     # Seleção de exemplo ou entrada manual
+    example_options = ["Digite sua expressão"] + list(examples.keys())
     example_choice = st.selectbox(
         "Escolha um exemplo ou digite sua própria expressão:",
-        ["Digite sua expressão"] + list(examples.keys()),
+        example_options,
+        index=widget_index("higher_example", example_options),
         key="higher_example"
     )
     
     if example_choice == "Digite sua expressão":
         expression = st.text_input(
             "Expressão:",
+            value=widget_default("higher_expression", ""),
             placeholder="Ex: x**3 + 2*x**2 + 3*x + 4",
             key="higher_expression"
         )
@@ -36,78 +74,193 @@ def render_higher_order_tab(derivative_service: DerivativeService):
         expression = examples[example_choice]
         st.text_input("Expressão:", value=expression, key="higher_expression_display", disabled=True)
     
-    variable = st.text_input("Variável de diferenciação:", value="x", key="higher_variable")
+    variable = st.text_input("Variável de diferenciação:", value=widget_default("higher_variable", "x"), key="higher_variable")
     
     order = st.number_input(
         "Ordem da derivada:",
         min_value=1,
-        max_value=10,
-        value=2,
+        max_value=MAX_DERIVATIVE_ORDER,
+        value=widget_default("higher_order", 2),
         step=1,
         key="higher_order"
     )
     
+    # Domínio do gráfico
+    col_min, col_max = st.columns(2)
+    with col_min:
+        domain_min = st.number_input(
+            "Domínio do gráfico (mínimo):",
+            value=widget_default("higher_domain_min", -5.0),
+            step=1.0,
+            key="higher_domain_min"
+        )
+    with col_max:
+        domain_max = st.number_input(
+            "Domínio do gráfico (máximo):",
+            value=widget_default("higher_domain_max", 5.0),
+            step=1.0,
+            key="higher_domain_max"
+        )
+    
+    explore_orders = st.checkbox(
+        f"Explorar as ordens 1 a {MAX_EXPLORATION_ORDER} no gráfico (sem recalcular)",
+        value=widget_default("higher_explore_orders", False),
+        key="higher_explore_orders"
+    )
+    
+    inputs = (expression, variable, order, domain_min, domain_max, explore_orders)
+    
+    # Pré-calcular o exemplo escolhido enquanto o usuário ainda não clicou em Calcular
+    max_order = MAX_EXPLORATION_ORDER if explore_orders else 1
+    if prefetcher is not None and example_choice != "Digite sua expressão" and variable \
+            and submitted_inputs("higher") != inputs:
+        prefetcher.submit(
+            ("derivative", expression, variable, order),
+            derivative_service.calculate_derivative, expression, variable, order,
+            cached=derivative_service.is_derivative_cached(expression, variable, order)
+        )
+        prefetcher.submit(
+            ("sequence", expression, variable, max_order),
+            derivative_service.calculate_derivative_sequence, expression, variable, max_order,
+            cached=derivative_service.is_sequence_cached(expression, variable, max_order)
+        )
+    
+    live = live_toggle("higher")
+    live_jobs = None
+    
     if st.button("Calcular Derivada de Ordem Superior", key="higher_calculate"):
         if expression and variable:
-            try:
-                # Calcular a derivada de ordem superior
-                result = derivative_service.calculate_derivative(expression, variable, order)
-                
-                if result:
-                    # Exibir o resultado formatado
-                    display_result(
-                        "Resultado da Derivada de Ordem Superior",
-                        result.original_expression.sympy_expr,
-                        result.result,
-                        variable,
-                        order
+            submit_inputs("higher", inputs)
+        else:
+            st.warning("Por favor, preencha todos os campos.")
+    elif live and expression and variable:
+        # No modo ao vivo, cada alteração das entradas conta como um envio
+        submit_inputs("higher", inputs)
+    
+    # Redesenhar o resultado a cada reexecução enquanto as entradas não mudarem
+    if expression and variable and submitted_inputs("higher") == inputs:
+        try:
+            # Calcular a derivada de ordem superior e a sequência de derivadas do gráfico,
+            # reaproveitando os resultados guardados na sessão
+            store = get_session_store()
+            store_key = ("higher", expression, variable, order, max_order)
+            
+            def compute_higher():
+                return (
+                    derivative_service.calculate_derivative(expression, variable, order),
+                    derivative_service.calculate_derivative_sequence(expression, variable, max_order)
+                )
+            
+            def submit_higher():
+                return gather(
+                    derivative_service.submit_derivative(expression, variable, order),
+                    derivative_service.submit_derivative_sequence(expression, variable, max_order)
+                )
+            
+            if live:
+                status, value, live_jobs = live_stage(
+                    "higher",
+                    (expression, variable, order, max_order),
+                    derivative_service.is_derivative_cached(expression, variable, order)
+                    and derivative_service.is_sequence_cached(expression, variable, max_order),
+                    submit_higher,
+                    store=store,
+                    key=store_key
+                )
+            else:
+                status, value = DONE, store.get_or_compute(store_key, compute_higher)
+            result, sequence = value if status == DONE else (None, None)
+            
+            if status != DONE:
+                display_stage_placeholder("Derivada de ordem superior", status, value)
+            elif result:
+                # A próxima ordem é o pedido seguinte mais provável
+                if prefetcher is not None and order < MAX_DERIVATIVE_ORDER:
+                    prefetcher.submit(
+                        ("derivative", expression, variable, order + 1),
+                        derivative_service.calculate_derivative, expression, variable, order + 1,
+                        cached=derivative_service.is_derivative_cached(expression, variable, order + 1)
                     )
-                    
-                    # Exibir passos com formatação aprimorada
-                    display_steps(result.steps)
-                    
-                    # Adicionar explicação sobre derivadas de ordem superior
-                    with st.expander("Sobre Derivadas de Ordem Superior", expanded=False):
+                
+                # Exibir o resultado formatado
+                display_result(
+                    "Resultado da Derivada de Ordem Superior",
+                    result.original_expression.sympy_expr,
+                    result.result,
+                    variable,
+                    order
+                )
+                
+                # Exibir gráfico de f, f' e da derivada de ordem n
+                derivatives = {0: result.original_expression.sympy_expr, order: result.result}
+                if sequence:
+                    derivatives[1] = sequence[1]
+                fig, error = visualization_service.create_derivative_plot(
+                    expression,
+                    variable,
+                    derivatives,
+                    domain=(domain_min, domain_max)
+                )
+                display_derivative_plot(fig, error)
+                
+                # Exibir todas as ordens de uma vez, navegáveis no próprio navegador
+                if explore_orders and sequence:
+                    with st.expander("Exploração de Ordens", expanded=True):
+                        fig_orders, error_orders = visualization_service.create_order_exploration(
+                            expression,
+                            variable,
+                            sequence,
+                            domain=(domain_min, domain_max)
+                        )
+                        display_order_exploration(fig_orders, error_orders)
+                
+                # Exibir passos com formatação aprimorada
+                display_steps(result.steps)
+                
+                # Adicionar explicação sobre derivadas de ordem superior
+                with st.expander("Sobre Derivadas de Ordem Superior", expanded=False):
+                    st.markdown("""
+                    <div class="interpretation-box">
+                        <h4>O que são derivadas de ordem superior?</h4>
+                        <p>
+                            Derivadas de ordem superior são obtidas aplicando o processo de derivação 
+                            repetidamente a uma função. Por exemplo:
+                        </p>
+                        <ul>
+                            <li>A primeira derivada (ordem 1) representa a taxa de variação da função original.</li>
+                            <li>A segunda derivada (ordem 2) representa a taxa de variação da primeira derivada, 
+                            ou a aceleração da função original.</li>
+                            <li>A terceira derivada (ordem 3) representa a taxa de variação da segunda derivada, 
+                            e assim por diante.</li>
+                        </ul>
+                        <p>
+                            Em física, por exemplo, se f(t) representa a posição de um objeto em função do tempo, 
+                            então f'(t) é a velocidade, f''(t) é a aceleração, e f'''(t) é a taxa de variação da aceleração.
+                        </p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                
+                # Adicionar análise do comportamento da função
+                if order == 2:
+                    with st.expander("Análise de Concavidade", expanded=True):
                         st.markdown("""
                         <div class="interpretation-box">
-                            <h4>O que são derivadas de ordem superior?</h4>
+                            <h4>Análise de Concavidade</h4>
                             <p>
-                                Derivadas de ordem superior são obtidas aplicando o processo de derivação 
-                                repetidamente a uma função. Por exemplo:
+                                A segunda derivada de uma função nos dá informações sobre sua concavidade:
                             </p>
                             <ul>
-                                <li>A primeira derivada (ordem 1) representa a taxa de variação da função original.</li>
-                                <li>A segunda derivada (ordem 2) representa a taxa de variação da primeira derivada, 
-                                ou a aceleração da função original.</li>
-                                <li>A terceira derivada (ordem 3) representa a taxa de variação da segunda derivada, 
-                                e assim por diante.</li>
+                                <li>Se f''(x) > 0, a função é côncava para cima (formato de U).</li>
+                                <li>Se f''(x) < 0, a função é côncava para baixo (formato de ∩).</li>
+                                <li>Se f''(x) = 0, pode haver um ponto de inflexão (mudança de concavidade).</li>
                             </ul>
-                            <p>
-                                Em física, por exemplo, se f(t) representa a posição de um objeto em função do tempo, 
-                                então f'(t) é a velocidade, f''(t) é a aceleração, e f'''(t) é a taxa de variação da aceleração.
-                            </p>
                         </div>
                         """, unsafe_allow_html=True)
-                    
-                    # Adicionar análise do comportamento da função
-                    if order == 2:
-                        with st.expander("Análise de Concavidade", expanded=True):
-                            st.markdown("""
-                            <div class="interpretation-box">
-                                <h4>Análise de Concavidade</h4>
-                                <p>
-                                    A segunda derivada de uma função nos dá informações sobre sua concavidade:
-                                </p>
-                                <ul>
-                                    <li>Se f''(x) > 0, a função é côncava para cima (formato de U).</li>
-                                    <li>Se f''(x) < 0, a função é côncava para baixo (formato de ∩).</li>
-                                    <li>Se f''(x) = 0, pode haver um ponto de inflexão (mudança de concavidade).</li>
-                                </ul>
-                            </div>
-                            """, unsafe_allow_html=True)
-                else:
-                    st.error("Não foi possível calcular a derivada de ordem superior.")
-            except Exception as e:
-                st.error(f"Erro ao calcular a derivada de ordem superior: {str(e)}")
-        else:
-            st.warning("Por favor, preencha todos os campos.")
\ No newline at end of file
+            else:
+                st.error("Não foi possível calcular a derivada de ordem superior.")
+        except Exception as e:
+            st.error(f"Erro ao calcular a derivada de ordem superior: {str(e)}")
+    
+    # Atualizar a pré-visualização assim que o cálculo em segundo plano terminar
+    if live_jobs is not None:
+        poll_while_pending(live_jobs)
@@ -1,36 +1,61 @@
 """
 Componente para a aba de derivadas normais.
 """
+from typing import Optional
 import streamlit as st
 import sympy as sp
 from domain.models import Expression
+from domain.examples import NORMAL_EXAMPLES
 from use_cases.derivative_service import DerivativeService
-from presentation.styles.cyberpunk_theme import display_result, display_steps
+from use_cases.visualization_service import VisualizationService
+from use_cases.prefetcher import Prefetcher
+from presentation.styles.cyberpunk_theme import display_result, display_steps, display_derivative_plot
+from presentation.session_store import (
+    get_session_store,
+    submit_inputs,
+    submitted_inputs,
+    widget_default,
+    widget_index
+)
+from presentation.background_stages import live_toggle, live_stage, display_stage_placeholder, poll_while_pending
+from use_cases.background_jobs import DONE
 
 
-def render_normal_derivatives_tab(derivative_service: DerivativeService):
+# Widgets de entrada cujos valores são preservados enquanto a aba não é exibida
+PERSISTENT_WIDGETS = (
+    "normal_example",
+    "normal_expression",
+    "normal_variable",
+    "normal_domain_min",
+    "normal_domain_max",
+    "normal_live"
+)
+
+
+def render_normal_derivatives_tab(
+    derivative_service: DerivativeService,
+    visualization_service: VisualizationService,
+    prefetcher: Optional[Prefetcher] = None
+):
     """Renderiza a aba de derivadas normais."""
     st.markdown('<h2>Derivada Normal</h2>', unsafe_allow_html=True)
     
     # Exemplos de funções
-    examples = {
-        "Polinômio Simples": "x**2 + 3*x + 1",
-        "Função Trigonométrica": "sin(x) + cos(x)",
-        "Função Exponencial": "exp(x**2)",
-        "Função Logarítmica": "log(x**2 + 1)",
-        "Função Composta": "sin(exp(x))"
-    }
+    examples = NORMAL_EXAMPLES
     
     # Seleção de exemplo ou entrada manual
+    example_options = ["Digite sua expressão"] + list(examples.keys())
     example_choice = st.selectbox(
         "Escolha um exemplo ou digite sua própria expressão:",
-        ["Digite sua expressão"] + list(examples.keys()),
+        example_options,
+        index=widget_index("normal_example", example_options),
         key="normal_example"
     )
     
     if example_choice == "Digite sua expressão":
         expression = st.text_input(
             "Expressão:",
+            value=widget_default("normal_expression", ""),
             placeholder="Ex: x**2 + 3*x + 1",
             key="normal_expression"
         )
@@ -38,28 +63,98 @@ def render_normal_derivatives_tab(derivative_service: DerivativeService):
         expression = examples[example_choice]
         st.text_input("Expressão:", value=expression, key="normal_expression_display", disabled=True)
     
-    variable = st.text_input("Variável de diferenciação:", value="x", key="normal_variable")
+    variable = st.text_input("Variável de diferenciação:", value=widget_default("normal_variable", "x"), key="normal_variable")
+    
+    # Domínio do gráfico
+    col_min, col_max = st.columns(2)
+    with col_min:
+        domain_min = st.number_input(
+            "Domínio do gráfico (mínimo):",
+            value=widget_default("normal_domain_min", -5.0),
+            step=1.0,
+            key="normal_domain_min"
+        )
+    with col_max:
+        domain_max = st.number_input(
+            "Domínio do gráfico (máximo):",
+            value=widget_default("normal_domain_max", 5.0),
+            step=1.0,
+            key="normal_domain_max"
+        )
+    
+    inputs = (expression, variable, domain_min, domain_max)
+    
+    # Pré-calcular o exemplo escolhido enquanto o usuário ainda não clicou em Calcular
+    if prefetcher is not None and example_choice != "Digite sua expressão" and variable \
+            and submitted_inputs("normal") != inputs:
+        prefetcher.submit(
+            ("derivative", expression, variable),
+            derivative_service.calculate_derivative, expression, variable,
+            cached=derivative_service.is_derivative_cached(expression, variable)
+        )
+    
+    live = live_toggle("normal")
+    live_jobs = None
     
     if st.button("Calcular Derivada", key="normal_calculate"):
         if expression and variable:
-            try:
-                # Calcular a derivada
-                result = derivative_service.calculate_derivative(expression, variable)
-                
-                if result:
-                    # Exibir o resultado formatado
-                    display_result(
-                        "Resultado da Derivada",
-                        result.original_expression.sympy_expr,
-                        result.result,
-                        variable
-                    )
-                    
-                    # Exibir passos com formatação aprimorada
-                    display_steps(result.steps)
-                else:
-                    st.error("Não foi possível calcular a derivada.")
-            except Exception as e:
-                st.error(f"Erro ao calcular a derivada: {str(e)}")
+            submit_inputs("normal", inputs)
         else:
-            st.warning("Por favor, preencha todos os campos.")
\ No newline at end of file
+            st.warning("Por favor, preencha todos os campos.")
+    elif live and expression and variable:
+        # No modo ao vivo, cada alteração das entradas conta como um envio
+        submit_inputs("normal", inputs)
+    
+    # Redesenhar o resultado a cada reexecução enquanto as entradas não mudarem
+    if expression and variable and submitted_inputs("normal") == inputs:
+        try:
+            # Calcular a derivada, reaproveitando o resultado guardado na sessão
+            store = get_session_store()
+            store_key = ("normal", expression, variable)
+            if live:
+                status, result, live_jobs = live_stage(
+                    "normal",
+                    (expression, variable),
+                    derivative_service.is_derivative_cached(expression, variable),
+                    derivative_service.submit_derivative,
+                    expression,
+                    variable,
+                    store=store,
+                    key=store_key
+                )
+            else:
+                status, result = DONE, store.get_or_compute(
+                    store_key,
+                    lambda: derivative_service.calculate_derivative(expression, variable)
+                )
+            
+            if status != DONE:
+                display_stage_placeholder("Derivada", status, result)
+            elif result:
+                # Exibir o resultado formatado
+                display_result(
+                    "Resultado da Derivada",
+                    result.original_expression.sympy_expr,
+                    result.result,
+                    variable
+                )
+                
+                # Exibir gráfico da função e da derivada
+                fig, error = visualization_service.create_derivative_plot(
+                    expression,
+                    variable,
+                    {0: result.original_expression.sympy_expr, 1: result.result},
+                    domain=(domain_min, domain_max)
+                )
+                display_derivative_plot(fig, error)
+                
+                # Exibir passos com formatação aprimorada
+                display_steps(result.steps)
+            else:
+                st.error("Não foi possível calcular a derivada.")
+        except Exception as e:
+            st.error(f"Erro ao calcular a derivada: {str(e)}")
+    
+    # Atualizar a pré-visualização assim que o cálculo em segundo plano terminar
+    if live_jobs is not None:
+        poll_while_pending(live_jobs)
@@ -1,47 +1,91 @@
 """
 Componente para a aba de derivadas parciais.
 """
+import io
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import streamlit as st
 import sympy as sp
-import pandas as pd
 from domain.models import Expression
+from domain.examples import PARTIAL_EXAMPLES
 from use_cases.partial_derivative_service import PartialDerivativeService
 from use_cases.visualization_service import VisualizationService
+from use_cases.prefetcher import Prefetcher
+from use_cases.latex_renderer import shared_latex_renderer
 from presentation.styles.cyberpunk_theme import (
     display_partial_derivative_result,
     display_partial_derivative_steps,
     display_geometric_interpretation,
     display_critical_points,
+    display_hessian,
     display_visualization,
     display_gradient_visualization
 )
+from presentation.session_store import (
+    get_session_store,
+    submit_inputs,
+    submitted_inputs,
+    submitted_live,
+    widget_default,
+    widget_index
+)
+from presentation.background_stages import (
+    job_group,
+    live_toggle,
+    LIVE_DEBOUNCE,
+    stage_result,
+    display_stage_placeholder,
+    display_progress,
+    poll_while_pending
+)
+from use_cases.background_jobs import DONE
+
+
+# Maior resolução oferecida para download direto; grades maiores usam export_grid.py
+MAX_DOWNLOAD_RESOLUTION = 1000
+
+# Widgets de entrada cujos valores são preservados enquanto a aba não é exibida
+PERSISTENT_WIDGETS = (
+    "partial_example",
+    "partial_expression",
+    "partial_variables",
+    "partial_live",
+    "partial_show_interpretation",
+    "partial_show_hessian",
+    "partial_show_table",
+    "partial_show_3d",
+    "partial_show_gradient",
+    "partial_export_resolution",
+    "partial_export_second_order"
+)
 
 
 def render_partial_derivatives_tab(
     partial_derivative_service: PartialDerivativeService,
-    visualization_service: VisualizationService
+    visualization_service: VisualizationService,
+    prefetcher: Optional[Prefetcher] = None
 ):
     """Renderiza a aba de derivadas parciais."""
     st.markdown('<h2>Derivada Parcial</h2>', unsafe_allow_html=True)
     
     # Exemplos de funções multivariáveis
-    examples = {
-        "Função de Duas Variáveis": "x**2 + x*y + y**2",
-        "Função Exponencial Multivariável": "exp(x*y)",
-        "Função Trigonométrica Multivariável": "sin(x) + cos(y)",
-        "Função Composta Multivariável": "sin(x*y) + exp(x+y)"
-    }
+    examples = PARTIAL_EXAMPLES
     
     # Seleção de exemplo ou entrada manual
+    example_options = ["Digite sua expressão"] + list(examples.keys())
     example_choice = st.selectbox(
         "Escolha um exemplo ou digite sua própria expressão:",
-        ["Digite sua expressão"] + list(examples.keys()),
+        example_options,
+        index=widget_index("partial_example", example_options),
         key="partial_example"
     )
     
     if example_choice == "Digite sua expressão":
         expression = st.text_input(
             "Expressão multivariável:",
+            value=widget_default("partial_expression", ""),
             placeholder="Ex: x**2 + x*y + y**2",
             key="partial_expression"
         )
@@ -52,79 +96,312 @@ def render_partial_derivatives_tab(
     # Entrada de variáveis
     variables_input = st.text_input(
         "Variáveis (separadas por vírgula):",
-        value="x, y",
+        value=widget_default("partial_variables", "x, y"),
         key="partial_variables"
     )
     
     # Processar variáveis
     variables = [var.strip() for var in variables_input.split(",") if var.strip()]
     
+    inputs = (expression, tuple(variables))
+    
+    # Pré-calcular o exemplo escolhido enquanto o usuário ainda não clicou em Calcular
+    if prefetcher is not None and example_choice != "Digite sua expressão" and variables \
+            and submitted_inputs("partial") != inputs:
+        prefetcher.submit(
+            ("partial", expression, tuple(variables)),
+            partial_derivative_service.calculate_partial_derivatives, expression, variables,
+            cached=partial_derivative_service.is_gradient_cached(expression, variables)
+        )
+        prefetcher.submit(
+            ("critical_points", expression, tuple(variables)),
+            partial_derivative_service.find_critical_points, expression, variables,
+            cached=partial_derivative_service.is_critical_points_cached(expression, variables)
+        )
+    
+    live = live_toggle("partial")
+    
     # Botão para calcular
     if st.button("Calcular Derivadas Parciais", key="partial_calculate"):
         if expression and variables:
-            try:
-                # Calcular derivadas parciais
-                result = partial_derivative_service.calculate_partial_derivatives(expression, variables)
+            submit_inputs("partial", inputs)
+            job_group("partial", inputs, restart=True)
+        else:
+            st.warning("Por favor, preencha todos os campos.")
+    elif live and expression and variables and submitted_inputs("partial") != inputs:
+        # No modo ao vivo, cada alteração das entradas conta como um envio; o grupo
+        # das entradas anteriores é cancelado (com os cálculos dele ainda na fila do
+        # escalonador) e as etapas novas esperam o debounce, exceto quando o
+        # gradiente já está no cache
+        submit_inputs("partial", inputs, live=True)
+        if not partial_derivative_service.is_gradient_cached(expression, variables):
+            job_group("partial", inputs, delay=LIVE_DEBOUNCE)
+    
+    # Redesenhar os resultados a cada reexecução enquanto as entradas não mudarem;
+    # cada etapa roda em segundo plano e sua seção é preenchida quando ela termina
+    jobs = None
+    if expression and variables and submitted_inputs("partial") == inputs:
+        try:
+            store = get_session_store()
+            jobs = job_group("partial", inputs)
+            # Pontos críticos, Hessiana e visualizações são pesados: no modo ao vivo,
+            # só são calculados quando as entradas são enviadas pelo botão
+            full_run = not submitted_live("partial")
+            base_key = ("partial", expression, tuple(variables))
+            progress_area = st.container()
+            
+            # Calcular derivadas parciais (gradiente)
+            gradient_status, result = stage_result(
+                jobs, "gradient",
+                partial_derivative_service.submit_partial_derivatives, expression, variables,
+                store=store, key=base_key + ("result",),
+                cached=partial_derivative_service.is_gradient_cached(expression, variables)
+            )
+            
+            if gradient_status != DONE:
+                display_stage_placeholder("Derivadas parciais", gradient_status, result)
+            elif result:
+                # Depois do gradiente, os próximos pedidos prováveis são a Hessiana e os pontos críticos
+                if prefetcher is not None and full_run:
+                    prefetcher.submit(
+                        ("hessian", expression, tuple(variables)),
+                        partial_derivative_service.calculate_hessian, expression, variables,
+                        cached=partial_derivative_service.is_hessian_cached(expression, variables)
+                    )
+                    prefetcher.submit(
+                        ("critical_points", expression, tuple(variables)),
+                        partial_derivative_service.find_critical_points, expression, variables,
+                        cached=partial_derivative_service.is_critical_points_cached(expression, variables)
+                    )
+                
+                # Criar objeto Expression para exibição
+                expr = Expression(raw_expression=expression, variables=variables)
+                
+                # Exibir resultados
+                display_partial_derivative_result(
+                    "Resultados das Derivadas Parciais",
+                    expr.sympy_expr,
+                    result.derivatives,
+                    variables
+                )
                 
-                if result:
-                    # Criar objeto Expression para exibição
-                    expr = Expression(raw_expression=expression, variables=variables)
-                    
-                    # Exibir resultados
-                    display_partial_derivative_result(
-                        "Resultados das Derivadas Parciais",
-                        expr.sympy_expr,
-                        result.derivatives,
-                        variables
+                # Exibir passos para cada derivada parcial
+                with st.expander("Ver passos das derivações", expanded=False):
+                    for var in variables:
+                        if var in result.steps:
+                            display_partial_derivative_steps(var, result.steps[var])
+            else:
+                st.error("Não foi possível calcular as derivadas parciais.")
+            
+            # Seções pesadas são calculadas e desenhadas apenas quando visíveis
+            # (o conteúdo de um st.expander é executado mesmo recolhido)
+            
+            # Exibir interpretação geométrica
+            if st.toggle(
+                "Interpretação Geométrica",
+                value=widget_default("partial_show_interpretation", False),
+                key="partial_show_interpretation"
+            ):
+                if gradient_status != DONE:
+                    # A interpretação usa as derivadas parciais; é submetida quando elas terminam
+                    display_stage_placeholder("Interpretação geométrica", gradient_status, None)
+                else:
+                    status, interpretation = stage_result(
+                        jobs, "interpretation",
+                        partial_derivative_service.get_geometric_interpretation, expression, variables,
+                        store=store, key=base_key + ("interpretation",)
                     )
-                    
-                    # Exibir passos para cada derivada parcial
-                    with st.expander("Ver passos das derivações", expanded=False):
-                        for var in variables:
-                            if var in result.steps:
-                                display_partial_derivative_steps(var, result.steps[var])
-                    
-                    # Exibir interpretação geométrica
-                    with st.expander("Interpretação Geométrica", expanded=False):
-                        interpretation = partial_derivative_service.get_geometric_interpretation(expression, variables)
+                    if status == DONE:
                         display_geometric_interpretation(interpretation)
-                    
-                    # Encontrar pontos críticos
-                    critical_points = partial_derivative_service.find_critical_points(expression, variables)
-                    if critical_points:
-                        with st.expander("Pontos Críticos", expanded=True):
-                            display_critical_points(critical_points)
-                    
-                    # Mostrar tabela de resultados em um expander
-                    with st.expander("Ver tabela de resultados", expanded=False):
-                        # Criar tabela de resultados estilizada com LaTeX
-                        data = []
-                        for var, derivative in result.derivatives.items():
-                            data.append({
-                                "Variável": f"${var}$",
-                                "Expressão da Derivada": f"${sp.latex(derivative)}$",
-                                "Forma Simplificada": f"${sp.latex(sp.simplify(derivative))}$"
-                            })
-                        
+                    else:
+                        display_stage_placeholder("Interpretação geométrica", status, interpretation)
+            
+            if not full_run:
+                st.info(
+                    "⚡ Pontos críticos, matriz Hessiana e visualizações são calculados "
+                    "ao clicar em Calcular Derivadas Parciais."
+                )
+            else:
+                # Encontrar pontos críticos
+                status, critical_points = stage_result(
+                    jobs, "critical_points",
+                    partial_derivative_service.submit_critical_points, expression, variables,
+                    store=store, key=base_key + ("critical_points",),
+                    cached=partial_derivative_service.is_critical_points_cached(expression, variables)
+                )
+                if status != DONE:
+                    display_stage_placeholder("Pontos críticos", status, critical_points)
+                elif critical_points:
+                    with st.expander("Pontos Críticos", expanded=True):
+                        display_critical_points(critical_points)
+                elif critical_points is None:
+                    st.error("Não foi possível encontrar os pontos críticos.")
+            
+            # Exibir matriz Hessiana
+            if st.toggle(
+                "Matriz Hessiana",
+                value=widget_default("partial_show_hessian", False),
+                key="partial_show_hessian"
+            ) and full_run:
+                status, hessian = stage_result(
+                    jobs, "hessian",
+                    partial_derivative_service.submit_hessian, expression, variables,
+                    store=store, key=base_key + ("hessian",),
+                    cached=partial_derivative_service.is_hessian_cached(expression, variables)
+                )
+                if status == DONE:
+                    display_hessian(hessian, variables)
+                else:
+                    display_stage_placeholder("Matriz Hessiana", status, hessian)
+            
+            # Mostrar tabela de resultados
+            if st.toggle(
+                "Ver tabela de resultados",
+                value=widget_default("partial_show_table", False),
+                key="partial_show_table"
+            ):
+                if gradient_status != DONE:
+                    # A tabela depende das derivadas parciais; é submetida quando elas terminam
+                    display_stage_placeholder("Tabela de resultados", gradient_status, None)
+                elif result:
+                    # Criar tabela de resultados estilizada com LaTeX
+                    status, data = stage_result(
+                        jobs, "table",
+                        build_results_table, result.derivatives,
+                        store=store, key=base_key + ("table",)
+                    )
+                    if status == DONE:
+                        # O pandas só é carregado quando a tabela é exibida
+                        import pandas as pd
                         df = pd.DataFrame(data)
                         st.table(df)
-                    
-                    # Adicionar visualização interativa para funções de duas variáveis
-                    if len(variables) == 2 and all(var in ['x', 'y'] for var in variables):
-                        with st.expander("Visualização 3D da Função e Derivadas Parciais", expanded=True):
-                            # Criar visualização 3D
-                            fig_3d, error_3d = visualization_service.create_3d_visualization(expression, variables)
-                            display_visualization(fig_3d, error_3d)
-                        
-                        with st.expander("Visualização do Gradiente", expanded=True):
-                            # Criar visualização do gradiente
-                            fig_grad, error_grad = visualization_service.create_gradient_visualization(expression, variables)
-                            display_gradient_visualization(fig_grad, error_grad)
+                    else:
+                        display_stage_placeholder("Tabela de resultados", status, data)
+            
+            # Adicionar visualização interativa para funções de duas variáveis; as figuras
+            # usam as derivadas parciais e são submetidas quando elas terminam
+            if len(variables) == 2 and all(var in ['x', 'y'] for var in variables):
+                if st.toggle(
+                    "Visualização 3D da Função e Derivadas Parciais",
+                    value=widget_default("partial_show_3d", True),
+                    key="partial_show_3d"
+                ) and full_run:
+                    # Criar visualização 3D
+                    status, figure_3d = gradient_status, None
+                    if gradient_status == DONE:
+                        status, figure_3d = stage_result(
+                            jobs, "figure_3d",
+                            visualization_service.create_3d_visualization, expression, variables
+                        )
+                    if status == DONE:
+                        display_visualization(*figure_3d)
+                    else:
+                        display_stage_placeholder("Visualização 3D", status, figure_3d)
                 
-                else:
-                    st.error("Não foi possível calcular as derivadas parciais.")
+                if st.toggle(
+                    "Visualização do Gradiente",
+                    value=widget_default("partial_show_gradient", True),
+                    key="partial_show_gradient"
+                ) and full_run:
+                    # Criar visualização do gradiente
+                    status, figure_grad = gradient_status, None
+                    if gradient_status == DONE:
+                        status, figure_grad = stage_result(
+                            jobs, "figure_gradient",
+                            visualization_service.create_gradient_visualization, expression, variables
+                        )
+                    if status == DONE:
+                        display_gradient_visualization(*figure_grad)
+                    else:
+                        display_stage_placeholder("Visualização do gradiente", status, figure_grad)
             
-            except Exception as e:
-                st.error(f"Erro ao calcular as derivadas parciais: {str(e)}")
-        else:
-            st.warning("Por favor, preencha todos os campos.")
\ No newline at end of file
+            # Progresso e cancelamento das etapas em andamento, acima dos resultados
+            with progress_area:
+                display_progress(jobs, "_derivata_partial_cancel")
+        
+        except Exception as e:
+            st.error(f"Erro ao calcular as derivadas parciais: {str(e)}")
+    
+    # Exportar a grade amostrada para análise offline
+    if expression and len(variables) == 2:
+        with st.expander("Exportar grade (.npy) para análise offline", expanded=False):
+            st.markdown(
+                "Gera f e suas derivadas parciais amostradas em uma grade, um arquivo `.npy` por campo "
+                "e um `manifest.json`. Para grades maiores use `python export_grid.py`."
+            )
+            export_resolution = st.number_input(
+                "Pontos por eixo:",
+                min_value=10,
+                max_value=MAX_DOWNLOAD_RESOLUTION,
+                value=widget_default("partial_export_resolution", 500),
+                step=100,
+                key="partial_export_resolution"
+            )
+            export_second_order = st.checkbox(
+                "Incluir derivadas de segunda ordem",
+                value=widget_default("partial_export_second_order", False),
+                key="partial_export_second_order"
+            )
+            
+            if st.button("Gerar arquivos", key="partial_export"):
+                with st.spinner("Amostrando a grade..."):
+                    archive, error = build_grid_archive(
+                        visualization_service,
+                        expression,
+                        variables,
+                        int(export_resolution),
+                        export_second_order
+                    )
+                if error:
+                    st.error(error)
+                else:
+                    st.download_button(
+                        "Baixar grade (.zip)",
+                        data=archive,
+                        file_name="derivata_grade.zip",
+                        mime="application/zip",
+                        key="partial_export_download"
+                    )
+    
+    # Atualizar a aba enquanto houver etapas em segundo plano
+    if jobs is not None:
+        poll_while_pending(jobs)
+
+
+def build_results_table(derivatives: Dict[str, sp.Expr]) -> List[Dict[str, str]]:
+    """Monta as linhas da tabela de resultados com as formas LaTeX original e simplificada."""
+    renderer = shared_latex_renderer()
+    data = []
+    for var, derivative in derivatives.items():
+        data.append({
+            "Variável": f"${var}$",
+            "Expressão da Derivada": f"${renderer.latex(derivative)}$",
+            "Forma Simplificada": f"${renderer.latex(renderer.simplify(derivative))}$"
+        })
+    return data
+
+
+def build_grid_archive(
+    visualization_service: VisualizationService,
+    expression: str,
+    variables: List[str],
+    resolution: int,
+    second_order: bool
+) -> Tuple[Optional[bytes], Optional[str]]:
+    """Exporta a grade em um diretório temporário e a empacota em um arquivo zip."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manifest, error = visualization_service.export_grid(
+            expression,
+            variables,
+            tmp_dir,
+            resolution=resolution,
+            second_order=second_order
+        )
+        if error:
+            return None, error
+        
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+            for path in sorted(Path(tmp_dir).iterdir()):
+                archive.write(path, arcname=path.name)
+        return buffer.getvalue(), None
\ No newline at end of file
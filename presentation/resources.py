@@ -0,0 +1,60 @@
+"""
+Recursos compartilhados entre execuções e sessões do Streamlit.
+Adaptadores e serviços são construídos uma única vez por processo.
+"""
+from dataclasses import dataclass
+from functools import partial
+import streamlit as st
+from adapters.sympy_adapter import SymPyAdapter
+from adapters.plotly_adapter import PlotlyAdapter
+from use_cases.derivative_service import DerivativeService
+from use_cases.partial_derivative_service import PartialDerivativeService
+from use_cases.visualization_service import VisualizationService
+from use_cases.prefetcher import Prefetcher, system_busy
+from use_cases.compute_backend import ComputeBackend, backend_from_environment
+from use_cases.result_cache import enable_shared_disk_cache, shared_result_cache
+from use_cases.example_snapshot import start_snapshot_loader
+
+
+@dataclass(frozen=True)
+class Services:
+    """Conjunto de serviços usados pelas abas da aplicação."""
+    derivative_service: DerivativeService
+    partial_derivative_service: PartialDerivativeService
+    visualization_service: VisualizationService
+    prefetcher: Prefetcher
+    backend: ComputeBackend
+
+
+def build_services() -> Services:
+    """Inicializa os adaptadores e os serviços da aplicação."""
+    # Inicializar adaptadores
+    sympy_adapter = SymPyAdapter()
+    plotly_adapter = PlotlyAdapter()
+
+    # Resultados persistidos em disco entre reinícios (só a aplicação; a biblioteca fica em memória)
+    enable_shared_disk_cache()
+
+    # Backend compartilhado: os cálculos simbólicos de todas as sessões vão para o pool de
+    # processos local ou para os nós de cálculo remotos (DERIVATA_COMPUTE)
+    backend = backend_from_environment()
+
+    # Inicializar serviços
+    services = Services(
+        derivative_service=DerivativeService(sympy_adapter, backend=backend),
+        partial_derivative_service=PartialDerivativeService(sympy_adapter, backend=backend),
+        visualization_service=VisualizationService(plotly_adapter, sympy_adapter, backend=backend),
+        # O pré-cálculo também espera pelos cálculos síncronos das abas no backend
+        prefetcher=Prefetcher(is_busy=partial(system_busy, backend)),
+        backend=backend
+    )
+    
+    # Carregar os resultados pré-calculados dos exemplos em segundo plano
+    start_snapshot_loader(shared_result_cache(), services.visualization_service.figure_cache)
+    return services
+
+
+@st.cache_resource(show_spinner=False)
+def get_services() -> Services:
+    """Retorna os serviços compartilhados pelo processo, construindo-os na primeira chamada."""
+    return build_services()
@@ -0,0 +1,118 @@
+"""
+Armazenamento de resultados por sessão do Streamlit.
+Permite redesenhar os resultados em cada reexecução sem recalculá-los.
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, Optional, Sequence
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from adapters.memory_cache import LRUCache
+from use_cases.compute_scheduler import ANONYMOUS_SESSION, session_scope
+
+
+# Limite padrão de memória dos resultados de cada sessão (16 MiB)
+DEFAULT_SESSION_STORE_BYTES = 16 * 1024 * 1024
+
+_STORE_KEY = "_derivata_result_store"
+
+# Valores dos widgets persistentes das abas, guardados fora do estado dos widgets
+_WIDGETS_KEY = "_derivata_widgets"
+
+
+class SessionResultStore:
+    """
+    Resultados calculados em uma sessão, indexados pelas entradas de cada aba.
+
+    As figuras não são guardadas aqui: elas ficam no cache de figuras
+    compartilhado do VisualizationService, que já as serve sem recálculo.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_SESSION_STORE_BYTES):
+        self._cache = LRUCache(max_bytes)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Retorna o resultado guardado para as entradas ou o calcula e guarda."""
+        return self._cache.get_or_compute(key, compute)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o resultado guardado para as entradas, ou `default` se não existir."""
+        return self._cache.get(key, default)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Guarda um resultado para as entradas."""
+        self._cache.put(key, value)
+
+    def stats(self):
+        """Retorna estatísticas de uso do armazenamento."""
+        return self._cache.stats()
+
+
+def get_session_store() -> SessionResultStore:
+    """Retorna o armazenamento de resultados da sessão atual, criando-o se necessário."""
+    if _STORE_KEY not in st.session_state:
+        st.session_state[_STORE_KEY] = SessionResultStore()
+    return st.session_state[_STORE_KEY]
+
+
+def submit_inputs(tab: str, inputs: Hashable, live: bool = False) -> None:
+    """Registra as entradas enviadas pelo botão de cálculo da aba (ou, com `live`, pela pré-visualização ao vivo)."""
+    st.session_state[f"_derivata_submitted_{tab}"] = inputs
+    st.session_state[f"_derivata_submitted_live_{tab}"] = live
+
+
+def submitted_inputs(tab: str) -> Optional[Hashable]:
+    """Retorna as últimas entradas enviadas pelo botão de cálculo da aba."""
+    return st.session_state.get(f"_derivata_submitted_{tab}")
+
+
+def submitted_live(tab: str) -> bool:
+    """Indica se as últimas entradas vieram da pré-visualização ao vivo, e não do botão de cálculo."""
+    return st.session_state.get(f"_derivata_submitted_live_{tab}", False)
+
+
+@contextmanager
+def persistent_widgets(keys: Sequence[str]) -> Iterator[None]:
+    """
+    Guarda os valores dos widgets de entrada `keys` ao fim de cada execução da aba.
+
+    O Streamlit descarta o estado dos widgets que não aparecem em uma execução;
+    como apenas a aba ativa é renderizada, os widgets recriam-se ao voltar para
+    ela com o valor guardado, passado por widget_default e widget_index ao
+    próprio widget. O estado dos widgets nunca é escrito diretamente: o
+    Streamlit não aceita isso para botões e avisa para widgets com `value=`.
+    """
+    try:
+        yield
+    finally:
+        saved = st.session_state.setdefault(_WIDGETS_KEY, {})
+        for key in keys:
+            if key in st.session_state:
+                saved[key] = st.session_state[key]
+
+
+def widget_default(key: str, default: Any) -> Any:
+    """Valor inicial de um widget persistente: o guardado da última vez que ele apareceu, ou `default`."""
+    return st.session_state.get(_WIDGETS_KEY, {}).get(key, default)
+
+
+def widget_index(key: str, options: Sequence[Any], default: int = 0) -> int:
+    """Índice inicial de um seletor persistente (selectbox, radio) entre as opções atuais."""
+    value = widget_default(key, None)
+    return options.index(value) if value in options else default
+
+
+def current_session_id() -> str:
+    """Identificador da sessão do Streamlit que executa o script."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else ANONYMOUS_SESSION
+
+
+@contextmanager
+def session_identity() -> Iterator[None]:
+    """
+    Associa os cálculos do bloco à sessão atual no escalonador compartilhado.
+
+    As etapas em segundo plano submetidas dentro do bloco herdam a sessão.
+    """
+    with session_scope(current_session_id()):
+        yield
@@ -1,12 +1,18 @@
 """
 Definição do tema cyberpunk para a aplicação.
 """
+from functools import lru_cache
+from pathlib import Path
+import base64
+import re
 import streamlit as st
+from use_cases.latex_renderer import shared_latex_renderer
 
 
-def apply_cyberpunk_theme():
-    """Aplica o tema cyberpunk à aplicação Streamlit."""
-    st.markdown("""
+# Caminho do logo, resolvido a partir da raiz do projeto
+LOGO_PATH = Path(__file__).resolve().parents[2] / "static" / "logo.svg"
+
+CYBERPUNK_CSS = """
     <style>
         /* Fundo e gradientes - mais suave */
         .stApp {
@@ -355,14 +361,28 @@ def apply_cyberpunk_theme():
             font-weight: bold;
         }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+
+@lru_cache(maxsize=1)
+def compile_cyberpunk_css() -> str:
+    """Remove comentários e espaços do CSS do tema uma única vez por processo."""
+    css = re.sub(r"/\*.*?\*/", "", CYBERPUNK_CSS, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.strip()
 
 
+def apply_cyberpunk_theme():
+    """Aplica o tema cyberpunk à aplicação Streamlit."""
+    st.markdown(compile_cyberpunk_css(), unsafe_allow_html=True)
+
+
+@lru_cache(maxsize=1)
 def get_svg_base64():
-    """Carrega o logo SVG como base64."""
-    import base64
+    """Carrega o logo SVG como base64 (lido e codificado uma única vez por processo)."""
     try:
-        with open("static/logo.svg", "r") as file:
+        with open(LOGO_PATH, "r") as file:
             svg_content = file.read()
             b64 = base64.b64encode(svg_content.encode()).decode()
             return b64
@@ -401,7 +421,8 @@ def display_header():
 
 def display_result(title, expression, result, variable=None, order=1):
     """Exibe o resultado de um cálculo com formatação aprimorada."""
-    import sympy as sp
+    renderer = shared_latex_renderer()
+    expression_latex = renderer.latex(expression)
     
     st.markdown('<div class="result-box">', unsafe_allow_html=True)
     st.subheader(title)
@@ -411,24 +432,39 @@ def display_result(title, expression, result, variable=None, order=1):
     
     with col1:
         st.markdown("**Expressão original:**")
-        st.latex(sp.latex(expression))
+        display_latex(renderer.render(expression), key=f"{title}_expression_download")
     
     with col2:
         st.markdown("**Resultado:**")
         if variable:
             if order == 1:
                 # Primeira derivada
-                st.latex(f"\\frac{{d}}{{d{variable}}}({sp.latex(expression)}) = {sp.latex(result)}")
+                prefix = f"\\frac{{d}}{{d{variable}}}({expression_latex}) = "
             else:
                 # Derivada de ordem superior
-                st.latex(f"\\frac{{d^{order}}}{{d{variable}^{order}}}({sp.latex(expression)}) = {sp.latex(result)}")
+                prefix = f"\\frac{{d^{order}}}{{d{variable}^{order}}}({expression_latex}) = "
+            display_latex(renderer.render(result), prefix, key=f"{title}_result_download")
         else:
             # Caso genérico
-            st.latex(sp.latex(result))
+            display_latex(renderer.render(result), key=f"{title}_result_download")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
 
+def display_latex(rendered, prefix="", key=None):
+    """Exibe um LaTeX já renderizado; se ele foi abreviado, oferece o resultado completo para download."""
+    st.latex(prefix + rendered.latex)
+    if rendered.abbreviated:
+        st.caption(rendered.note)
+        st.download_button(
+            "Baixar resultado completo",
+            data=rendered.full_text,
+            file_name="resultado.txt",
+            mime="text/plain",
+            key=key
+        )
+
+
 def display_steps(steps):
     """Exibe os passos de uma derivação com formatação aprimorada."""
     st.markdown("### Passos da Derivação")
@@ -446,14 +482,15 @@ def display_steps(steps):
 
 def display_partial_derivative_result(title, expression, results, variables):
     """Exibe o resultado de derivadas parciais com formatação aprimorada."""
-    import sympy as sp
+    renderer = shared_latex_renderer()
+    expression_latex = renderer.latex(expression)
     
     st.markdown('<div class="partial-result-box">', unsafe_allow_html=True)
     st.subheader(title)
     
     # Expressão original
     st.markdown("**Expressão original:**")
-    st.latex(sp.latex(expression))
+    display_latex(renderer.render(expression), key=f"{title}_expression_download")
     
     # Resultados das derivadas parciais
     st.markdown("**Derivadas Parciais:**")
@@ -464,7 +501,11 @@ def display_partial_derivative_result(title, expression, results, variables):
     for i, (var, result) in enumerate(results.items()):
         with cols[i]:
             st.markdown(f'<span class="variable-tag">∂/∂{var}</span>', unsafe_allow_html=True)
-            st.latex(f"\\frac{{\partial}}{{\partial {var}}}({sp.latex(expression)}) = {sp.latex(result)}")
+            display_latex(
+                renderer.render(result),
+                f"\\frac{{\partial}}{{\partial {var}}}({expression_latex}) = ",
+                key=f"{title}_{var}_download"
+            )
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -524,6 +565,22 @@ def display_critical_points(critical_points):
     st.markdown('</div>', unsafe_allow_html=True)
 
 
+def display_hessian(hessian, variables):
+    """Exibe a matriz Hessiana de uma função multivariável."""
+    if hessian is None:
+        st.error("Não foi possível calcular a matriz Hessiana.")
+        return
+    
+    st.markdown('<div class="result-box">', unsafe_allow_html=True)
+    st.subheader("Matriz Hessiana")
+    display_latex(
+        shared_latex_renderer().render(hessian),
+        f"H_f({', '.join(variables)}) = ",
+        key="hessian_download"
+    )
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
 def display_visualization(fig, error=None):
     """Exibe uma visualização com formatação aprimorada."""
     if error:
@@ -569,6 +626,51 @@ def display_gradient_visualization(fig, error=None):
         st.markdown('</div>', unsafe_allow_html=True)
 
 
+def display_derivative_plot(fig, error=None):
+    """Exibe o gráfico da função e de suas derivadas com formatação aprimorada."""
+    if error:
+        st.error(error)
+        return
+    
+    if fig:
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Adicionar explicação
+        st.markdown('<div class="visualization-explanation">', unsafe_allow_html=True)
+        st.markdown("""
+        <h4>Como interpretar este gráfico:</h4>
+        <ul>
+            <li>Onde a derivada é positiva, a função cresce; onde é negativa, a função decresce.</li>
+            <li>Os zeros da primeira derivada indicam candidatos a máximos e mínimos da função.</li>
+            <li>Lacunas nas curvas indicam polos ou pontos fora do domínio da função.</li>
+        </ul>
+        <p>Os pontos são concentrados automaticamente onde as curvas variam mais rapidamente.</p>
+        """, unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+def display_order_exploration(fig, error=None):
+    """Exibe o gráfico de exploração de ordens com formatação aprimorada."""
+    if error:
+        st.error(error)
+        return
+    
+    if fig:
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Adicionar explicação
+        st.markdown('<div class="visualization-explanation">', unsafe_allow_html=True)
+        st.markdown("""
+        <h4>Como usar este gráfico:</h4>
+        <ul>
+            <li>Arraste o controle deslizante para alternar entre as ordens da derivada.</li>
+            <li>A função original permanece visível como referência.</li>
+        </ul>
+        <p>Todas as ordens já foram calculadas; a troca acontece sem recalcular nada.</p>
+        """, unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
 def create_example_card(title, expression, on_click=None):
     """Cria um card para um exemplo de expressão."""
     html = f"""
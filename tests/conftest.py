@@ -0,0 +1,8 @@
+"""
+Configuração comum dos testes.
+Os testes importam os módulos a partir da raiz do projeto, como a aplicação.
+"""
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,62 @@
+"""
+Testes da amostragem adaptativa das curvas de uma variável.
+"""
+import numpy as np
+import sympy as sp
+from adapters.adaptive_sampling import adaptive_sample, lambdify_stack, mask_poles
+
+
+x = sp.Symbol("x")
+
+
+def sample(expressions, domain=(-3, 3), **options):
+    if not isinstance(expressions, list):
+        expressions = [expressions]
+    return adaptive_sample(lambdify_stack("x", expressions), domain, **options)
+
+
+def test_straight_lines_keep_the_initial_grid():
+    xs, values = sample(2*x + 1, initial_points=65)
+
+    assert xs.shape == (65,)
+    assert np.allclose(values[0], 2*xs + 1)
+
+
+def test_points_concentrate_near_poles():
+    xs, _ = sample(1/x, max_points=400)
+
+    near = np.count_nonzero(np.abs(xs) < 0.5)
+    far = np.count_nonzero(np.abs(xs) > 2.5)
+    # Faixas de mesma largura: a do polo recebe muito mais amostras
+    assert near > 5 * far
+    assert xs.shape[0] <= 400
+    assert np.all(np.diff(xs) > 0)
+
+
+def test_points_concentrate_near_inflections():
+    xs, _ = sample((x - 0.3)**3)
+
+    initial_spacing = 6 / 64
+    spacing = np.diff(xs)
+    finest = np.argmin(spacing)
+    assert spacing[finest] < initial_spacing / 100
+    assert abs(xs[finest] - 0.3) < initial_spacing
+
+
+def test_stacked_curves_share_the_abscissas():
+    xs, stacked = sample([x**2, sp.sqrt(x), sp.Integer(4)])
+
+    assert stacked.shape == (3, xs.shape[0])
+    # Valores complexos viram lacunas e constantes são estendidas a todas as amostras
+    assert np.isnan(stacked[1, 0]) and np.isfinite(stacked[1, -1])
+    assert np.all(stacked[2] == 4)
+
+
+def test_mask_poles_breaks_the_curve_at_the_pole():
+    xs, values = sample(sp.tan(x), domain=(0.5, 2.5))
+    masked = mask_poles(values)[0]
+
+    # Nenhum segmento da linha liga os dois ramos do polo
+    left, right = masked[:-1], masked[1:]
+    assert not np.any((left > 0) & (right < 0))
+    assert np.isfinite(masked[np.abs(xs - np.pi / 2) > 0.5]).all()
@@ -0,0 +1,60 @@
+"""
+Testes das funções da biblioteca Derivata (derivata.api).
+"""
+import pytest
+import sympy as sp
+import derivata
+
+
+x, y = sp.symbols("x y")
+
+
+def test_diff_returns_the_derivative_with_steps():
+    result = derivata.diff("x**3", "x", order=2)
+
+    assert result.result == 6*x
+    assert result.order == 2
+    assert result.steps
+
+
+def test_gradient_uses_the_free_symbols_in_alphabetical_order():
+    result = derivata.gradient("y*x**2 + y")
+
+    assert list(result.derivatives) == ["x", "y"]
+    assert result.gradient == [2*x*y, x**2 + 1]
+
+
+def test_hessian_follows_the_given_variables():
+    assert derivata.hessian("x**3*y", ["x", "y"]) == sp.Matrix([[6*x*y, 3*x**2], [3*x**2, 0]])
+    assert derivata.hessian("x**3*y", ["y", "x"]) == sp.Matrix([[0, 3*x**2], [3*x**2, 6*x*y]])
+
+
+def test_critical_points_are_found_and_classified():
+    points = derivata.critical_points("x**2 + y**2 - x*y")
+
+    assert [point.coordinates for point in points] == [{"x": 0, "y": 0}]
+    assert points[0].classification == "minimum"
+
+
+def test_results_are_shared_through_the_result_cache():
+    derivata.diff("x**5 + 1", "x")
+    before = derivata.cache_stats()
+    derivata.diff("1 + x**5", "x")
+
+    assert derivata.cache_stats()["hits"] == before["hits"] + 1
+
+
+@pytest.mark.parametrize("call", [
+    lambda: derivata.diff("x**2", "x", order=0),
+    lambda: derivata.diff("x**", "x"),
+    lambda: derivata.gradient("x**"),
+    lambda: derivata.hessian("(x*", ["x"]),
+])
+def test_invalid_input_raises_value_error(call):
+    with pytest.raises(ValueError):
+        call()
+
+
+def test_unknown_attributes_are_not_exported():
+    with pytest.raises(AttributeError):
+        derivata.integrate
@@ -0,0 +1,86 @@
+"""
+Testes das etapas em segundo plano: entrega ao backend e debounce.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+import time
+import pytest
+from use_cases.background_jobs import CANCELLED, DONE, RUNNING, JobGroup
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("a condição não foi atingida a tempo")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=1)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def test_handed_off_stage_releases_the_thread(executor):
+    scheduled = Future()
+    group = JobGroup(executor)
+
+    waiting = group.ensure("gradient", lambda: scheduled)
+    local = group.ensure("table", lambda: "tabela")
+
+    # Com uma única thread, a segunda etapa só executa se a primeira a liberou
+    wait_for(lambda: local.status == DONE)
+    assert waiting.status == RUNNING
+
+    scheduled.set_result("gradiente")
+    assert waiting.status == DONE
+    assert waiting.result() == "gradiente"
+
+
+def test_handed_off_failure_fails_the_stage(executor):
+    scheduled = Future()
+    job = JobGroup(executor).ensure("gradient", lambda: scheduled)
+    wait_for(lambda: job.started_at is not None)
+
+    scheduled.set_exception(ValueError("expressão inválida"))
+    with pytest.raises(ValueError):
+        job.result()
+
+
+def test_debounced_stage_is_never_submitted_if_cancelled(executor):
+    calls = []
+    group = JobGroup(executor, delay=0.2)
+    job = group.ensure("preview", calls.append, "x")
+
+    group.cancel()
+    time.sleep(0.3)
+
+    assert calls == []
+    assert job.status == CANCELLED
+
+
+def test_debounced_stage_runs_after_the_delay(executor):
+    group = JobGroup(executor, delay=0.1)
+    started = time.monotonic()
+    job = group.ensure("preview", time.monotonic)
+
+    wait_for(lambda: job.status == DONE)
+    assert job.result() - started >= 0.1
+
+
+def test_cancelling_the_group_withdraws_queued_calculations(executor):
+    from use_cases.result_cache import ResultCache
+
+    cache = ResultCache()
+    scheduled = Future()
+    group = JobGroup(executor)
+    job = group.ensure("gradient", cache.get_or_submit, ("partial", "x*y"), lambda: scheduled)
+    wait_for(lambda: job.started_at is not None and cache.stats()["in_flight"] == 1)
+
+    # Entradas novas substituem o grupo: o cálculo ainda na fila do escalonador é retirado
+    group.cancel()
+
+    assert scheduled.cancelled()
+    assert job.status == CANCELLED
+    assert ("partial", "x*y") not in cache
@@ -0,0 +1,62 @@
+"""
+Testes do processamento em lote: ordem da saída, erros por item e leitura sob demanda.
+"""
+import io
+import json
+from derivata.batch import read_items, run_batch, write_jsonl
+
+
+def test_ordered_batch_keeps_the_input_order():
+    items = [{"id": i, "expression": f"x**{i}"} for i in range(1, 9)]
+
+    records = list(run_batch(items, workers=2, chunk_size=1))
+
+    assert [record["index"] for record in records] == list(range(8))
+    assert [record["id"] for record in records] == list(range(1, 9))
+    assert records[2]["derivative"] == "3*x**2"
+
+
+def test_unordered_batch_returns_every_item():
+    items = [{"id": i, "expression": f"x**{i}"} for i in range(1, 9)]
+
+    records = list(run_batch(items, workers=2, chunk_size=1, ordered=False))
+
+    assert sorted(record["index"] for record in records) == list(range(8))
+
+
+def test_bad_items_become_error_records_without_stopping_the_batch():
+    source = io.StringIO('{"id": 1, "expression": "x**2"}\n{"id": 2, "expression": "x**"}\n{nao e json\n"sin(x)"\n')
+    target = io.StringIO()
+
+    counts = write_jsonl(run_batch(read_items(source, "jsonl"), workers=1), target)
+
+    records = [json.loads(line) for line in target.getvalue().splitlines()]
+    assert counts == {"items": 4, "errors": 2}
+    assert [record["error"] is None for record in records] == [True, False, False, True]
+    assert records[2]["error"].startswith("JSON inválido")
+    assert records[3]["derivative"] == "cos(x)"
+
+
+def test_csv_input_skips_empty_fields():
+    source = io.StringIO("id,expression,variable,order\na,x**3,,2\nb,y**2,y,\n")
+
+    assert list(read_items(source, "csv")) == [
+        {"id": "a", "expression": "x**3", "order": "2"},
+        {"id": "b", "expression": "y**2", "variable": "y"},
+    ]
+
+
+def test_input_is_read_only_as_far_as_the_pending_chunks():
+    read = []
+
+    def items():
+        for i in range(1, 101):
+            read.append(i)
+            yield {"id": i, "expression": f"x**{i}"}
+
+    records = run_batch(items(), workers=1, chunk_size=1)
+    next(records)
+
+    # Um processo com dois blocos pendentes: a entrada não é lida adiante da janela
+    assert len(read) <= 3
+    records.close()
@@ -0,0 +1,111 @@
+"""
+Testes do formato binário dos resultados simbólicos.
+"""
+import numpy as np
+import pytest
+import sympy as sp
+from adapters.sympy_adapter import SymPyAdapter
+from domain.models import CriticalPoint, Expression
+from use_cases import binary_codec
+from use_cases.binary_codec import CodecError, FORMAT_VERSION, MAGIC
+
+
+EXPRESSIONS = [
+    "sin(x)**5*exp(x**2)*log(x)",
+    "x**3/(1 + x**2)",
+    "atan(x)*sqrt(x) + Abs(x)",
+    "Piecewise((x, x > 0), (x**2, True))",
+    "x*2.5 + pi*E + I",
+    "f(x)*x",
+]
+
+
+def roundtrip(value):
+    return binary_codec.decode(binary_codec.encode(value))
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+@pytest.mark.parametrize("order", [1, 3])
+def test_derivative_results_roundtrip_with_latex(expression, order):
+    result = SymPyAdapter.calculate_derivative(Expression(expression, ["x"]), "x", order)
+    result.latex
+
+    decoded = roundtrip(result)
+    assert decoded == result
+    assert decoded.steps == result.steps
+    # O LaTeX vem pronto no blob, sem ser renderizado de novo
+    assert decoded._latex == result._latex
+
+
+def test_partial_results_matrices_and_critical_points_roundtrip():
+    partial = SymPyAdapter.calculate_partial_derivatives(Expression("exp(x*y)*sin(x + y)", ["x", "y"]))
+    hessian = SymPyAdapter.calculate_hessian(Expression("x**3*y + y**2", ["x", "y"]))
+    points = [
+        CriticalPoint({sp.Symbol("x"): sp.Rational(1, 3), sp.Symbol("y"): -sp.sqrt(2)}, "saddle"),
+        CriticalPoint({"x": sp.Integer(0)}),
+    ]
+
+    assert roundtrip(partial) == partial
+    assert roundtrip(hessian) == hessian
+    assert roundtrip(points) == points
+
+
+def test_assumptions_and_float_precision_are_kept():
+    positive = sp.Symbol("t", positive=True)
+    precise = sp.Float("0.1", 40)
+
+    assert roundtrip(positive**2) == positive**2
+    assert roundtrip(positive).is_positive
+    decoded = roundtrip(precise)
+    assert decoded == precise and decoded._prec == precise._prec
+
+
+def test_shared_subtrees_are_stored_once():
+    x = sp.Symbol("x")
+    subtree = sp.sin(x**2 + 1) * sp.exp(x)
+    single = len(binary_codec.encode(subtree))
+    repeated = len(binary_codec.encode(sp.Tuple(*[subtree + k for k in range(10)])))
+
+    assert repeated < 5 * single
+
+
+def test_plain_values_and_arrays_roundtrip_without_copying():
+    grid = np.arange(12, dtype=np.float32).reshape(3, 4)
+    value = {"grid": grid, "n": -5, "f": 1.5, "t": (None, True, "ok"), "l": [1, "a"], "b": b"raw"}
+
+    decoded = roundtrip(value)
+    np.testing.assert_array_equal(decoded["grid"], grid)
+    assert decoded["grid"].dtype == np.float32
+    # O array aponta para o próprio blob
+    assert not decoded["grid"].flags["OWNDATA"]
+    assert (decoded["n"], decoded["f"], decoded["t"], decoded["l"]) == (-5, 1.5, (None, True, "ok"), [1, "a"])
+    assert bytes(decoded["b"]) == b"raw"
+
+
+def test_unsupported_values_are_rejected_on_encode():
+    with pytest.raises(CodecError):
+        binary_codec.encode(object())
+    with pytest.raises(CodecError):
+        binary_codec.encode(np.array([object()], dtype=object))
+
+
+def test_blob_from_another_format_version_is_rejected():
+    blob = bytearray(binary_codec.encode(sp.Symbol("x")))
+    assert bytes(blob[:4]) == MAGIC
+    blob[4] = FORMAT_VERSION + 1
+
+    with pytest.raises(CodecError, match="Versão"):
+        binary_codec.decode(bytes(blob))
+
+
+def test_foreign_and_truncated_blobs_are_rejected():
+    result = SymPyAdapter.calculate_derivative(Expression("x**2*sin(x)", ["x"]), "x", 2)
+    blob = binary_codec.encode(result)
+
+    with pytest.raises(CodecError):
+        binary_codec.decode(b"junk1234")
+    with pytest.raises(CodecError):
+        binary_codec.decode(blob[:3])
+    for size in (len(blob) // 2, len(blob) - 1):
+        with pytest.raises(CodecError):
+            binary_codec.decode(blob[:size])
@@ -0,0 +1,48 @@
+"""
+Testes do backend de nós de cálculo remotos.
+"""
+import socket
+import pytest
+import sympy as sp
+from derivata.worker import launch_local_workers
+from use_cases.compute_backend import RemoteBackend, RemoteComputeError
+
+
+@pytest.fixture(scope="module")
+def worker_address():
+    with launch_local_workers(count=1, workers=0) as addresses:
+        yield addresses[0]
+
+
+def test_remote_result_matches_local_computation(worker_address):
+    backend = RemoteBackend([worker_address])
+    try:
+        result = backend.run("derivative", "x**3*sin(x)", "x", 1)
+    finally:
+        backend.close()
+    x = sp.Symbol("x")
+    assert sp.simplify(result.result - sp.diff(x**3 * sp.sin(x), x)) == 0
+
+
+def test_connect_timeout_fails_over_to_the_next_node(worker_address):
+    backend = RemoteBackend(["10.255.255.1:8765", worker_address])
+    unreachable = backend.nodes[0]
+
+    def timing_out():
+        raise socket.timeout("timed out")
+
+    unreachable.acquire = timing_out
+    try:
+        results = [backend.run("derivative", "x**2", "x", 1) for _ in range(4)]
+    finally:
+        backend.close()
+
+    assert all(result.result == 2 * sp.Symbol("x") for result in results)
+    assert unreachable.failures == 1
+    assert not backend.stats()["nodes"][unreachable.label]["available"]
+
+
+def test_no_reachable_node_reports_every_failure():
+    backend = RemoteBackend(["127.0.0.1:1"])
+    with pytest.raises(RemoteComputeError, match="Nenhum nó"):
+        backend.run("derivative", "x**2", "x", 1)
@@ -0,0 +1,158 @@
+"""
+Testes do escalonador de cálculos: rodízio entre sessões, prioridades, cotas e
+recuperação do pool de processos.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Event, Lock
+import math
+import os
+import time
+import pytest
+from use_cases.compute_scheduler import HEAVY, LIGHT, ComputeScheduler, QuotaExceeded
+
+
+class Recorder:
+    """Cálculos de teste que registram a ordem em que executam."""
+
+    def __init__(self):
+        self.order = []
+        self._lock = Lock()
+
+    def task(self, name):
+        def run():
+            with self._lock:
+                self.order.append(name)
+            return name
+        return run
+
+
+def thread_scheduler(monkeypatch, **options) -> ComputeScheduler:
+    """Escalonador com um pool de threads no lugar dos processos (cálculos locais, não serializáveis)."""
+    scheduler = ComputeScheduler(**options)
+    executor = ThreadPoolExecutor(scheduler.workers)
+    monkeypatch.setattr(scheduler, "_pool", lambda: executor)
+    return scheduler
+
+
+def hold_pool(scheduler: ComputeScheduler, gate: Event, session: str = "gate"):
+    """Ocupa o único processo do pool até `gate`, para que os cálculos seguintes se acumulem nas filas."""
+    started = Event()
+
+    def block():
+        started.set()
+        gate.wait(5)
+
+    future = scheduler.submit(block, session=session)
+    assert started.wait(5)
+    return future
+
+
+def test_sessions_are_served_in_rotation(monkeypatch):
+    scheduler = thread_scheduler(monkeypatch, workers=1)
+    recorder, gate = Recorder(), Event()
+    hold_pool(scheduler, gate)
+
+    futures = [scheduler.submit(recorder.task(f"a{i}"), session="a") for i in range(3)]
+    futures.append(scheduler.submit(recorder.task("b0"), session="b"))
+    gate.set()
+    for future in futures:
+        future.result(5)
+
+    assert recorder.order == ["a0", "b0", "a1", "a2"]
+
+
+def test_light_tasks_go_before_heavy_ones(monkeypatch):
+    scheduler = thread_scheduler(monkeypatch, workers=1)
+    recorder, gate = Recorder(), Event()
+    hold_pool(scheduler, gate)
+
+    heavy = scheduler.submit(recorder.task("heavy"), priority=HEAVY, session="a")
+    light = scheduler.submit(recorder.task("light"), priority=LIGHT, session="a")
+    gate.set()
+    heavy.result(5), light.result(5)
+
+    assert recorder.order == ["light", "heavy"]
+
+
+def test_heavy_tasks_leave_the_reserved_worker_to_light_ones(monkeypatch):
+    scheduler = thread_scheduler(monkeypatch, workers=2, reserved_light_workers=1)
+    gate = Event()
+    heavy = [scheduler.submit(gate.wait, 5, priority=HEAVY, session=f"s{i}") for i in range(2)]
+    time.sleep(0.1)
+
+    metrics = scheduler.metrics()
+    assert metrics["running_heavy"] == 1 and metrics["queued_heavy"] == 1
+    assert scheduler.submit(math.factorial, 5, session="light").result(5) == 120
+
+    gate.set()
+    for future in heavy:
+        future.result(5)
+
+
+def test_full_session_queue_is_rejected(monkeypatch):
+    scheduler = thread_scheduler(monkeypatch, workers=1, max_queued_per_session=2)
+    gate = Event()
+    hold_pool(scheduler, gate)
+
+    queued = [scheduler.submit(math.factorial, 3, session="a") for _ in range(2)]
+    with pytest.raises(QuotaExceeded):
+        scheduler.submit(math.factorial, 3, session="a")
+    # A cota é por sessão: as demais continuam sendo aceitas
+    other = scheduler.submit(math.factorial, 3, session="b")
+
+    gate.set()
+    assert [future.result(5) for future in queued + [other]] == [6, 6, 6]
+    assert scheduler.metrics()["rejected"] == 1
+
+
+def test_session_over_cpu_quota_waits_for_the_others(monkeypatch):
+    scheduler = thread_scheduler(monkeypatch, workers=1, cpu_quota=0.01)
+    recorder, gate = Recorder(), Event()
+
+    def burn():
+        deadline = time.process_time() + 0.05
+        while time.process_time() < deadline:
+            pass
+
+    scheduler.submit(burn, session="a").result(5)
+    hold_pool(scheduler, gate)
+    over_quota = scheduler.submit(recorder.task("a"), session="a")
+    within_quota = scheduler.submit(recorder.task("b"), session="b")
+    gate.set()
+    over_quota.result(5), within_quota.result(5)
+
+    assert recorder.order == ["b", "a"]
+
+
+def test_pool_is_recreated_after_a_worker_dies():
+    scheduler = ComputeScheduler(workers=2)
+    try:
+        assert scheduler.run(math.factorial, 5) == 120
+        with pytest.raises(BrokenProcessPool):
+            scheduler.run(os._exit, 1)
+
+        # Os cálculos seguintes vão para um pool novo
+        assert scheduler.run(math.factorial, 6) == 720
+        assert [scheduler.submit(math.factorial, n).result(30) for n in range(3, 6)] == [6, 24, 120]
+        metrics = scheduler.metrics()
+        assert metrics["pool_restarts"] == 1 and metrics["running"] == 0
+    finally:
+        scheduler.shutdown()
+
+
+def test_cancelled_tasks_leave_the_queue(monkeypatch):
+    scheduler = thread_scheduler(monkeypatch, workers=1, max_queued_per_session=2)
+    recorder, gate = Recorder(), Event()
+    hold_pool(scheduler, gate)
+
+    superseded = [scheduler.submit(recorder.task(f"old{i}"), session="a") for i in range(2)]
+    for future in superseded:
+        assert future.cancel()
+    # A fila da sessão tem vaga de novo: os cálculos cancelados não contam para a cota
+    current = scheduler.submit(recorder.task("new"), session="a")
+    gate.set()
+
+    assert current.result(5) == "new"
+    assert recorder.order == ["new"]
+    assert scheduler.metrics()["withdrawn"] == 2
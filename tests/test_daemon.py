@@ -0,0 +1,70 @@
+"""
+Testes do daemon de derivadas e do seu cliente pelo socket Unix.
+"""
+import os
+import tempfile
+import threading
+import pytest
+from derivata.client import DaemonClient, DaemonUnavailable
+from derivata.daemon import DerivativeDaemon
+
+
+@pytest.fixture
+def socket_path():
+    # Diretório curto: o caminho de um socket Unix é limitado a ~100 caracteres
+    directory = tempfile.mkdtemp(prefix="derivata-")
+    yield os.path.join(directory, "d.sock")
+    for name in os.listdir(directory):
+        os.unlink(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+@pytest.fixture
+def daemon(socket_path):
+    server = DerivativeDaemon(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(5)
+
+
+def test_requests_share_one_connection(daemon, socket_path):
+    with DaemonClient(socket_path, autostart=False) as client:
+        assert client.request({"op": "ping", "id": 1})["pong"] is True
+        first = client.request({"id": 2, "expression": "x**3", "order": 2})
+        second = client.request({"id": 3, "op": "gradient", "expression": "x*y"})
+        sock = client._sock
+
+    assert first["derivative"] == "6*x" and first["error"] is None
+    assert second["derivatives"] == {"x": "y", "y": "x"}
+    assert sock.fileno() == -1
+    assert daemon.requests == 3
+
+
+def test_errors_are_returned_and_the_connection_stays_open(daemon, socket_path):
+    with DaemonClient(socket_path, autostart=False) as client:
+        failed = client.request({"id": 1, "expression": "x**"})
+        stats = client.request({"op": "stats"})
+
+    assert failed["id"] == 1 and failed["error"]
+    assert stats["requests"] == 2
+    assert "hits" in stats["result_cache"]
+
+
+def test_missing_daemon_without_autostart_is_reported(socket_path):
+    with pytest.raises(DaemonUnavailable):
+        DaemonClient(socket_path, autostart=False).request({"op": "ping"})
+
+
+def test_client_starts_the_daemon_on_demand(socket_path):
+    client = DaemonClient(socket_path, start_timeout=60, idle_timeout=60)
+    try:
+        response = client.request({"id": 1, "expression": "sin(x)"})
+        assert response["derivative"] == "cos(x)"
+        assert client.request({"op": "ping"})["pid"] != os.getpid()
+    finally:
+        if os.path.exists(socket_path):
+            assert client.request({"op": "shutdown"})["stopping"] is True
+        client.close()
@@ -0,0 +1,86 @@
+"""
+Testes do cache persistente em disco: validade, despejo por tamanho, troca de
+formato e recuperação de arquivos danificados.
+"""
+import os
+import time
+from adapters import disk_cache
+from adapters.disk_cache import DiskCache
+
+
+def test_values_survive_reopening(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    DiskCache(path, 1024 * 1024).put("chave", {"valor": [1, 2, 3]})
+
+    reopened = DiskCache(path, 1024 * 1024)
+    assert reopened.get("chave") == {"valor": [1, 2, 3]}
+    assert "chave" in reopened and "outra" not in reopened
+
+
+def test_expired_entries_are_not_served(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite3", 1024 * 1024, ttl=0.2)
+    cache.put("chave", 1)
+    assert cache.get("chave") == 1
+
+    time.sleep(0.3)
+    assert "chave" not in cache
+    assert cache.get("chave", "ausente") == "ausente"
+    assert cache.stats()["expired"] == 1
+
+
+def test_size_limit_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "EVICT_CHECK_EVERY", 1)
+    cache = DiskCache(tmp_path / "cache.sqlite3", max_bytes=8000)
+    for index in range(20):
+        # Bytes aleatórios não comprimem: cada entrada ocupa cerca de 1 KB
+        cache.put(f"chave-{index}", os.urandom(1000))
+
+    stats = cache.stats()
+    assert stats["evicted"] > 0
+    assert stats["bytes"] <= 8000
+    assert "chave-19" in cache and "chave-0" not in cache
+
+
+def test_other_format_version_discards_entries(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    DiskCache(path, 1024 * 1024, format_version="1").put("chave", 1)
+
+    assert DiskCache(path, 1024 * 1024, format_version="1").get("chave") == 1
+    upgraded = DiskCache(path, 1024 * 1024, format_version="2")
+    assert upgraded.get("chave") is None
+    upgraded.put("chave", 2)
+    assert DiskCache(path, 1024 * 1024, format_version="2").get("chave") == 2
+
+
+def test_damaged_file_is_set_aside_and_recreated(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    path.write_bytes(b"isto nao e um banco sqlite" * 100)
+
+    cache = DiskCache(path, 1024 * 1024)
+    assert cache.put("chave", 1)
+    assert cache.get("chave") == 1
+    assert not cache.disabled
+    assert (tmp_path / "cache.sqlite3.corrupt").exists()
+
+
+def test_unreadable_entry_is_dropped(tmp_path):
+    def failing_loads(data):
+        raise ValueError("entrada ilegível")
+
+    path = tmp_path / "cache.sqlite3"
+    DiskCache(path, 1024 * 1024).put("chave", 1)
+
+    cache = DiskCache(path, 1024 * 1024, loads=failing_loads)
+    assert cache.get("chave", "ausente") == "ausente"
+    assert cache.stats()["corrupt"] == 1
+    assert "chave" not in cache
+
+
+def test_unwritable_location_disables_the_cache(tmp_path):
+    blocker = tmp_path / "arquivo"
+    blocker.write_text("não é um diretório")
+
+    cache = DiskCache(blocker / "cache.sqlite3", 1024 * 1024)
+    assert not cache.put("chave", 1)
+    assert cache.get("chave", "ausente") == "ausente"
+    assert cache.disabled
@@ -0,0 +1,69 @@
+"""
+Testes do despacho de requisições JSON comum ao lote, ao pipe e à API.
+"""
+import io
+import json
+import pytest
+from derivata import dispatch
+from derivata.dispatch import handle_request
+from derivata.pipe import serve_pipe
+
+
+@pytest.fixture
+def exploding_op(monkeypatch):
+    def explode(request, include_steps):
+        raise ZeroDivisionError("divisão por zero no serviço")
+
+    monkeypatch.setitem(dispatch.OPERATIONS, "explode", explode)
+
+
+def test_unexpected_errors_become_error_records(exploding_op):
+    response = handle_request({"id": 7, "op": "explode", "expression": "x"})
+
+    assert response["id"] == 7
+    assert "ZeroDivisionError" in response["error"]
+    assert "elapsed_ms" in response
+
+
+def test_sequential_pipe_survives_an_unexpected_error(exploding_op):
+    lines = [
+        {"id": 1, "op": "explode", "expression": "x"},
+        {"id": 2, "op": "diff", "expression": "x**3"},
+    ]
+    source = io.StringIO("".join(json.dumps(line) + "\n" for line in lines))
+    target = io.StringIO()
+
+    counts = serve_pipe(source, target, workers=0)
+
+    responses = [json.loads(line) for line in target.getvalue().splitlines()]
+    assert counts == {"requests": 2, "errors": 1}
+    assert [response["id"] for response in responses] == [1, 2]
+    assert responses[1]["derivative"] == "3*x**2"
+
+
+class RecordingSource(io.StringIO):
+    """Entrada que registra, a cada linha lida, quantas requisições ainda aguardavam resposta."""
+
+    def __init__(self, text, target):
+        super().__init__(text)
+        self.target = target
+        self.pending = []
+
+    def readline(self, *args):
+        line = super().readline(*args)
+        if line:
+            self.pending.append(len(self.pending) - self.target.getvalue().count("\n"))
+        return line
+
+
+def test_pipe_stops_reading_while_the_pool_is_full():
+    target = io.StringIO()
+    source = RecordingSource("".join(json.dumps({"id": i, "expression": f"x**{i}"}) + "\n" for i in range(1, 21)), target)
+
+    counts = serve_pipe(source, target, workers=1, max_in_flight=2)
+
+    responses = [json.loads(line) for line in target.getvalue().splitlines()]
+    assert counts == {"requests": 20, "errors": 0}
+    assert sorted(response["index"] for response in responses) == list(range(20))
+    # Nenhuma linha é lida com mais de `max_in_flight` requisições sem resposta
+    assert max(source.pending) <= 2
@@ -0,0 +1,85 @@
+"""
+Testes do snapshot pré-calculado dos exemplos.
+"""
+import pickle
+import zlib
+import plotly.graph_objects as go
+import pytest
+import sympy as sp
+from adapters.figure_cache import FigureCache
+from adapters.sympy_adapter import SymPyAdapter
+from use_cases.derivative_service import DerivativeService
+from use_cases.example_snapshot import (
+    SNAPSHOT_VERSION,
+    load_snapshot,
+    read_snapshot,
+    start_snapshot_loader,
+    write_snapshot
+)
+from use_cases.result_cache import ResultCache
+
+
+FIGURE_KEY = FigureCache.make_key("x**2", ["x"], (-1, 1), 10, "test")
+
+
+@pytest.fixture
+def snapshot():
+    """Snapshot pequeno, no formato do build_snapshot, com uma derivada e uma figura."""
+    result_cache = ResultCache()
+    DerivativeService(SymPyAdapter(), result_cache).calculate_derivative("x**3", "x", 2)
+    figure_cache = FigureCache()
+    figure_cache.put(FIGURE_KEY, go.Figure(go.Scatter(x=[0, 1], y=[0, 1])), None)
+    return {
+        "version": SNAPSHOT_VERSION,
+        "sympy": sp.__version__,
+        "results": result_cache.items(),
+        "figures": [(key, cached.json, cached.error) for key, cached in figure_cache.items()]
+    }
+
+
+def test_written_snapshot_fills_empty_caches(snapshot, tmp_path):
+    path = tmp_path / "snapshot.bin"
+    write_snapshot(snapshot, path)
+    result_cache, figure_cache = ResultCache(), FigureCache()
+
+    assert load_snapshot(read_snapshot(path), result_cache, figure_cache) == 2
+    # O serviço encontra a derivada no cache, sem recalculá-la
+    service = DerivativeService(SymPyAdapter(), result_cache)
+    assert service.is_derivative_cached("x**3", "x", 2)
+    assert service.calculate_derivative("x**3", "x", 2).result == 6 * sp.Symbol("x")
+    assert figure_cache.get(FIGURE_KEY).to_figure().data[0].y == (0, 1)
+
+
+def test_loading_keeps_existing_entries(snapshot):
+    result_cache = ResultCache()
+    key, _ = snapshot["results"][0]
+    result_cache.put(key, "recente")
+
+    assert load_snapshot(snapshot, result_cache, FigureCache()) == 1
+    assert result_cache.get_or_compute(key, lambda: "recalculado") == "recente"
+
+
+@pytest.mark.parametrize("change", [{"version": SNAPSHOT_VERSION - 1}, {"sympy": "0.0"}])
+def test_snapshots_of_other_versions_are_ignored(snapshot, tmp_path, change):
+    path = tmp_path / "snapshot.bin"
+    write_snapshot(dict(snapshot, **change), path)
+
+    assert read_snapshot(path) is None
+
+
+def test_missing_or_corrupt_snapshots_are_ignored(tmp_path):
+    corrupt = tmp_path / "corrupt.bin"
+    corrupt.write_bytes(zlib.compress(b"nao e um pickle"))
+
+    assert read_snapshot(tmp_path / "missing.bin") is None
+    assert read_snapshot(corrupt) is None
+
+
+def test_loader_reads_the_snapshot_in_the_background(snapshot, tmp_path):
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(zlib.compress(pickle.dumps(snapshot)))
+    result_cache = ResultCache()
+
+    start_snapshot_loader(result_cache, FigureCache(), path).join(30)
+
+    assert len(result_cache.items()) == len(snapshot["results"])
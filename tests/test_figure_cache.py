@@ -0,0 +1,43 @@
+"""
+Testes do cache de figuras compartilhado entre sessões.
+"""
+import plotly.graph_objects as go
+from adapters.figure_cache import FigureCache
+
+
+def make_figure() -> go.Figure:
+    return go.Figure(go.Scatter(x=[0, 1, 2], y=[0, 1, 4]), layout={"title": {"text": "original"}})
+
+
+def test_each_get_returns_an_independent_figure():
+    cache = FigureCache()
+    key = cache.make_key("x**2", ["x"], (-1, 1), 10, "test")
+    original = make_figure()
+    cache.put(key, original, None)
+
+    first = cache.get(key).to_figure()
+    second = cache.get(key).to_figure()
+    first.update_layout(title="alterada")
+
+    assert first is not second and first is not original
+    assert second.layout.title.text == "original"
+    assert cache.get(key).to_figure().layout.title.text == "original"
+
+
+def test_original_figure_stays_with_the_caller():
+    cache = FigureCache()
+    key = cache.make_key("x**2", ["x"], (-1, 1), 10, "test")
+    original = make_figure()
+    cache.put(key, original, None)
+    original.update_layout(title="alterada")
+
+    assert cache.get(key).to_figure().layout.title.text == "original"
+
+
+def test_errors_are_cached_without_figure():
+    cache = FigureCache()
+    key = cache.make_key("1/0", ["x"], (-1, 1), 10, "test")
+    cache.put(key, None, "erro")
+
+    cached = cache.get(key)
+    assert cached.to_figure() is None and cached.error == "erro"
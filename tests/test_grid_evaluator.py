@@ -0,0 +1,71 @@
+"""
+Testes da avaliação de expressões em grades: blocos paralelos e backends.
+"""
+import numpy as np
+import pytest
+import sympy as sp
+from adapters.grid_evaluator import GridEvaluator
+
+
+x, y = sp.symbols("x y")
+EXPRESSION = sp.sin(x) * sp.exp(-y**2) + x**2 * y
+
+# Grade acima de MIN_PARALLEL_POINTS, para que a avaliação paralela seja usada
+X_RANGE = np.linspace(-3, 3, 300)
+Y_RANGE = np.linspace(-2, 2, 280)
+
+
+def reference(expr, x_range=X_RANGE, y_range=Y_RANGE):
+    """Avaliação serial direta na grade completa."""
+    xs, ys = np.meshgrid(x_range, y_range)
+    return sp.lambdify((x, y), expr, "numpy")(xs, ys)
+
+
+@pytest.fixture
+def evaluator():
+    evaluator = GridEvaluator(workers=4, block_rows=32, backend="numpy")
+    yield evaluator
+    evaluator.shutdown()
+
+
+def test_parallel_blocks_match_the_serial_result(evaluator):
+    serial = GridEvaluator(workers=1, backend="numpy").evaluate(EXPRESSION, X_RANGE, Y_RANGE)
+    parallel = evaluator.evaluate(EXPRESSION, X_RANGE, Y_RANGE)
+
+    assert parallel.shape == (280, 300)
+    assert np.array_equal(parallel, serial)
+    assert np.allclose(parallel, reference(EXPRESSION))
+
+
+def test_blocks_are_written_into_the_given_output(evaluator):
+    out = np.zeros((300, 300))
+    kernel = evaluator.compile(EXPRESSION)
+
+    evaluator.evaluate_kernel(kernel, X_RANGE, Y_RANGE[:100], out=out, row_offset=20)
+
+    assert np.all(out[:20] == 0) and np.all(out[120:] == 0)
+    assert np.allclose(out[20:120], reference(EXPRESSION, y_range=Y_RANGE[:100]))
+
+
+def test_constants_and_complex_values(evaluator):
+    assert np.all(evaluator.evaluate(sp.Integer(3), X_RANGE, Y_RANGE) == 3)
+
+    roots = evaluator.evaluate(sp.sqrt(x), X_RANGE, Y_RANGE)
+    assert np.isnan(roots[:, X_RANGE < 0]).all()
+    assert np.allclose(roots[:, X_RANGE >= 0], np.sqrt(X_RANGE[X_RANGE >= 0]))
+
+
+def test_numexpr_backend_matches_numpy():
+    pytest.importorskip("numexpr")
+    evaluator = GridEvaluator(workers=4, block_rows=32, backend="numexpr")
+    try:
+        assert np.allclose(evaluator.evaluate(EXPRESSION, X_RANGE, Y_RANGE), reference(EXPRESSION))
+        # Funções sem suporte no numexpr caem para o NumPy
+        assert np.allclose(evaluator.evaluate(sp.sign(x) * y, X_RANGE, Y_RANGE), reference(sp.sign(x) * y))
+    finally:
+        evaluator.shutdown()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        GridEvaluator(backend="cuda")
@@ -0,0 +1,75 @@
+"""
+Testes das respostas de erro da API HTTP.
+"""
+import asyncio
+import json
+import os
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from derivata.http_api import DerivativeApi, default_workers
+
+
+async def request(api: DerivativeApi, target: str):
+    """Envia um GET ao servidor da API e retorna (status, corpo JSON)."""
+    server = await asyncio.start_server(api.handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode("latin-1"))
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), 120)
+        writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), json.loads(body)
+
+
+@pytest.fixture
+def api():
+    api = DerivativeApi(workers=1)
+    yield api
+    api.close()
+
+
+def test_unexpected_errors_get_a_500_response(api, monkeypatch):
+    async def failing_route(method, target, body):
+        raise RuntimeError("falha inesperada")
+
+    monkeypatch.setattr(api, "route", failing_route)
+    status, payload = asyncio.run(request(api, "/health"))
+
+    assert status == 500
+    assert "falha inesperada" in payload["error"]
+
+
+def test_broken_pool_answers_503_and_is_replaced(api):
+    broken = api.executor
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result(timeout=60)
+
+    status, payload = asyncio.run(request(api, "/derivative?expression=x**2"))
+    assert status == 503 and "error" in payload
+    assert api.executor is not broken and api.pool_restarts == 1
+
+    status, payload = asyncio.run(request(api, "/derivative?expression=x**2"))
+    assert status == 200
+    assert payload["error"] is None
+
+
+def test_default_pool_leaves_cores_for_the_app(monkeypatch):
+    monkeypatch.delenv("DERIVATA_API_WORKERS", raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    assert default_workers() == 4
+    monkeypatch.setattr(os, "cpu_count", lambda: 1)
+    assert default_workers() == 1
+    monkeypatch.setenv("DERIVATA_API_WORKERS", "3")
+    assert default_workers() == 3
+
+
+@pytest.mark.parametrize("order", ["0", "11", "1000", "dez"])
+def test_derivative_figures_reject_orders_out_of_range(api, order):
+    status, payload = asyncio.run(request(api, f"/figure?expression=x**2&kind=derivatives&order={order}"))
+
+    assert status == 400
+    assert "ordem" in payload["error"].lower()
+    # A requisição é recusada antes de chegar ao pool
+    assert api.coalescer.stats()["computed"] == 0
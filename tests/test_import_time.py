@@ -0,0 +1,29 @@
+"""
+Testes das importações sob demanda: clientes leves não carregam SymPy nem Streamlit.
+"""
+from pathlib import Path
+import subprocess
+import sys
+import pytest
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def imported_after(module: str):
+    """Módulos pesados presentes em sys.modules depois de importar `module` em um processo novo."""
+    code = (
+        f"import sys, {module}; "
+        "print(' '.join(name for name in ('sympy', 'streamlit', 'plotly', 'pandas') if name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize("module", ["derivata", "derivata.client", "derivata.http_api", "derivata.dispatch"])
+def test_light_clients_do_not_import_heavy_dependencies(module):
+    assert imported_after(module) == []
+
+
+def test_library_api_imports_sympy_on_first_use():
+    assert imported_after("derivata.api") == ["sympy"]
@@ -0,0 +1,64 @@
+"""
+Testes da renderização de LaTeX: memoização e abreviação de resultados grandes.
+"""
+import sympy as sp
+from use_cases.latex_renderer import LatexRenderer
+from use_cases.result_cache import ResultCache
+
+
+x = sp.Symbol("x")
+
+# Soma com 200 termos, acima de MAX_SIMPLIFY_NODES
+LONG_SUM = sum(x**i / (i + 1) for i in range(200))
+
+# Terceira derivada com muitas subexpressões repetidas (~1200 caracteres de LaTeX)
+LARGE = sp.diff(sp.sin(sp.exp(x**2 + 1) * sp.cos(x))**3, x, 3)
+
+
+def test_small_expressions_are_rendered_in_full_once():
+    cache = ResultCache()
+    renderer = LatexRenderer(cache)
+
+    first = renderer.render(x**2 / 3)
+    second = renderer.render(x**2 / 3)
+
+    assert first.latex == sp.latex(x**2 / 3)
+    assert not first.abbreviated and first.full_text is None
+    assert second is first
+    assert cache.stats()["hits"] == 1
+
+
+def test_repeated_subexpressions_are_named():
+    rendered = LatexRenderer(ResultCache(), max_chars=800).render(LARGE)
+
+    assert rendered.abbreviated
+    assert "subexpressões" in rendered.note
+    assert r"\text{onde }" in rendered.latex and "c_{0}" in rendered.latex
+    assert len(rendered.latex) <= 800
+    assert rendered.full_text == sp.sstr(LARGE)
+
+
+def test_long_sums_are_truncated_with_the_omitted_count():
+    rendered = LatexRenderer(ResultCache(), max_chars=300).render(LONG_SUM)
+
+    assert rendered.abbreviated and rendered.latex.endswith(r"\cdots")
+    assert "termo(s) omitido(s)" in rendered.note
+    assert len(rendered.latex) < len(sp.latex(LONG_SUM)) / 10
+    assert rendered.full_text == sp.sstr(LONG_SUM)
+
+
+def test_simplification_is_memoized_and_skipped_for_large_expressions():
+    cache = ResultCache()
+    renderer = LatexRenderer(cache)
+
+    assert renderer.simplify(sp.sin(x)**2 + sp.cos(x)**2) == 1
+    assert renderer.simplify(sp.sin(x)**2 + sp.cos(x)**2) == 1
+    assert cache.stats()["hits"] == 1
+    # Acima de MAX_SIMPLIFY_NODES a expressão volta como está, sem passar pelo cache
+    assert renderer.simplify(LONG_SUM) is LONG_SUM
+
+
+def test_mutable_matrices_are_rendered():
+    renderer = LatexRenderer(ResultCache())
+
+    assert renderer.latex(sp.Matrix([[x, 1], [0, x]])) == sp.latex(sp.ImmutableMatrix([[x, 1], [0, x]]))
@@ -0,0 +1,86 @@
+"""
+Testes dos modelos de domínio: internamento, imutabilidade e o contrato hash/igualdade.
+"""
+import pickle
+import pytest
+import sympy as sp
+from domain.models import CriticalPoint, DerivativeResult, Expression, PartialDerivativeResult, hessian_matrix
+
+
+x, y = sp.symbols("x y")
+
+
+def test_expressions_are_interned_while_in_use():
+    first = Expression("x**2*y", ["x", "y"])
+
+    assert Expression("x**2*y", ("x", "y")) is first
+    assert Expression("x**2*y", ["y", "x"]) is not first
+    # A leitura de um pickle passa pelo internamento
+    assert pickle.loads(pickle.dumps(first)) is first
+
+
+def test_equivalent_expressions_are_equal_with_equal_hashes():
+    assert Expression("x*y", ["x", "y"]) == Expression("y*x", ["x", "y"])
+    assert hash(Expression("x*y", ["x", "y"])) == hash(Expression("y*x", ["x", "y"]))
+    assert Expression("x*y", ["x", "y"]) != Expression("x*y", ["y", "x"])
+
+
+def test_partial_results_do_not_depend_on_insertion_order():
+    expression = Expression("x**2*y", ["x", "y"])
+    forward = PartialDerivativeResult(expression, {"x": 2*x*y, "y": x**2}, {"x": ["a"], "y": ["b"]})
+    backward = PartialDerivativeResult(expression, {"y": x**2, "x": 2*x*y}, {"y": ["b"], "x": ["a"]})
+
+    assert forward == backward
+    assert hash(forward) == hash(backward)
+    assert len({forward, backward}) == 1
+    # A vista em dicionário segue a ordem das variáveis da expressão
+    assert list(backward.derivatives) == ["x", "y"]
+    assert backward.gradient == [2*x*y, x**2]
+
+
+def test_critical_points_do_not_depend_on_insertion_order():
+    forward = CriticalPoint({x: 0, y: 1}, "minimum")
+    backward = CriticalPoint({"y": 1, "x": 0}, "minimum")
+
+    assert forward == backward
+    assert hash(forward) == hash(backward)
+    assert forward.coordinates == {"x": 0, "y": 1}
+    assert forward != CriticalPoint({"x": 0, "y": 1}, "saddle")
+
+
+@pytest.mark.parametrize("value", [
+    PartialDerivativeResult(Expression("x*y", ["x", "y"]), {"x": y, "y": x}, {"x": ["a"], "y": ["b"]}),
+    CriticalPoint({"x": 0, "y": 0}, None),
+])
+def test_results_are_immutable(value):
+    with pytest.raises(AttributeError):
+        value.classification = "minimum"
+    # A vista é uma cópia: alterá-la não altera o modelo
+    view = value.coordinates if isinstance(value, CriticalPoint) else value.derivatives
+    view["z"] = sp.Integer(1)
+    assert "z" not in (value.coordinates if isinstance(value, CriticalPoint) else value.derivatives)
+
+
+def test_pickle_roundtrip_recomputes_the_hash():
+    result = PartialDerivativeResult(Expression("x*y", ["x", "y"]), {"x": y, "y": x}, {"x": ["a"], "y": ["b"]})
+    hash(result)
+
+    restored = pickle.loads(pickle.dumps(result))
+    assert restored == result
+    assert restored._hash is None
+    assert hash(restored) == hash(result)
+
+
+def test_steps_are_interned():
+    first = DerivativeResult(Expression("x**2", ["x"]), "x", 1, 2*x, ["Expressão" + " original"])
+    second = PartialDerivativeResult(Expression("x**2", ["x"]), {"x": 2*x}, {"x": ["Expressão original"]})
+
+    assert first.steps[0] is second.steps["x"][0]
+
+
+def test_hessian_of_partial_results_matches_the_domain_helper():
+    expression = Expression("x**3*y + y**2", ["x", "y"])
+    result = PartialDerivativeResult(expression, {"y": x**3 + 2*y, "x": 3*x**2*y}, {})
+
+    assert result.get_hessian() == hessian_matrix(expression.sympy_expr, ["x", "y"])
+    assert result.get_hessian() == sp.Matrix([[6*x*y, 3*x**2], [3*x**2, 2]])
@@ -0,0 +1,35 @@
+"""
+Testes da espera do pré-cálculo pela carga de primeiro plano.
+"""
+from threading import Event, Thread
+from use_cases import compute_tasks
+from use_cases.compute_backend import InlineBackend
+from use_cases import prefetcher
+from use_cases.prefetcher import system_busy
+
+
+def test_synchronous_backend_work_makes_the_prefetcher_wait(monkeypatch):
+    started, release = Event(), Event()
+
+    def blocking_task():
+        started.set()
+        release.wait(5)
+        return 1
+
+    monkeypatch.setitem(compute_tasks.TASKS, "blocking", blocking_task)
+    monkeypatch.setattr(prefetcher.os, "getloadavg", lambda: (0.0, 0.0, 0.0))
+    backend = InlineBackend()
+    assert not system_busy(backend)
+
+    worker = Thread(target=backend.run, args=("blocking",))
+    worker.start()
+    assert started.wait(5)
+    try:
+        assert backend.pending() == 1
+        assert system_busy(backend)
+    finally:
+        release.set()
+        worker.join(5)
+
+    assert backend.pending() == 0
+    assert not system_busy(backend)
@@ -0,0 +1,52 @@
+"""
+Testes dos recursos construídos uma única vez por processo.
+"""
+import base64
+from streamlit.testing.v1 import AppTest
+from presentation.styles import cyberpunk_theme
+
+
+def services_script():
+    import streamlit as st
+    from presentation.resources import get_services
+
+    st.text(str(id(get_services())))
+    st.text(str(id(get_services().visualization_service.plotly_adapter.grid_evaluator)))
+
+
+def test_services_are_shared_by_reruns_and_sessions(monkeypatch):
+    monkeypatch.setenv("DERIVATA_COMPUTE", "inline")
+    monkeypatch.setenv("DERIVATA_RESULT_CACHE", "off")
+    first = AppTest.from_function(services_script, default_timeout=60)
+    second = AppTest.from_function(services_script, default_timeout=60)
+
+    first.run()
+    ids = [element.value for element in first.text]
+    assert len(ids) == 2
+    first.run()
+    second.run()
+
+    assert not first.exception and not second.exception
+    assert [element.value for element in first.text] == ids
+    assert [element.value for element in second.text] == ids
+
+
+def test_theme_css_is_minified_once():
+    css = cyberpunk_theme.compile_cyberpunk_css()
+
+    assert css is cyberpunk_theme.compile_cyberpunk_css()
+    assert css.startswith("<style>") and css.endswith("</style>")
+    assert "/*" not in css and "\n" not in css
+    assert len(css) < len(cyberpunk_theme.CYBERPUNK_CSS)
+
+
+def test_logo_does_not_depend_on_the_working_directory(monkeypatch, tmp_path):
+    cyberpunk_theme.get_svg_base64.cache_clear()
+    monkeypatch.chdir(tmp_path)
+    try:
+        logo = cyberpunk_theme.get_svg_base64()
+    finally:
+        cyberpunk_theme.get_svg_base64.cache_clear()
+
+    assert logo is not None
+    assert base64.b64decode(logo).decode() == cyberpunk_theme.LOGO_PATH.read_text()
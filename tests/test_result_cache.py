@@ -0,0 +1,62 @@
+"""
+Testes do cache de resultados com a camada em disco.
+"""
+import sympy as sp
+import pytest
+from adapters.disk_cache import DiskCache
+from use_cases.result_cache import ResultCache, make_disk_key
+
+
+def test_disk_keys_distinguish_assumptions_and_precision():
+    plain, positive = sp.Symbol("x"), sp.Symbol("x", positive=True)
+    assert make_disk_key(("latex", plain)) != make_disk_key(("latex", positive))
+    assert make_disk_key(("simplify", sp.Float("0.1", 15))) != make_disk_key(("simplify", sp.Float("0.1", 30)))
+    assert make_disk_key(("latex", plain)) == make_disk_key(("latex", sp.Symbol("x")))
+
+
+def test_results_survive_a_restart_under_distinct_keys(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    plain, positive = sp.Symbol("x"), sp.Symbol("x", positive=True)
+    cache = ResultCache(disk=DiskCache(path, 1024 * 1024))
+    cache.get_or_compute(("simplify", sp.sqrt(plain**2)), lambda: sp.sqrt(plain**2))
+    cache.get_or_compute(("simplify", sp.sqrt(positive**2)), lambda: positive)
+
+    restarted = ResultCache(disk=DiskCache(path, 1024 * 1024))
+
+    def not_expected():
+        pytest.fail("o resultado deveria vir do disco")
+
+    assert restarted.get_or_compute(("simplify", sp.sqrt(plain**2)), not_expected) == sp.sqrt(plain**2)
+    assert restarted.get_or_compute(("simplify", sp.sqrt(positive**2)), not_expected) == positive
+
+
+def test_failed_results_are_not_persisted(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    cache = ResultCache(disk=DiskCache(path, 1024 * 1024))
+    cache.get_or_compute(("derivative", "x"), lambda: None)
+
+    assert ("derivative", "x") not in ResultCache(disk=DiskCache(path, 1024 * 1024))
+
+
+def test_failed_results_are_computed_again():
+    cache = ResultCache()
+    outcomes = iter([None, "x**2"])
+
+    assert cache.get_or_compute(("derivative", "x"), lambda: next(outcomes)) is None
+    assert ("derivative", "x") not in cache
+    assert cache.get_or_compute(("derivative", "x"), lambda: next(outcomes)) == "x**2"
+
+
+def test_unsolvable_critical_points_are_a_failure(monkeypatch):
+    from adapters import sympy_adapter
+    from use_cases.partial_derivative_service import PartialDerivativeService
+
+    def give_up(*args, **kwargs):
+        raise NotImplementedError("sistema sem solução fechada")
+
+    monkeypatch.setattr(sympy_adapter.sp, "solve", give_up)
+    cache = ResultCache()
+    service = PartialDerivativeService(sympy_adapter.SymPyAdapter(), result_cache=cache)
+
+    assert service.find_critical_points("x**2 + y**2", ["x", "y"]) is None
+    assert not service.is_critical_points_cached("x**2 + y**2", ["x", "y"])
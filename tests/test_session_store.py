@@ -0,0 +1,121 @@
+"""
+Testes do armazenamento de resultados por sessão e da preservação dos widgets
+das abas ao alternar entre elas.
+"""
+from pathlib import Path
+import pytest
+from streamlit.elements.lib import policies
+from streamlit.testing.v1 import AppTest
+from presentation.session_store import SessionResultStore
+
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+
+@pytest.fixture
+def session_state_warnings(monkeypatch):
+    """Avisos de widgets criados com `value=` e também alterados pela API de Session State."""
+    warnings = []
+    monkeypatch.setattr(policies, "_shown_default_value_warning", False)
+    monkeypatch.setattr(policies._LOGGER, "warning", lambda message, *args: warnings.append(message % args))
+    return warnings
+
+
+def tabs_script():
+    import streamlit as st
+    from presentation.session_store import persistent_widgets, widget_default
+
+    tab = st.radio("Aba", ["partial", "other"], key="active_tab")
+    if tab == "partial":
+        with persistent_widgets(("partial_variables",)):
+            st.text_input("Variáveis", value=widget_default("partial_variables", "x, y"), key="partial_variables")
+            st.button("Cancelar", key="partial_cancel")
+    else:
+        st.text_input("Outra aba", key="other_input")
+
+
+def test_buttons_inside_a_tab_survive_tab_switches(session_state_warnings):
+    at = AppTest.from_function(tabs_script)
+    at.run()
+    at.text_input(key="partial_variables").input("x, y, z")
+    at.button(key="partial_cancel").click()
+    at.run()
+
+    at.radio(key="active_tab").set_value("other")
+    at.run()
+    at.radio(key="active_tab").set_value("partial")
+    at.run()
+
+    assert not at.exception
+    assert at.text_input(key="partial_variables").value == "x, y, z"
+    assert not session_state_warnings
+
+
+def test_app_restores_inputs_after_switching_tabs(monkeypatch, session_state_warnings):
+    monkeypatch.setenv("DERIVATA_COMPUTE", "inline")
+    monkeypatch.setenv("DERIVATA_RESULT_CACHE", "off")
+    at = AppTest.from_file(str(APP_PATH), default_timeout=120)
+    at.run()
+    at.text_input(key="normal_variable").input("t")
+    at.number_input(key="normal_domain_max").set_value(8.0)
+    at.run()
+
+    for tab in ("Derivada Parcial", "Derivada de Ordem Superior", "Derivada Normal"):
+        at.radio(key="active_tab").set_value(tab)
+        at.run()
+        assert not at.exception
+
+    assert at.text_input(key="normal_variable").value == "t"
+    assert at.number_input(key="normal_domain_max").value == 8.0
+    assert not session_state_warnings
+
+
+def test_store_computes_each_input_once_and_evicts_the_oldest():
+    store = SessionResultStore(max_bytes=400)
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return "x" * 150
+
+    store.get_or_compute(("normal", "x**2"), lambda: compute(1))
+    store.get_or_compute(("normal", "x**2"), lambda: compute(2))
+    store.get_or_compute(("normal", "x**3"), lambda: compute(3))
+    store.get_or_compute(("normal", "x**4"), lambda: compute(4))
+
+    assert calls == [1, 3, 4]
+    # O limite de bytes comporta duas entradas: a menos usada foi descartada
+    assert store.get(("normal", "x**2")) is None
+    assert store.stats()["entries"] == 2
+
+
+def results_script():
+    import streamlit as st
+    from presentation.session_store import get_session_store, submit_inputs, submitted_inputs, submitted_live
+
+    st.session_state.setdefault("computed", 0)
+
+    def compute():
+        st.session_state.computed += 1
+        return "2*x"
+
+    if st.button("Calcular", key="calculate"):
+        submit_inputs("normal", ("x**2", "x"))
+    inputs = submitted_inputs("normal")
+    if inputs is not None:
+        st.text(get_session_store().get_or_compute(inputs, compute))
+    st.text(f"{st.session_state.computed} {submitted_live('normal')}")
+
+
+def test_results_survive_reruns_but_not_sessions():
+    first = AppTest.from_function(results_script)
+    first.run()
+    first.button(key="calculate").click()
+    first.run()
+    first.run()
+    second = AppTest.from_function(results_script)
+    second.run()
+
+    assert [element.value for element in first.text] == ["2*x", "1 False"]
+    # Outra sessão não vê as entradas nem os resultados da primeira
+    assert [element.value for element in second.text] == ["0 False"]
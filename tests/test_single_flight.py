@@ -0,0 +1,146 @@
+"""
+Testes do agrupamento de cálculos idênticos simultâneos.
+"""
+from concurrent.futures import Future
+from threading import Event, Lock, Thread
+import time
+import pytest
+from adapters.single_flight import SingleFlight
+from use_cases.result_cache import ResultCache
+
+
+def run_concurrently(count, call):
+    """Executa `call` em `count` threads e retorna os resultados (ou exceções) de cada uma."""
+    results, lock = [], Lock()
+
+    def worker():
+        try:
+            value = call()
+        except Exception as e:
+            value = e
+        with lock:
+            results.append(value)
+
+    threads = [Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("a condição não foi atingida a tempo")
+        time.sleep(0.01)
+
+
+def test_concurrent_identical_calls_run_once():
+    flight, release, calls = SingleFlight(), Event(), []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "resultado"
+
+    threads, results = run_concurrently(4, lambda: flight.do("chave", compute))
+    # As quatro chamadas entram no grupo antes de o cálculo ser liberado
+    wait_for(lambda: flight.stats()["followers"] == 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["resultado"] * 4
+    assert flight.in_flight() == 0
+
+
+def test_followers_receive_the_leaders_error():
+    flight, release = SingleFlight(), Event()
+
+    def compute():
+        release.wait(5)
+        raise ValueError("expressão inválida")
+
+    threads, results = run_concurrently(3, lambda: flight.do("chave", compute))
+    wait_for(lambda: flight.stats()["followers"] == 2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(results) == 3 and all(isinstance(result, ValueError) for result in results)
+    # O erro não fica guardado: a próxima chamada calcula de novo
+    assert flight.do("chave", lambda: "ok") == "ok"
+
+
+def test_reentrant_call_from_the_leader_does_not_deadlock():
+    flight = SingleFlight()
+
+    assert flight.do("chave", lambda: flight.do("chave", lambda: 1) + 1) == 2
+
+
+def test_result_cache_computes_concurrent_requests_once():
+    cache, release, calls = ResultCache(), Event(), []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "2*x"
+
+    key = ResultCache.make_key("derivative", "x**2", "x", 1)
+    threads, results = run_concurrently(5, lambda: cache.get_or_compute(key, compute))
+    wait_for(lambda: cache.stats()["coalesced"] == 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["2*x"] * 5
+    # Equivalentes pela forma canônica compartilham o mesmo resultado
+    assert cache.get_or_compute(ResultCache.make_key("derivative", "x*x", "x", 1), compute) == "2*x"
+
+
+def test_submit_joins_the_calculation_in_flight():
+    flight = SingleFlight()
+    source = Future()
+    starts = []
+
+    def start():
+        starts.append(1)
+        return source
+
+    first = flight.submit("chave", start)
+    second = flight.submit("chave", start)
+    source.set_result(42)
+
+    assert starts == [1]
+    assert first.result(1) == second.result(1) == 42
+    assert flight.in_flight() == 0
+
+
+def test_calculation_is_withdrawn_only_when_nobody_waits():
+    flight = SingleFlight()
+    source = Future()
+    first = flight.submit("chave", lambda: source)
+    second = flight.submit("chave", lambda: source)
+
+    first.cancel()
+    assert not source.cancelled()
+    assert flight.in_flight() == 1
+
+    second.cancel()
+    assert source.cancelled()
+    assert flight.in_flight() == 0
+    assert flight.stats()["withdrawn"] == 1
+
+
+def test_running_calculation_survives_its_waiters():
+    flight = SingleFlight()
+    source = Future()
+    source.set_running_or_notify_cancel()
+    flight.submit("chave", lambda: source).cancel()
+
+    # Já em execução, o cálculo termina e o próximo pedido o reaproveita
+    later = flight.submit("chave", lambda: Future())
+    source.set_result("pronto")
+    assert later.result(1) == "pronto"
@@ -0,0 +1,91 @@
+"""
+Testes das figuras e exportações do serviço de visualização.
+"""
+import json
+import numpy as np
+import sympy as sp
+import pytest
+from adapters.figure_cache import FigureCache
+from adapters.plotly_adapter import PlotlyAdapter
+from adapters.sympy_adapter import SymPyAdapter
+from use_cases.result_cache import ResultCache
+from use_cases.visualization_service import VisualizationService
+
+
+x, y = sp.symbols("x y")
+
+
+@pytest.fixture
+def service():
+    return VisualizationService(PlotlyAdapter(), SymPyAdapter(), FigureCache(), result_cache=ResultCache())
+
+
+def test_order_slider_steps_toggle_one_derivative_at_a_time(service):
+    sequence = [sp.sin(x) * x, sp.diff(sp.sin(x) * x, x), sp.diff(sp.sin(x) * x, x, 2), sp.diff(sp.sin(x) * x, x, 3)]
+
+    fig, error = service.create_order_exploration("sin(x)*x", "x", sequence)
+
+    assert error is None
+    assert [trace.name for trace in fig.data] == ["f(x)", "f′(x)", "f″(x)", "f⁽³⁾(x)"]
+    # Todas as curvas compartilham as abscissas; só f e f′ aparecem de início
+    assert all(len(trace.x) == len(fig.data[0].x) for trace in fig.data)
+    assert [trace.visible for trace in fig.data] == [None, True, False, False]
+
+    steps = fig.layout.sliders[0].steps
+    assert [step.label for step in steps] == ["1", "2", "3"]
+    assert [step.args[0]["visible"] for step in steps] == [
+        [True, True, False, False],
+        [True, False, True, False],
+        [True, False, False, True],
+    ]
+    assert steps[2].args[1]["title.text"] == "Derivada de ordem 3"
+
+
+def test_order_slider_is_served_from_the_figure_cache(service):
+    sequence = [x**3, 3*x**2]
+
+    first, _ = service.create_order_exploration("x**3", "x", sequence)
+    second, _ = service.create_order_exploration("x**3", "x", sequence)
+
+    assert first is not second
+    assert first.to_dict() == second.to_dict()
+
+
+@pytest.mark.parametrize("sequence, domain", [([x**2], (-5, 5)), ([x**2, 2*x], (1, -1))])
+def test_order_slider_rejects_invalid_input(service, sequence, domain):
+    fig, error = service.create_order_exploration("x**2", "x", sequence, domain)
+
+    assert fig is None and error
+
+
+def test_grid_export_writes_a_manifest_and_one_npy_per_field(service, tmp_path):
+    # Blocos que não dividem a grade: o último bloco é parcial
+    manifest, error = service.export_grid("x**2*y + y", ["x", "y"], tmp_path, domain=(-2, 2), resolution=50, chunk_rows=16)
+
+    assert error is None
+    assert json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8")) == manifest
+    assert sorted(manifest["fields"]) == ["df_dx", "df_dy", "f"]
+
+    axis = np.linspace(-2, 2, 50)
+    xs, ys = np.meshgrid(axis, axis)
+    expected = {"f": xs**2 * ys + ys, "df_dx": 2 * xs * ys, "df_dy": xs**2 + 1}
+    for name, values in expected.items():
+        stored = np.load(tmp_path / manifest["fields"][name]["file"], mmap_mode="r")
+        assert stored.shape == (50, 50) and stored.dtype == np.float64
+        assert np.allclose(stored, values)
+
+
+def test_grid_export_includes_second_order_fields(service, tmp_path):
+    manifest, error = service.export_grid("x**3*y", ["x", "y"], tmp_path, resolution=20, second_order=True)
+
+    assert error is None
+    assert manifest["fields"]["d2f_dxdy"]["expression"] == "3*x**2"
+    assert {"d2f_dxdx", "d2f_dydy"} <= set(manifest["fields"])
+    assert np.allclose(np.load(tmp_path / "d2f_dydy.npy"), 0)
+
+
+def test_grid_export_needs_two_variables(service, tmp_path):
+    manifest, error = service.export_grid("x**2", ["x"], tmp_path)
+
+    assert manifest is None and error
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,220 @@
+"""
+Execução de etapas de cálculo em segundo plano.
+Permite que a interface mostre cada etapa assim que ela termina, com progresso
+e cancelamento, em vez de bloquear até o fim de todo o pipeline. Uma etapa que
+entrega o cálculo ao escalonador (retornando o Future dele) libera a thread do
+pool e termina por callback, quando o cálculo termina.
+"""
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from contextvars import copy_context
+from threading import Lock, Timer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import time
+
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Número de threads do pool compartilhado de etapas em segundo plano; as threads
+# só executam a parte local das etapas (amostragem, LaTeX), não esperam o escalonador
+DEFAULT_BACKGROUND_WORKERS = 4
+
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_shared_executor_lock = Lock()
+
+# Etapas submetidas e ainda não concluídas, em todas as sessões
+_in_flight = 0
+_in_flight_lock = Lock()
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """Retorna o pool de threads compartilhado pelo processo, criando-o na primeira chamada."""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_BACKGROUND_WORKERS,
+                thread_name_prefix="derivata-job"
+            )
+        return _shared_executor
+
+
+def in_flight_jobs() -> int:
+    """Número de etapas na fila ou executando no processo (carga de primeiro plano)."""
+    return _in_flight
+
+
+def _track(future: Future) -> None:
+    """Contabiliza a etapa até que ela termine."""
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight += 1
+    future.add_done_callback(_untrack)
+
+
+def _untrack(future: Future) -> None:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+class BackgroundJob:
+    """
+    Uma etapa do grupo, com estado e tempo de execução.
+
+    A etapa executa em uma thread do pool; se ela retornar um Future (um
+    cálculo entregue ao backend), a thread é liberada e a etapa termina com o
+    resultado desse Future.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.future: Future = Future()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.discarded = False
+        # Parte da etapa em andamento: a execução no pool ou o cálculo entregue ao backend
+        self._step: Optional[Future] = None
+        self._lock = Lock()
+
+    def start(self, executor: ThreadPoolExecutor, fn: Callable[..., Any], *args: Any) -> None:
+        """Submete a etapa ao pool; ela herda o contexto de quem a submeteu (por exemplo, a sessão no escalonador)."""
+        if not self.future.done():
+            self._attach(executor.submit(copy_context().run, self._run, fn, *args))
+
+    def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.future.done():
+            return None
+        self.started_at = time.monotonic()
+        return fn(*args)
+
+    def _attach(self, step: Future) -> None:
+        with self._lock:
+            if self.future.done():
+                step.cancel()
+                return
+            self._step = step
+        step.add_done_callback(self._step_done)
+
+    def _step_done(self, step: Future) -> None:
+        if not step.cancelled() and step.exception() is None and isinstance(step.result(), Future):
+            # A etapa entregou o cálculo ao backend: o resultado chega por este Future
+            self._attach(step.result())
+            return
+        self.finished_at = time.monotonic()
+        try:
+            if step.cancelled():
+                self.future.cancel()
+            elif step.exception() is not None:
+                self.future.set_exception(step.exception())
+            else:
+                self.future.set_result(step.result())
+        except InvalidStateError:
+            # A etapa foi cancelada enquanto esta parte terminava
+            pass
+
+    def cancel(self) -> None:
+        """
+        Cancela a etapa, se ainda não terminou.
+
+        Etapas ainda na fila não chegam a executar; uma etapa que já está
+        calculando não pode ser interrompida, mas seu resultado é descartado.
+        """
+        with self._lock:
+            if self.future.done():
+                return
+            self.discarded = True
+            self.future.cancel()
+            step = self._step
+        if step is not None:
+            step.cancel()
+
+    @property
+    def status(self) -> str:
+        """Estado atual da etapa."""
+        if self.future.cancelled() or self.discarded:
+            return CANCELLED
+        if not self.future.done():
+            return RUNNING if self.started_at is not None else PENDING
+        return FAILED if self.future.exception() is not None else DONE
+
+    @property
+    def elapsed(self) -> float:
+        """Tempo de execução da etapa, em segundos."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def result(self) -> Any:
+        """Resultado da etapa; levanta a exceção da etapa se ela falhou."""
+        return self.future.result()
+
+
+class JobGroup:
+    """
+    Etapas de um mesmo pipeline, canceláveis em conjunto.
+
+    Com `delay`, as etapas só são submetidas ao pool quando o intervalo, contado
+    da criação do grupo, termina (debounce de entradas que ainda estão mudando);
+    até lá, só um timer aguarda, sem ocupar threads do pool.
+    """
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None, delay: float = 0.0):
+        self.executor = executor if executor is not None else shared_executor()
+        self.delay = delay
+        self.jobs: Dict[str, BackgroundJob] = {}
+        self._start_at = time.monotonic() + delay
+        self._timers: List[Timer] = []
+        self._cancelled = False
+        self._lock = Lock()
+
+    def ensure(self, name: str, fn: Callable[..., Any], *args: Any) -> BackgroundJob:
+        """Submete a etapa se ela ainda não foi submetida e a retorna."""
+        with self._lock:
+            job = self.jobs.get(name)
+            if job is not None:
+                return job
+            job = BackgroundJob(name)
+            self.jobs[name] = job
+            _track(job.future)
+            if self._cancelled:
+                job.cancel()
+                return job
+            wait = self._start_at - time.monotonic()
+            if wait <= 0:
+                job.start(self.executor, fn, *args)
+            else:
+                timer = Timer(wait, copy_context().run, args=(job.start, self.executor, fn) + args)
+                timer.daemon = True
+                self._timers.append(timer)
+                timer.start()
+            return job
+
+    def cancel(self) -> None:
+        """Cancela as etapas do grupo; as que aguardam o debounce não chegam a ser submetidas."""
+        with self._lock:
+            self._cancelled = True
+            timers, self._timers = self._timers, []
+            jobs = list(self.jobs.values())
+        for timer in timers:
+            timer.cancel()
+        for job in jobs:
+            job.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica se o grupo foi cancelado."""
+        return self._cancelled
+
+    @property
+    def pending(self) -> bool:
+        """Indica se alguma etapa ainda está na fila ou executando."""
+        return any(job.status in (PENDING, RUNNING) for job in self.jobs.values())
+
+    def progress(self) -> Tuple[int, int]:
+        """Retorna (etapas concluídas, total de etapas submetidas)."""
+        finished = sum(1 for job in self.jobs.values() if job.status in (DONE, FAILED, CANCELLED))
+        return finished, len(self.jobs)
@@ -0,0 +1,480 @@
+"""
+Formato binário compacto e versionado dos resultados simbólicos.
+Usado pelo cache em disco e pelos nós de cálculo remotos no lugar do pickle e
+do srepr. As expressões viram um grafo (DAG) em que subárvores iguais são
+gravadas uma única vez e referenciadas pelo índice; todas as strings (nomes,
+passos, LaTeX) ficam em uma tabela única; o LaTeX já calculado acompanha o
+resultado; arrays numéricos vão em buffers alinhados, lidos sem cópia.
+
+Layout (inteiros em varint, exceto o cabeçalho):
+    cabeçalho   b"DRVB", versão (1 byte), 3 bytes reservados
+    strings     quantidade, e para cada uma: tamanho e bytes UTF-8
+    nós         quantidade, e para cada um: tipo e conteúdo (filhos antes dos pais)
+    LaTeX       quantidade, pares (nó, string)
+    buffers     quantidade, pares (deslocamento, tamanho) relativos à área de buffers
+    valor       tamanho, e o valor raiz com marcadores de tipo
+    área de buffers, alinhada em BUFFER_ALIGNMENT bytes
+"""
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+import struct
+import numpy as np
+import sympy as sp
+from domain.models import CriticalPoint, DerivativeResult, Expression, PartialDerivativeResult
+
+
+MAGIC = b"DRVB"
+
+# Incrementar a cada mudança incompatível do layout
+FORMAT_VERSION = 1
+
+# Alinhamento dos buffers numéricos (permite leitura vetorizada direto do blob)
+BUFFER_ALIGNMENT = 64
+
+_HEADER = struct.Struct("<4sB3x")
+_FLOAT = struct.Struct("<d")
+
+# Tipos de nó
+_N_SYMBOL, _N_INTEGER, _N_RATIONAL, _N_SINGLETON, _N_APPLY, _N_SREPR = range(6)
+
+# Marcadores de valor
+(
+    _V_NONE, _V_TRUE, _V_FALSE, _V_INT, _V_FLOAT, _V_STR, _V_LIST, _V_TUPLE, _V_DICT, _V_EXPR,
+    _V_MATRIX, _V_ARRAY, _V_EXPRESSION, _V_DERIVATIVE, _V_PARTIAL, _V_CRITICAL_POINT, _V_BYTES
+) = range(17)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class CodecError(ValueError):
+    """Valor sem representação no formato, ou blob inválido ou de outra versão."""
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_signed(out: bytearray, value: int) -> None:
+    # zigzag: inteiros pequenos, positivos ou negativos, ocupam poucos bytes
+    _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+
+
+class _Encoder:
+    def __init__(self, latex: Optional[Mapping[sp.Basic, str]]):
+        self.strings: Dict[str, int] = {}
+        self.nodes = bytearray()
+        self.node_count = 0
+        self.node_index: Dict[sp.Basic, int] = {}
+        self.latex: Dict[int, int] = {}
+        self.known_latex = latex or {}
+        self.buffers: List[memoryview] = []
+        self.value = bytearray()
+
+    def string(self, text: str) -> int:
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        return index
+
+    def expr(self, root: sp.Basic) -> int:
+        """Índice do nó da expressão, gravando antes os nós ainda não vistos (pós-ordem, sem recursão)."""
+        index = self.node_index.get(root)
+        if index is not None:
+            return index
+        stack: List[Tuple[sp.Basic, bool]] = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in self.node_index:
+                continue
+            kind = _node_kind(node)
+            if kind == _N_APPLY and not expanded:
+                stack.append((node, True))
+                stack.extend((arg, False) for arg in reversed(node.args) if arg not in self.node_index)
+                continue
+            self._write_node(node, kind)
+        index = self.node_index[root]
+        latex = self.known_latex.get(root)
+        if latex is not None:
+            self.latex[index] = self.string(latex)
+        return index
+
+    def _write_node(self, node: sp.Basic, kind: int) -> None:
+        out = self.nodes
+        out.append(kind)
+        if kind == _N_SYMBOL:
+            _write_varint(out, self.string(node.name))
+        elif kind == _N_INTEGER:
+            _write_signed(out, int(node.p))
+        elif kind == _N_RATIONAL:
+            _write_signed(out, int(node.p))
+            _write_varint(out, int(node.q))
+        elif kind == _N_SINGLETON:
+            _write_varint(out, self.string(type(node).__name__))
+        elif kind == _N_APPLY:
+            _write_varint(out, self.string(type(node).__name__))
+            _write_varint(out, len(node.args))
+            for arg in node.args:
+                _write_varint(out, self.node_index[arg])
+        else:
+            _write_varint(out, self.string(sp.srepr(node)))
+        self.node_index[node] = self.node_count
+        self.node_count += 1
+
+    def write(self, value: Any) -> None:
+        out = self.value
+        if value is None:
+            out.append(_V_NONE)
+        elif value is True or value is False:
+            out.append(_V_TRUE if value else _V_FALSE)
+        elif isinstance(value, int):
+            out.append(_V_INT)
+            _write_signed(out, value)
+        elif isinstance(value, float):
+            out.append(_V_FLOAT)
+            out += _FLOAT.pack(value)
+        elif isinstance(value, str):
+            out.append(_V_STR)
+            _write_varint(out, self.string(value))
+        elif isinstance(value, DerivativeResult):
+            out.append(_V_DERIVATIVE)
+            self.write(value.original_expression)
+            _write_varint(out, self.string(value.variable))
+            _write_signed(out, value.order)
+            result = self.expr(value.result)
+            _write_varint(out, result)
+            self._write_steps(value.steps)
+            if value._latex is not None:
+                self.latex[result] = self.string(value._latex)
+        elif isinstance(value, PartialDerivativeResult):
+            out.append(_V_PARTIAL)
+            self.write(value.original_expression)
+            _write_varint(out, len(value.derivatives))
+            for var, derivative in value.derivatives.items():
+                _write_varint(out, self.string(var))
+                _write_varint(out, self.expr(derivative))
+            _write_varint(out, len(value.steps))
+            for var, steps in value.steps.items():
+                _write_varint(out, self.string(var))
+                self._write_steps(steps)
+        elif isinstance(value, CriticalPoint):
+            out.append(_V_CRITICAL_POINT)
+            _write_varint(out, len(value.coordinates))
+            for var, coordinate in value.coordinates.items():
+                # As chaves de sp.solve são símbolos; as dos modelos, strings
+                self.write(var)
+                _write_varint(out, self.expr(sp.sympify(coordinate)))
+            _write_varint(out, 0 if value.classification is None else self.string(value.classification) + 1)
+        elif isinstance(value, Expression):
+            out.append(_V_EXPRESSION)
+            _write_varint(out, self.string(value.raw_expression))
+            _write_varint(out, len(value.variables))
+            for var in value.variables:
+                _write_varint(out, self.string(var))
+        elif isinstance(value, sp.MatrixBase):
+            out.append(_V_MATRIX)
+            _write_varint(out, value.rows)
+            _write_varint(out, value.cols)
+            for item in value:
+                _write_varint(out, self.expr(item))
+        elif isinstance(value, sp.Basic):
+            out.append(_V_EXPR)
+            _write_varint(out, self.expr(value))
+        elif isinstance(value, np.ndarray):
+            if value.dtype.hasobject:
+                raise CodecError("Arrays de objetos não têm representação binária")
+            out.append(_V_ARRAY)
+            array = np.ascontiguousarray(value)
+            _write_varint(out, self.string(array.dtype.str))
+            _write_varint(out, array.ndim)
+            for dim in array.shape:
+                _write_varint(out, dim)
+            _write_varint(out, self._buffer(memoryview(array).cast("B")))
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            out.append(_V_BYTES)
+            _write_varint(out, self._buffer(memoryview(value).cast("B")))
+        elif isinstance(value, (list, tuple)):
+            out.append(_V_LIST if isinstance(value, list) else _V_TUPLE)
+            _write_varint(out, len(value))
+            for item in value:
+                self.write(item)
+        elif isinstance(value, dict):
+            out.append(_V_DICT)
+            _write_varint(out, len(value))
+            for key, item in value.items():
+                self.write(key)
+                self.write(item)
+        else:
+            raise CodecError(f"Tipo sem representação binária: {type(value).__name__}")
+
+    def _write_steps(self, steps: Sequence[str]) -> None:
+        _write_varint(self.value, len(steps))
+        for step in steps:
+            _write_varint(self.value, self.string(step))
+
+    def _buffer(self, view: memoryview) -> int:
+        self.buffers.append(view)
+        return len(self.buffers) - 1
+
+    def parts(self) -> List[Buffer]:
+        head = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION))
+        _write_varint(head, len(self.strings))
+        for text in self.strings:
+            data = text.encode("utf-8")
+            _write_varint(head, len(data))
+            head += data
+        _write_varint(head, self.node_count)
+        head += self.nodes
+        _write_varint(head, len(self.latex))
+        for node, text in self.latex.items():
+            _write_varint(head, node)
+            _write_varint(head, text)
+        _write_varint(head, len(self.buffers))
+        offset = 0
+        for view in self.buffers:
+            _write_varint(head, offset)
+            _write_varint(head, view.nbytes)
+            offset = _align(offset + view.nbytes)
+        _write_varint(head, len(self.value))
+        head += self.value
+        if not self.buffers:
+            return [head]
+
+        # Área de buffers alinhada: os arrays são enviados como estão, sem cópia
+        parts: List[Buffer] = [head + bytes(_align(len(head)) - len(head))]
+        for view in self.buffers:
+            parts.append(view)
+            padding = _align(view.nbytes) - view.nbytes
+            if padding:
+                parts.append(bytes(padding))
+        return parts
+
+
+def _align(size: int) -> int:
+    return (size + BUFFER_ALIGNMENT - 1) // BUFFER_ALIGNMENT * BUFFER_ALIGNMENT
+
+
+def _node_kind(node: sp.Basic) -> int:
+    """Tipo de nó; o que o formato não representa diretamente vai como srepr."""
+    if isinstance(type(node), sp.core.singleton.Singleton) and getattr(sp.S, type(node).__name__, None) is node:
+        return _N_SINGLETON
+    if isinstance(node, sp.Integer):
+        return _N_INTEGER
+    if isinstance(node, sp.Rational):
+        return _N_RATIONAL
+    if type(node) is sp.Symbol:
+        # Símbolos com suposições (positive=True etc.) mantêm-nas pelo srepr
+        return _N_SYMBOL if node == sp.Symbol(node.name) else _N_SREPR
+    if node.args and _CONSTRUCTORS.get(type(node).__name__) is type(node):
+        return _N_APPLY
+    return _N_SREPR
+
+
+def _sympy_classes() -> Dict[str, type]:
+    classes = {}
+    for name in dir(sp):
+        candidate = getattr(sp, name)
+        if isinstance(candidate, type) and issubclass(candidate, sp.Basic) and candidate.__name__ == name:
+            classes[name] = candidate
+    return classes
+
+
+# Classes reconstruídas diretamente (sem avaliar texto): as exportadas pelo módulo sympy
+_CONSTRUCTORS = _sympy_classes()
+
+
+def encode_parts(value: Any, latex: Optional[Mapping[sp.Basic, str]] = None) -> List[Buffer]:
+    """
+    Codifica o valor em partes a serem enviadas ou gravadas em sequência.
+
+    Os arrays numéricos são partes próprias que referenciam a memória original,
+    sem cópia. `latex` associa expressões ao LaTeX já calculado, que passa a
+    acompanhar o resultado.
+    """
+    encoder = _Encoder(latex)
+    encoder.write(value)
+    return encoder.parts()
+
+
+def encode(value: Any, latex: Optional[Mapping[sp.Basic, str]] = None) -> bytes:
+    """Codifica o valor em um único blob."""
+    parts = encode_parts(value, latex)
+    return bytes(parts[0]) if len(parts) == 1 else b"".join(parts)
+
+
+class _Decoder:
+    def __init__(self, data: Buffer):
+        self.view = memoryview(data).cast("B")
+        self.pos = 0
+
+    def varint(self) -> int:
+        view = self.view
+        result = shift = 0
+        while True:
+            byte = view[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def signed(self) -> int:
+        value = self.varint()
+        return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+    def decode(self) -> Tuple[Any, Dict[sp.Basic, str]]:
+        if len(self.view) < _HEADER.size:
+            raise CodecError("Blob truncado")
+        magic, version = _HEADER.unpack_from(self.view, 0)
+        if magic != MAGIC:
+            raise CodecError("Não é um blob do codec binário")
+        if version != FORMAT_VERSION:
+            raise CodecError(f"Versão {version} do formato binário não suportada (esperada {FORMAT_VERSION})")
+        self.pos = _HEADER.size
+
+        self.strings = []
+        for _ in range(self.varint()):
+            size = self.varint()
+            self.strings.append(str(self.view[self.pos:self.pos + size], "utf-8"))
+            self.pos += size
+
+        self.nodes: List[sp.Basic] = []
+        for _ in range(self.varint()):
+            self.nodes.append(self._node())
+
+        self.latex = {self.varint(): self.varint() for _ in range(self.varint())}
+
+        directory = [(self.varint(), self.varint()) for _ in range(self.varint())]
+        value_size = self.varint()
+        value_end = self.pos + value_size
+        area = _align(value_end)
+        self.buffers = [self.view[area + offset:area + offset + size] for offset, size in directory]
+
+        value = self.read()
+        if self.pos != value_end:
+            raise CodecError("Tamanho do valor não confere")
+        latex = {self.nodes[node]: self.strings[text] for node, text in self.latex.items()}
+        return value, latex
+
+    def _node(self) -> sp.Basic:
+        kind = self.view[self.pos]
+        self.pos += 1
+        if kind == _N_SYMBOL:
+            return sp.Symbol(self.strings[self.varint()])
+        if kind == _N_INTEGER:
+            return sp.Integer(self.signed())
+        if kind == _N_RATIONAL:
+            p = self.signed()
+            return sp.Rational(p, self.varint())
+        if kind == _N_SINGLETON:
+            return getattr(sp.S, self.strings[self.varint()])
+        if kind == _N_APPLY:
+            name = self.strings[self.varint()]
+            cls = _CONSTRUCTORS.get(name)
+            if cls is None:
+                raise CodecError(f"Classe SymPy desconhecida: {name}")
+            args = [self.nodes[self.varint()] for _ in range(self.varint())]
+            try:
+                # Os argumentos já estão na forma canônica; reavaliá-los só custaria tempo
+                return cls(*args, evaluate=False)
+            except TypeError:
+                return cls(*args)
+        if kind == _N_SREPR:
+            return sp.sympify(self.strings[self.varint()])
+        raise CodecError(f"Tipo de nó desconhecido: {kind}")
+
+    def read(self) -> Any:
+        tag = self.view[self.pos]
+        self.pos += 1
+        reader = _READERS.get(tag)
+        if reader is None:
+            raise CodecError(f"Marcador de valor desconhecido: {tag}")
+        return reader(self)
+
+    def _steps(self) -> Tuple[str, ...]:
+        return tuple(self.strings[self.varint()] for _ in range(self.varint()))
+
+    def _expression(self) -> Expression:
+        raw = self.strings[self.varint()]
+        return Expression(raw, [self.strings[self.varint()] for _ in range(self.varint())])
+
+    def _derivative(self) -> DerivativeResult:
+        expression = self.read()
+        variable = self.strings[self.varint()]
+        order = self.signed()
+        node = self.varint()
+        steps = self._steps()
+        latex = self.latex.get(node)
+        return DerivativeResult(
+            expression, variable, order, self.nodes[node], steps,
+            _latex=self.strings[latex] if latex is not None else None
+        )
+
+    def _partial(self) -> PartialDerivativeResult:
+        expression = self.read()
+        derivatives = {self.strings[self.varint()]: self.nodes[self.varint()] for _ in range(self.varint())}
+        steps = {}
+        for _ in range(self.varint()):
+            var = self.strings[self.varint()]
+            steps[var] = self._steps()
+        return PartialDerivativeResult(expression, derivatives, steps)
+
+    def _critical_point(self) -> CriticalPoint:
+        coordinates = {}
+        for _ in range(self.varint()):
+            var = self.read()
+            coordinates[var] = self.nodes[self.varint()]
+        classification = self.varint()
+        return CriticalPoint(coordinates, self.strings[classification - 1] if classification else None)
+
+    def _matrix(self) -> sp.Matrix:
+        rows, cols = self.varint(), self.varint()
+        return sp.Matrix(rows, cols, [self.nodes[self.varint()] for _ in range(rows * cols)])
+
+    def _array(self) -> np.ndarray:
+        dtype = np.dtype(self.strings[self.varint()])
+        shape = tuple(self.varint() for _ in range(self.varint()))
+        # Visão somente leitura sobre o blob: nenhuma cópia dos dados
+        return np.frombuffer(self.buffers[self.varint()], dtype=dtype).reshape(shape)
+
+    def _float(self) -> float:
+        (value,) = _FLOAT.unpack_from(self.view, self.pos)
+        self.pos += _FLOAT.size
+        return value
+
+
+_READERS: Dict[int, Callable[[_Decoder], Any]] = {
+    _V_NONE: lambda d: None,
+    _V_TRUE: lambda d: True,
+    _V_FALSE: lambda d: False,
+    _V_INT: _Decoder.signed,
+    _V_FLOAT: _Decoder._float,
+    _V_STR: lambda d: d.strings[d.varint()],
+    _V_LIST: lambda d: [d.read() for _ in range(d.varint())],
+    _V_TUPLE: lambda d: tuple(d.read() for _ in range(d.varint())),
+    _V_DICT: lambda d: {d.read(): d.read() for _ in range(d.varint())},
+    _V_EXPR: lambda d: d.nodes[d.varint()],
+    _V_MATRIX: _Decoder._matrix,
+    _V_ARRAY: _Decoder._array,
+    _V_EXPRESSION: _Decoder._expression,
+    _V_DERIVATIVE: _Decoder._derivative,
+    _V_PARTIAL: _Decoder._partial,
+    _V_CRITICAL_POINT: _Decoder._critical_point,
+    _V_BYTES: lambda d: d.buffers[d.varint()]
+}
+
+
+def decode_with_latex(data: Buffer) -> Tuple[Any, Dict[sp.Basic, str]]:
+    """Decodifica o blob; retorna o valor e o LaTeX que o acompanha, por expressão."""
+    try:
+        return _Decoder(data).decode()
+    except CodecError:
+        raise
+    except (IndexError, KeyError, ValueError, TypeError, struct.error, sp.SympifyError) as e:
+        raise CodecError(f"Blob inválido: {str(e)}") from e
+
+
+def decode(data: Buffer) -> Any:
+    """Decodifica o blob produzido por encode ou encode_parts."""
+    return decode_with_latex(data)[0]
@@ -0,0 +1,336 @@
+"""
+Backends de cálculo dos serviços simbólicos.
+Os serviços pedem um cálculo pelo nome (as tarefas de compute_tasks) e o
+backend decide onde ele roda: na própria thread, no pool de processos local do
+ComputeScheduler ou em nós de cálculo remotos (derivata.worker), acessados por
+TCP com o protocolo de derivata.framing e resultados no formato binário de
+use_cases.binary_codec. Os nós não guardam estado de sessão, então podem ser
+escalados independentemente das instâncias da interface.
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from contextlib import contextmanager
+from itertools import count
+from queue import Empty, LifoQueue
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import os
+import socket
+import time
+from adapters.futures import call_now
+from derivata.framing import FrameError, recv_frame, recv_message, send_message
+from use_cases.compute_scheduler import LIGHT, ComputeScheduler, current_session
+from use_cases import binary_codec, compute_tasks
+from use_cases.wire_codec import decode_value
+
+
+# Tempo máximo de espera pela resposta de um nó remoto (segundos)
+DEFAULT_REMOTE_TIMEOUT = 120.0
+
+# Tempo máximo para abrir a conexão com um nó remoto (segundos)
+CONNECT_TIMEOUT = 2.0
+
+# Um nó que falhou só volta a ser tentado após este intervalo (segundos)
+NODE_RETRY_AFTER = 5.0
+
+# Conexões ociosas mantidas por nó
+MAX_IDLE_CONNECTIONS = 8
+
+
+class RemoteComputeError(Exception):
+    """O nó remoto recusou a tarefa ou nenhum nó respondeu."""
+
+
+class ComputeBackend(ABC):
+    """Executa as tarefas de compute_tasks pelo nome."""
+
+    name = "abstract"
+
+    def __init__(self):
+        self._pending = 0
+        self._pending_lock = Lock()
+
+    @abstractmethod
+    def run(self, task: str, *args: Any, priority: int = LIGHT) -> Any:
+        """Executa a tarefa e retorna o resultado (o mesmo da chamada local)."""
+
+    def submit(self, task: str, *args: Any, priority: int = LIGHT) -> Future:
+        """
+        Inicia a tarefa e retorna um Future com o resultado.
+
+        Por padrão a tarefa executa na thread que a pede e o Future já volta
+        concluído; o pool de processos apenas a enfileira no escalonador, de modo
+        que quem a pediu pode registrar um callback em vez de bloquear a thread.
+        """
+        return call_now(lambda: self.run(task, *args, priority=priority))
+
+    def pending(self) -> int:
+        """Tarefas na fila ou executando neste backend, pedidas por qualquer thread do processo."""
+        return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "pending": self._pending}
+
+    def close(self) -> None:
+        """Libera processos e conexões do backend."""
+
+    @contextmanager
+    def _tracked(self) -> Iterator[None]:
+        """Conta a tarefa como pendente enquanto o bloco executa."""
+        self._begin()
+        try:
+            yield
+        finally:
+            self._end()
+
+    def _begin(self) -> None:
+        with self._pending_lock:
+            self._pending += 1
+
+    def _end(self, _future: Optional[Future] = None) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+
+class InlineBackend(ComputeBackend):
+    """Executa as tarefas na thread que as pede."""
+
+    name = "inline"
+
+    def run(self, task: str, *args: Any, priority: int = LIGHT) -> Any:
+        with self._tracked():
+            return compute_tasks.get_task(task)(*args)
+
+
+class ProcessPoolBackend(ComputeBackend):
+    """Executa as tarefas no pool de processos local, com o escalonamento justo entre sessões."""
+
+    name = "pool"
+
+    def __init__(self, scheduler: Optional[ComputeScheduler] = None):
+        super().__init__()
+        self.scheduler = scheduler if scheduler is not None else ComputeScheduler()
+
+    def run(self, task: str, *args: Any, priority: int = LIGHT) -> Any:
+        with self._tracked():
+            return self.scheduler.run(compute_tasks.get_task(task), *args, priority=priority)
+
+    def submit(self, task: str, *args: Any, priority: int = LIGHT) -> Future:
+        self._begin()
+        try:
+            future = self.scheduler.submit(compute_tasks.get_task(task), *args, priority=priority)
+        except BaseException:
+            self._end()
+            raise
+        future.add_done_callback(self._end)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.scheduler.metrics(), backend=self.name, pending=self._pending)
+
+    def close(self) -> None:
+        self.scheduler.shutdown()
+
+
+class _Node:
+    """Um nó remoto: endereço, conexões ociosas e estado de falha."""
+
+    def __init__(self, address: Tuple[str, int]):
+        self.address = address
+        self.idle: "LifoQueue[socket.socket]" = LifoQueue(MAX_IDLE_CONNECTIONS)
+        self.in_flight = 0
+        self.failed_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def label(self) -> str:
+        return f"{self.address[0]}:{self.address[1]}"
+
+    def acquire(self) -> socket.socket:
+        try:
+            return self.idle.get_nowait()
+        except Empty:
+            sock = socket.create_connection(self.address, timeout=CONNECT_TIMEOUT)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return sock
+
+    def release(self, sock: socket.socket) -> None:
+        try:
+            self.idle.put_nowait(sock)
+        except Exception:
+            sock.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except Empty:
+                return
+
+
+class RemoteBackend(ComputeBackend):
+    """
+    Envia as tarefas a nós de cálculo remotos (derivata.worker).
+
+    Cada tarefa vai para o nó disponível com menos tarefas em andamento, por
+    uma conexão reaproveitada. Se o nó não aceitar a conexão (inclusive por
+    tempo esgotado) ou a derrubar, a tarefa é repetida no próximo nó e o nó com
+    falha fica fora do rodízio por NODE_RETRY_AFTER segundos. Só o tempo
+    esgotado depois de a tarefa ter sido enviada não é repetido. A sessão atual acompanha a tarefa, para que o
+    nó aplique o mesmo escalonamento justo entre sessões.
+    """
+
+    name = "remote"
+
+    def __init__(self, addresses: Sequence[str], timeout: float = DEFAULT_REMOTE_TIMEOUT):
+        if not addresses:
+            raise ValueError("Informe ao menos um nó de cálculo (host:porta)")
+        super().__init__()
+        self.nodes = [_Node(parse_address(address)) for address in addresses]
+        self.timeout = timeout
+        self._lock = Lock()
+        self._ids = count(1)
+        self._rotation = 0
+
+    def run(self, task: str, *args: Any, priority: int = LIGHT) -> Any:
+        with self._tracked():
+            return self._run_remote(task, args, priority)
+
+    def _run_remote(self, task: str, args: Tuple[Any, ...], priority: int) -> Any:
+        message = {
+            "id": next(self._ids),
+            "task": task,
+            "args": list(args),
+            "priority": priority,
+            "session": current_session.get(),
+            "encoding": "binary"
+        }
+        errors: List[str] = []
+        for node in self._candidates():
+            try:
+                sock = node.acquire()
+            except OSError as e:
+                # Conexão recusada ou sem resposta em CONNECT_TIMEOUT: a tarefa não chegou ao nó
+                self._mark_failed(node)
+                errors.append(f"{node.label}: {str(e) or 'tempo de conexão esgotado'}")
+                continue
+            try:
+                response, payload = self._exchange(node, sock, message)
+            except socket.timeout:
+                # A tarefa pode estar sendo calculada; repeti-la em outro nó só dobraria a carga
+                raise RemoteComputeError(f"O nó {node.label} não respondeu em {self.timeout:g}s")
+            except (OSError, FrameError) as e:
+                self._mark_failed(node)
+                errors.append(f"{node.label}: {str(e)}")
+                continue
+            if response.get("error"):
+                raise RemoteComputeError(f"{node.label}: {response['error']}")
+            if payload is None:
+                # Nó que não conhece o formato binário: resultado no próprio JSON
+                return decode_value(response.get("result"))
+            try:
+                return binary_codec.decode(payload)
+            except binary_codec.CodecError as e:
+                raise RemoteComputeError(f"{node.label}: resultado ilegível ({str(e)})") from e
+        raise RemoteComputeError("Nenhum nó de cálculo disponível (" + "; ".join(errors) + ")")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            nodes = {
+                node.label: {
+                    "in_flight": node.in_flight,
+                    "requests": node.requests,
+                    "failures": node.failures,
+                    "available": node.failed_until <= now
+                }
+                for node in self.nodes
+            }
+        return {"backend": self.name, "pending": self._pending, "nodes": nodes}
+
+    def close(self) -> None:
+        for node in self.nodes:
+            node.close()
+
+    def _candidates(self) -> List[_Node]:
+        """Nós disponíveis, do menos ao mais ocupado (em rodízio nos empates), seguidos dos que falharam."""
+        now = time.monotonic()
+        with self._lock:
+            self._rotation = (self._rotation + 1) % len(self.nodes)
+            rotated = self.nodes[self._rotation:] + self.nodes[:self._rotation]
+            available = sorted((node for node in rotated if node.failed_until <= now), key=lambda node: node.in_flight)
+            failed = [node for node in rotated if node.failed_until > now]
+        return available + failed
+
+    def _exchange(
+        self,
+        node: _Node,
+        sock: socket.socket,
+        message: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[bytearray]]:
+        """Envia a tarefa pela conexão e recebe a resposta e, em seguida, o quadro com o resultado binário."""
+        with self._lock:
+            node.in_flight += 1
+            node.requests += 1
+        try:
+            try:
+                sock.settimeout(self.timeout)
+                try:
+                    send_message(sock, message)
+                except socket.timeout:
+                    # A tarefa não chegou inteira ao nó: pode ser repetida em outro
+                    raise ConnectionError("tempo esgotado ao enviar a tarefa")
+                response = recv_message(sock)
+                if response is None:
+                    raise FrameError("O nó encerrou a conexão")
+                payload = recv_frame(sock) if response.get("encoding") == "binary" else None
+                if response.get("encoding") == "binary" and payload is None:
+                    raise FrameError("O nó encerrou a conexão antes do resultado")
+            except BaseException:
+                sock.close()
+                raise
+            node.release(sock)
+        finally:
+            with self._lock:
+                node.in_flight -= 1
+        with self._lock:
+            node.failed_until = 0.0
+        return response, payload
+
+    def _mark_failed(self, node: _Node) -> None:
+        with self._lock:
+            node.failures += 1
+            node.failed_until = time.monotonic() + NODE_RETRY_AFTER
+        node.close()
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Converte 'host:porta' (ou só ':porta', para localhost) em endereço TCP."""
+    host, _, port = address.strip().rpartition(":")
+    try:
+        return host or "127.0.0.1", int(port)
+    except ValueError:
+        raise ValueError(f"Endereço de nó inválido: {address!r} (use host:porta)")
+
+
+# Backends aceitos em DERIVATA_COMPUTE
+BACKENDS = ("inline", "pool", "remote")
+
+
+def backend_from_environment() -> ComputeBackend:
+    """
+    Backend configurado pelas variáveis de ambiente.
+
+    DERIVATA_COMPUTE escolhe entre `inline`, `pool` (padrão) e `remote`; para
+    `remote`, DERIVATA_COMPUTE_NODES lista os nós separados por vírgula.
+    """
+    kind = os.environ.get("DERIVATA_COMPUTE", "pool").strip().lower()
+    if kind == "inline":
+        return InlineBackend()
+    if kind == "pool":
+        return ProcessPoolBackend()
+    if kind == "remote":
+        nodes = [node for node in os.environ.get("DERIVATA_COMPUTE_NODES", "").split(",") if node.strip()]
+        return RemoteBackend(nodes)
+    raise ValueError(f"DERIVATA_COMPUTE desconhecido: {kind} (use {', '.join(BACKENDS)})")
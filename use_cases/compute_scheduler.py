@@ -0,0 +1,353 @@
+"""
+Escalonador de cálculos simbólicos entre as sessões, sobre um pool de processos.
+O SymPy é Python puro e segura o GIL; sem o escalonador, o cálculo pesado de
+uma sessão atrasa as threads de todas as outras. Aqui, todo cálculo vai para um
+pool de processos de tamanho fixo, com filas por sessão atendidas de forma
+justa, prioridade para cálculos leves e cotas por sessão.
+"""
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Condition, Thread
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import multiprocessing
+import os
+import time
+
+
+# Prioridades: cálculos leves passam à frente dos pesados
+LIGHT = 0
+HEAVY = 1
+
+# Sessão usada quando nenhuma foi associada ao contexto atual
+ANONYMOUS_SESSION = "anonymous"
+
+# Cálculos da mesma sessão executando ao mesmo tempo
+DEFAULT_MAX_RUNNING_PER_SESSION = 2
+
+# Cálculos de uma sessão aguardando na fila; os excedentes são recusados
+DEFAULT_MAX_QUEUED_PER_SESSION = 32
+
+# Segundos de CPU por sessão na janela de cota; acima disso a sessão só é atendida quando as demais estão ociosas
+DEFAULT_CPU_QUOTA = 20.0
+
+# Janela deslizante da cota de CPU (segundos)
+DEFAULT_QUOTA_WINDOW = 60.0
+
+# Processos do pool reservados para cálculos leves (se o pool tiver mais de um)
+DEFAULT_RESERVED_LIGHT_WORKERS = 1
+
+# Cálculos leves seguidos antes de um pesado que aguarda ser atendido (evita inanição)
+LIGHT_BURST = 4
+
+# Sessão associada ao contexto atual (thread de execução do script ou etapa em segundo plano)
+current_session: ContextVar[str] = ContextVar("derivata_session", default=ANONYMOUS_SESSION)
+
+
+@contextmanager
+def session_scope(session_id: str) -> Iterator[None]:
+    """Associa os cálculos submetidos dentro do bloco à sessão informada."""
+    token = current_session.set(session_id)
+    try:
+        yield
+    finally:
+        current_session.reset(token)
+
+
+class QuotaExceeded(Exception):
+    """A fila da sessão está cheia; o cálculo foi recusado."""
+
+
+def _timed_call(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, float]:
+    """Executa no processo do pool e retorna (resultado, segundos de CPU gastos)."""
+    start = time.process_time()
+    value = fn(*args)
+    return value, time.process_time() - start
+
+
+@dataclass(eq=False)
+class _Task:
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    session: str
+    priority: int
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _SessionState:
+    queues: Tuple[Deque[_Task], Deque[_Task]] = field(default_factory=lambda: (deque(), deque()))
+    running: int = 0
+    cpu: Deque[Tuple[float, float]] = field(default_factory=deque)
+
+    def queued(self, priority: Optional[int] = None) -> int:
+        if priority is None:
+            return len(self.queues[LIGHT]) + len(self.queues[HEAVY])
+        return len(self.queues[priority])
+
+    def cpu_used(self, window: float, now: float) -> float:
+        while self.cpu and self.cpu[0][0] < now - window:
+            self.cpu.popleft()
+        return sum(seconds for _, seconds in self.cpu)
+
+
+class ComputeScheduler:
+    """
+    Distribui cálculos de todas as sessões em um pool de processos de tamanho fixo.
+
+    Os cálculos aguardam em filas por sessão e por prioridade; a cada vaga no
+    pool, as sessões são atendidas em rodízio, primeiro os cálculos leves
+    (com um pesado a cada LIGHT_BURST leves, se houver pesados esperando).
+    Cálculos pesados nunca ocupam os processos reservados aos leves, de modo que
+    a latência dos leves não depende da carga pesada. Cada sessão tem um limite
+    de cálculos simultâneos e de cálculos na fila, e uma cota de segundos de
+    CPU: a sessão que a excede só é atendida quando nenhuma outra tem cálculos
+    esperando. O pool só é criado no primeiro cálculo e é recriado se um de
+    seus processos morrer (por exemplo, por falta de memória): só os cálculos
+    que estavam no pool falham. Cancelar o Future de um cálculo ainda na fila
+    o retira da fila, sem ocupar a vaga nem a cota da sessão.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_running_per_session: int = DEFAULT_MAX_RUNNING_PER_SESSION,
+        max_queued_per_session: int = DEFAULT_MAX_QUEUED_PER_SESSION,
+        cpu_quota: float = DEFAULT_CPU_QUOTA,
+        quota_window: float = DEFAULT_QUOTA_WINDOW,
+        reserved_light_workers: int = DEFAULT_RESERVED_LIGHT_WORKERS
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.heavy_workers = max(1, self.workers - reserved_light_workers)
+        self.max_running_per_session = max_running_per_session
+        self.max_queued_per_session = max_queued_per_session
+        self.cpu_quota = cpu_quota
+        self.quota_window = quota_window
+        self._sessions: Dict[str, _SessionState] = {}
+        self._rotation: Deque[str] = deque()
+        self._running = 0
+        self._running_heavy = 0
+        self._light_streak = 0
+        self._condition = Condition()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dispatcher: Optional[Thread] = None
+        self._stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "withdrawn": 0, "pool_restarts": 0
+        }
+        self._wait_totals = [0.0, 0.0]
+        self._wait_counts = [0, 0]
+
+    def submit(self, fn: Callable[..., Any], *args: Any, priority: int = LIGHT, session: Optional[str] = None) -> Future:
+        """
+        Enfileira `fn(*args)` para a sessão (por padrão, a do contexto atual).
+
+        `fn` e os argumentos precisam ser serializáveis (funções de módulo).
+        Levanta QuotaExceeded se a fila da sessão estiver cheia.
+        """
+        session = session or current_session.get()
+        task = _Task(fn, args, session, priority)
+        with self._condition:
+            state = self._sessions.get(session)
+            if state is None:
+                state = self._sessions[session] = _SessionState()
+                self._rotation.append(session)
+            if state.queued() >= self.max_queued_per_session:
+                self._stats["rejected"] += 1
+                raise QuotaExceeded(
+                    f"Muitos cálculos na fila desta sessão ({state.queued()}); aguarde os anteriores terminarem."
+                )
+            state.queues[priority].append(task)
+            self._stats["submitted"] += 1
+            self._ensure_dispatcher()
+            self._condition.notify()
+        task.future.add_done_callback(lambda future, task=task: self._withdraw(task) if future.cancelled() else None)
+        return task.future
+
+    def run(self, fn: Callable[..., Any], *args: Any, priority: int = LIGHT) -> Any:
+        """Submete o cálculo e aguarda o resultado."""
+        return self.submit(fn, *args, priority=priority).result()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Profundidade das filas, cálculos em execução, uso de CPU por sessão e tempos médios de espera."""
+        now = time.monotonic()
+        with self._condition:
+            sessions = {
+                session: {
+                    "queued_light": state.queued(LIGHT),
+                    "queued_heavy": state.queued(HEAVY),
+                    "running": state.running,
+                    "cpu_s": round(state.cpu_used(self.quota_window, now), 3)
+                }
+                for session, state in self._sessions.items()
+            }
+            return dict(
+                self._stats,
+                workers=self.workers,
+                running=self._running,
+                running_heavy=self._running_heavy,
+                queued_light=sum(item["queued_light"] for item in sessions.values()),
+                queued_heavy=sum(item["queued_heavy"] for item in sessions.values()),
+                mean_wait_light_ms=self._mean_wait_ms(LIGHT),
+                mean_wait_heavy_ms=self._mean_wait_ms(HEAVY),
+                sessions=sessions
+            )
+
+    def shutdown(self) -> None:
+        """Encerra o pool; cálculos na fila são cancelados."""
+        with self._condition:
+            for state in self._sessions.values():
+                for queue in state.queues:
+                    while queue:
+                        queue.popleft().future.cancel()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _mean_wait_ms(self, priority: int) -> float:
+        if not self._wait_counts[priority]:
+            return 0.0
+        return round(self._wait_totals[priority] / self._wait_counts[priority] * 1000, 2)
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = Thread(target=self._dispatch_loop, name="derivata-scheduler", daemon=True)
+            self._dispatcher.start()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # forkserver: os processos não herdam as threads das sessões do Streamlit
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=context)
+        return self._executor
+
+    def _discard_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Descarta o pool quebrado; o próximo cálculo cria um novo."""
+        with self._condition:
+            if self._executor is not broken:
+                return
+            self._executor = None
+            self._stats["pool_restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch_loop(self) -> None:
+        """Envia ao pool o próximo cálculo sempre que houver vaga."""
+        while True:
+            with self._condition:
+                task = self._next_task()
+                while task is None:
+                    self._condition.wait()
+                    task = self._next_task()
+                state = self._sessions[task.session]
+                state.running += 1
+                self._running += 1
+                self._running_heavy += task.priority == HEAVY
+                self._wait_totals[task.priority] += time.monotonic() - task.enqueued_at
+                self._wait_counts[task.priority] += 1
+                pool = self._pool()
+
+            if not task.future.set_running_or_notify_cancel():
+                self._finish(task, cpu_seconds=0.0, outcome=None)
+                continue
+            try:
+                try:
+                    pool_future = pool.submit(_timed_call, task.fn, task.args)
+                except BrokenProcessPool:
+                    # O pool quebrou antes deste cálculo chegar a ele: vai para um pool novo
+                    self._discard_pool(pool)
+                    with self._condition:
+                        pool = self._pool()
+                    pool_future = pool.submit(_timed_call, task.fn, task.args)
+            except Exception as e:
+                task.future.set_exception(e)
+                self._finish(task, cpu_seconds=0.0, outcome="failed")
+                continue
+            pool_future.add_done_callback(lambda done, task=task, pool=pool: self._on_done(task, pool, done))
+
+    def _on_done(self, task: _Task, pool: ProcessPoolExecutor, done: Future) -> None:
+        try:
+            value, cpu_seconds = done.result()
+        except BaseException as e:
+            if isinstance(e, BrokenProcessPool):
+                self._discard_pool(pool)
+            task.future.set_exception(e)
+            self._finish(task, cpu_seconds=0.0, outcome="failed")
+            return
+        task.future.set_result(value)
+        self._finish(task, cpu_seconds, outcome="completed")
+
+    def _withdraw(self, task: _Task) -> None:
+        """Retira da fila um cálculo cancelado antes de ser enviado ao pool."""
+        with self._condition:
+            state = self._sessions.get(task.session)
+            if state is None:
+                return
+            try:
+                state.queues[task.priority].remove(task)
+            except ValueError:
+                # Já saiu da fila: o laço de envio descarta o cálculo cancelado
+                return
+            self._stats["withdrawn"] += 1
+
+    def _finish(self, task: _Task, cpu_seconds: float, outcome: Optional[str]) -> None:
+        with self._condition:
+            state = self._sessions[task.session]
+            state.running -= 1
+            self._running -= 1
+            self._running_heavy -= task.priority == HEAVY
+            if cpu_seconds:
+                state.cpu.append((time.monotonic(), cpu_seconds))
+            if outcome is not None:
+                self._stats[outcome] += 1
+            self._condition.notify()
+
+    def _next_task(self) -> Optional[_Task]:
+        """
+        Escolhe o próximo cálculo, se houver vaga no pool.
+
+        Ordem: sessões dentro da cota antes das que a excederam; dentro de cada
+        grupo, leves antes de pesados (salvo após LIGHT_BURST leves seguidos, e
+        pesados só até `heavy_workers` simultâneos); entre sessões, rodízio.
+        """
+        if self._running >= self.workers:
+            return None
+        now = time.monotonic()
+        self._forget_idle_sessions(now)
+        eligible = [
+            session for session in self._rotation
+            if self._sessions[session].running < self.max_running_per_session and self._sessions[session].queued()
+        ]
+        if not eligible:
+            return None
+        within_quota = [s for s in eligible if self._sessions[s].cpu_used(self.quota_window, now) < self.cpu_quota]
+        candidates = within_quota or eligible
+
+        order = (LIGHT, HEAVY)
+        if self._running_heavy >= self.heavy_workers:
+            order = (LIGHT,)
+        elif self._light_streak >= LIGHT_BURST and any(self._sessions[s].queued(HEAVY) for s in candidates):
+            order = (HEAVY, LIGHT)
+        for priority in order:
+            for session in candidates:
+                queue = self._sessions[session].queues[priority]
+                if queue:
+                    # A sessão atendida vai para o fim do rodízio
+                    self._rotation.remove(session)
+                    self._rotation.append(session)
+                    self._light_streak = self._light_streak + 1 if priority == LIGHT else 0
+                    return queue.popleft()
+        return None
+
+    def _forget_idle_sessions(self, now: float) -> None:
+        """Remove o estado das sessões sem cálculos e sem consumo de CPU na janela."""
+        idle: List[str] = [
+            session for session, state in self._sessions.items()
+            if not state.running and not state.queued() and not state.cpu_used(self.quota_window, now)
+        ]
+        for session in idle:
+            del self._sessions[session]
+            self._rotation.remove(session)
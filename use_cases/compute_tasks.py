@@ -0,0 +1,80 @@
+"""
+Cálculos executados pelos backends de cálculo (na thread, no pool ou em um nó remoto).
+Funções de módulo (serializáveis), identificadas pelo nome em TASKS, que usam
+serviços locais ao processo com um cache de resultados próprio.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, List
+from adapters.sympy_adapter import SymPyAdapter
+from use_cases.compute_scheduler import LIGHT, HEAVY
+from use_cases.result_cache import ResultCache
+
+
+# Expressões até este tamanho (em caracteres) e ordens até esta são cálculos leves
+LIGHT_MAX_CHARS = 80
+LIGHT_MAX_ORDER = 3
+
+
+def estimate_priority(operation: str, expression_str: str, order: int = 1) -> int:
+    """Classifica o cálculo como leve ou pesado; pontos críticos (sp.solve) são sempre pesados."""
+    if operation == "critical_points":
+        return HEAVY
+    if len(expression_str) > LIGHT_MAX_CHARS or order > LIGHT_MAX_ORDER:
+        return HEAVY
+    return LIGHT
+
+
+@lru_cache(maxsize=None)
+def _task_cache() -> ResultCache:
+    """Cache das tarefas, separado do cache dos serviços que as pedem (que pode estar no mesmo processo)."""
+    return ResultCache()
+
+
+@lru_cache(maxsize=None)
+def _derivative_service():
+    from use_cases.derivative_service import DerivativeService
+    return DerivativeService(SymPyAdapter(), _task_cache())
+
+
+@lru_cache(maxsize=None)
+def _partial_derivative_service():
+    from use_cases.partial_derivative_service import PartialDerivativeService
+    return PartialDerivativeService(SymPyAdapter(), _task_cache())
+
+
+def derivative(expression_str: str, variable: str, order: int):
+    return _derivative_service().calculate_derivative(expression_str, variable, order)
+
+
+def derivative_sequence(expression_str: str, variable: str, max_order: int):
+    return _derivative_service().calculate_derivative_sequence(expression_str, variable, max_order)
+
+
+def partial_derivatives(expression_str: str, variables: List[str]):
+    return _partial_derivative_service().calculate_partial_derivatives(expression_str, variables)
+
+
+def hessian(expression_str: str, variables: List[str]):
+    return _partial_derivative_service().calculate_hessian(expression_str, variables)
+
+
+def critical_points(expression_str: str, variables: List[str]):
+    return _partial_derivative_service().find_critical_points(expression_str, variables)
+
+
+# Tarefas aceitas pelos backends, pelo nome
+TASKS: Dict[str, Callable[..., Any]] = {
+    "derivative": derivative,
+    "derivative_sequence": derivative_sequence,
+    "partial_derivatives": partial_derivatives,
+    "hessian": hessian,
+    "critical_points": critical_points
+}
+
+
+def get_task(name: str) -> Callable[..., Any]:
+    """Função da tarefa; levanta ValueError para nomes desconhecidos."""
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise ValueError(f"Tarefa desconhecida: {name} (use {', '.join(TASKS)})") from None
@@ -2,19 +2,79 @@
 Serviço para cálculo de derivadas.
 Implementa os casos de uso relacionados a derivadas.
 """
+from concurrent.futures import Future
 from typing import List, Dict, Optional, Union
-from domain.models import Expression, DerivativeResult
+import sympy as sp
+from domain.models import Expression, DerivativeResult, parse_expression
+from adapters.futures import call_now
 from adapters.sympy_adapter import SymPyAdapter
+from use_cases.result_cache import ResultCache, shared_result_cache
+from use_cases.compute_backend import ComputeBackend
+from use_cases import compute_tasks
 
 
 class DerivativeService:
     """Serviço para cálculo de derivadas."""
     
-    def __init__(self, sympy_adapter: SymPyAdapter):
+    def __init__(
+        self,
+        sympy_adapter: SymPyAdapter,
+        result_cache: Optional[ResultCache] = None,
+        backend: Optional[ComputeBackend] = None
+    ):
         self.sympy_adapter = sympy_adapter
+        self.result_cache = result_cache if result_cache is not None else shared_result_cache()
+        # Com um backend, os cálculos rodam onde ele indicar (pool de processos ou nós remotos)
+        self.backend = backend
     
     def calculate_derivative(self, expression_str: str, variable: str, order: int = 1) -> Optional[DerivativeResult]:
         """Calcula a derivada de uma expressão."""
+        key = ResultCache.make_key("derivative", expression_str, variable, order)
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self._run(
+                "derivative",
+                self._calculate_derivative,
+                expression_str,
+                variable,
+                order,
+                priority=compute_tasks.estimate_priority("derivative", expression_str, order)
+            )
+        )
+    
+    def submit_derivative(self, expression_str: str, variable: str, order: int = 1) -> Future:
+        """Como calculate_derivative, mas retorna um Future em vez de aguardar o backend."""
+        key = ResultCache.make_key("derivative", expression_str, variable, order)
+        return self.result_cache.get_or_submit(
+            key,
+            lambda: self._submit(
+                "derivative",
+                self._calculate_derivative,
+                expression_str,
+                variable,
+                order,
+                priority=compute_tasks.estimate_priority("derivative", expression_str, order)
+            )
+        )
+    
+    def is_derivative_cached(self, expression_str: str, variable: str, order: int = 1) -> bool:
+        """Indica se a derivada já está no cache de resultados."""
+        return ResultCache.make_key("derivative", expression_str, variable, order) in self.result_cache
+    
+    def _run(self, task: str, local, *args, priority: int):
+        """Executa a tarefa no backend, se houver, ou `local` na própria thread."""
+        if self.backend is None:
+            return local(*args)
+        return self.backend.run(task, *args, priority=priority)
+    
+    def _submit(self, task: str, local, *args, priority: int) -> Future:
+        """Como _run, mas retorna o Future da tarefa no backend (ou um já concluído, sem backend)."""
+        if self.backend is None:
+            return call_now(local, *args)
+        return self.backend.submit(task, *args, priority=priority)
+    
+    def _calculate_derivative(self, expression_str: str, variable: str, order: int) -> Optional[DerivativeResult]:
+        """Calcula a derivada sem consultar o cache."""
         try:
             # Identificar variáveis na expressão
             variables = self._extract_variables(expression_str)
@@ -34,24 +94,60 @@ class DerivativeService:
             print(f"Erro no serviço de derivadas: {str(e)}")
             return None
     
+    def calculate_derivative_sequence(self, expression_str: str, variable: str, max_order: int) -> Optional[List[sp.Expr]]:
+        """Calcula f, f', ..., f^(max_order), derivando cada ordem a partir da anterior."""
+        key = ResultCache.make_key("sequence", expression_str, variable, max_order)
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self._run(
+                "derivative_sequence",
+                self._calculate_derivative_sequence,
+                expression_str,
+                variable,
+                max_order,
+                priority=compute_tasks.estimate_priority("sequence", expression_str, max_order)
+            )
+        )
+    
+    def submit_derivative_sequence(self, expression_str: str, variable: str, max_order: int) -> Future:
+        """Como calculate_derivative_sequence, mas retorna um Future em vez de aguardar o backend."""
+        key = ResultCache.make_key("sequence", expression_str, variable, max_order)
+        return self.result_cache.get_or_submit(
+            key,
+            lambda: self._submit(
+                "derivative_sequence",
+                self._calculate_derivative_sequence,
+                expression_str,
+                variable,
+                max_order,
+                priority=compute_tasks.estimate_priority("sequence", expression_str, max_order)
+            )
+        )
+    
+    def is_sequence_cached(self, expression_str: str, variable: str, max_order: int) -> bool:
+        """Indica se a sequência de derivadas já está no cache de resultados."""
+        return ResultCache.make_key("sequence", expression_str, variable, max_order) in self.result_cache
+    
+    def _calculate_derivative_sequence(self, expression_str: str, variable: str, max_order: int) -> Optional[List[sp.Expr]]:
+        """Calcula a sequência de derivadas sem consultar o cache."""
+        try:
+            expr = parse_expression(expression_str)
+            sequence = [expr]
+            for _ in range(max_order):
+                sequence.append(sp.diff(sequence[-1], variable))
+            return sequence
+        except Exception as e:
+            print(f"Erro ao calcular a sequência de derivadas: {str(e)}")
+            return None
+    
     def get_derivative_steps(self, expression_str: str, variable: str) -> List[str]:
         """Obtém os passos para o cálculo de uma derivada."""
         try:
-            # Identificar variáveis na expressão
-            variables = self._extract_variables(expression_str)
-            
-            # Verificar se a variável de diferenciação está presente
-            if variable not in variables:
-                variables.append(variable)
-            
-            # Criar objeto Expression
-            expression = Expression(raw_expression=expression_str, variables=variables)
-            
-            # Calcular a derivada para obter os passos
-            result = self.sympy_adapter.calculate_derivative(expression, variable)
+            # Calcular a derivada (ou reaproveitá-la do cache) para obter os passos
+            result = self.calculate_derivative(expression_str, variable)
             
             if result:
-                return result.steps
+                return list(result.steps)
             return ["Não foi possível gerar os passos para esta expressão."]
         except Exception as e:
             print(f"Erro ao gerar passos da derivada: {str(e)}")
@@ -59,10 +155,8 @@ class DerivativeService:
     
     def _extract_variables(self, expression_str: str) -> List[str]:
         """Extrai as variáveis de uma expressão."""
-        import sympy as sp
-        
         try:
-            expr = sp.sympify(expression_str)
+            expr = parse_expression(expression_str)
             return [str(symbol) for symbol in expr.free_symbols]
         except Exception:
             # Fallback: tentar extrair variáveis por análise de string
@@ -0,0 +1,180 @@
+"""
+Snapshot pré-calculado dos resultados dos exemplos da aplicação.
+Os exemplos são fixos e são o que a maioria dos usuários clica primeiro; com o
+snapshot, as primeiras requisições após um deploy são atendidas pelos caches.
+"""
+from pathlib import Path
+from threading import Thread
+from typing import Any, Dict, Iterator, Optional
+import pickle
+import zlib
+import sympy as sp
+from domain.examples import (
+    NORMAL_EXAMPLES,
+    PARTIAL_EXAMPLES,
+    HIGHER_ORDER_EXAMPLES,
+    PARTIAL_EXAMPLE_VARIABLES,
+    MAX_DERIVATIVE_ORDER
+)
+from domain.models import DerivativeResult, PartialDerivativeResult
+from adapters.sympy_adapter import SymPyAdapter
+from adapters.plotly_adapter import PlotlyAdapter
+from adapters.figure_cache import FigureCache, CachedFigure
+from use_cases.result_cache import ResultCache
+from use_cases.latex_renderer import LatexRenderer
+from use_cases.derivative_service import DerivativeService
+from use_cases.partial_derivative_service import PartialDerivativeService
+from use_cases.visualization_service import VisualizationService
+
+
+# Caminho padrão do snapshot, resolvido a partir da raiz do projeto. Fica fora de static/,
+# que no Docker é um volume e esconderia o snapshot gerado na construção da imagem
+SNAPSHOT_PATH = Path(__file__).resolve().parents[1] / "data" / "example_snapshot.bin"
+
+# Incrementar quando o formato do snapshot ou dos resultados mudar
+SNAPSHOT_VERSION = 5
+
+# Variável usada nos exemplos de uma variável
+EXAMPLE_VARIABLE = "x"
+
+
+def build_snapshot() -> Dict[str, Any]:
+    """
+    Calcula os resultados de todos os exemplos com caches vazios e os reúne em um snapshot.
+
+    Inclui derivadas de ordem 1 a MAX_DERIVATIVE_ORDER (com passos), sequências
+    de derivadas, derivadas parciais, Hessianas, pontos críticos, interpretações,
+    figuras serializadas e o LaTeX (e a forma simplificada das derivadas
+    parciais) de cada expressão resultante, como o LatexRenderer os guarda.
+    """
+    result_cache = ResultCache()
+    figure_cache = FigureCache()
+    warm_with_services(result_cache, figure_cache)
+
+    renderer = LatexRenderer(result_cache)
+    for _, value in result_cache.items():
+        for expr in _expressions_in(value):
+            renderer.render(expr)
+        if isinstance(value, PartialDerivativeResult):
+            for derivative in value.derivatives.values():
+                renderer.render(renderer.simplify(derivative))
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "sympy": sp.__version__,
+        "results": result_cache.items(),
+        # Apenas o JSON das figuras é guardado; o objeto Figure é reconstruído na carga
+        "figures": [(key, cached.json, cached.error) for key, cached in figure_cache.items()]
+    }
+
+
+def warm_with_services(result_cache: ResultCache, figure_cache: FigureCache) -> None:
+    """Calcula os resultados de todos os exemplos, preenchendo os caches informados."""
+    sympy_adapter = SymPyAdapter()
+    derivative_service = DerivativeService(sympy_adapter, result_cache)
+    partial_derivative_service = PartialDerivativeService(sympy_adapter, result_cache)
+    visualization_service = VisualizationService(PlotlyAdapter(), sympy_adapter, figure_cache)
+
+    for expression in list(NORMAL_EXAMPLES.values()) + list(HIGHER_ORDER_EXAMPLES.values()):
+        for order in range(1, MAX_DERIVATIVE_ORDER + 1):
+            derivative_service.calculate_derivative(expression, EXAMPLE_VARIABLE, order)
+        for max_order in (1, MAX_DERIVATIVE_ORDER):
+            derivative_service.calculate_derivative_sequence(expression, EXAMPLE_VARIABLE, max_order)
+
+    variables = PARTIAL_EXAMPLE_VARIABLES
+    for expression in PARTIAL_EXAMPLES.values():
+        partial_derivative_service.calculate_partial_derivatives(expression, variables)
+        partial_derivative_service.calculate_hessian(expression, variables)
+        partial_derivative_service.find_critical_points(expression, variables)
+        partial_derivative_service.get_geometric_interpretation(expression, variables)
+        visualization_service.create_3d_visualization(expression, variables)
+        visualization_service.create_gradient_visualization(expression, variables)
+
+
+def write_snapshot(snapshot: Dict[str, Any], path: Path = SNAPSHOT_PATH) -> int:
+    """Grava o snapshot comprimido e retorna o tamanho do arquivo em bytes."""
+    data = zlib.compress(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL), 9)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+    return len(data)
+
+
+def read_snapshot(path: Path = SNAPSHOT_PATH) -> Optional[Dict[str, Any]]:
+    """Lê o snapshot; retorna None se ele não existir ou for de outra versão."""
+    try:
+        snapshot = pickle.loads(zlib.decompress(Path(path).read_bytes()))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Erro ao ler o snapshot dos exemplos: {str(e)}")
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("sympy") != sp.__version__:
+        return None
+    return snapshot
+
+
+def load_snapshot(
+    snapshot: Dict[str, Any],
+    result_cache: ResultCache,
+    figure_cache: FigureCache
+) -> int:
+    """Carrega o snapshot nos caches sem sobrescrever entradas existentes; retorna o número de entradas."""
+    loaded = 0
+    for key, value in snapshot["results"]:
+        if key not in result_cache:
+            result_cache.put(key, value)
+            loaded += 1
+    for key, figure_json, error in snapshot["figures"]:
+        if key not in figure_cache:
+            # A figura é reconstruída do JSON apenas quando exibida (CachedFigure.to_figure)
+            figure_cache.put_cached(key, CachedFigure(error=error, json=figure_json))
+            loaded += 1
+    return loaded
+
+
+def start_snapshot_loader(
+    result_cache: ResultCache,
+    figure_cache: FigureCache,
+    path: Path = SNAPSHOT_PATH
+) -> Thread:
+    """
+    Carrega o snapshot nos caches em segundo plano, sem atrasar o início da aplicação.
+
+    Se não houver snapshot válido (por exemplo, fora da imagem Docker), os
+    exemplos são calculados diretamente nos caches e o snapshot é gravado para
+    os próximos inícios, quando o diretório permitir.
+    """
+    def run():
+        snapshot = read_snapshot(path)
+        if snapshot is not None:
+            load_snapshot(snapshot, result_cache, figure_cache)
+            return
+        snapshot = build_snapshot()
+        load_snapshot(snapshot, result_cache, figure_cache)
+        try:
+            write_snapshot(snapshot, path)
+        except OSError as e:
+            print(f"Não foi possível gravar o snapshot dos exemplos: {str(e)}")
+
+    thread = Thread(target=run, name="derivata-snapshot", daemon=True)
+    thread.start()
+    return thread
+
+
+def _expressions_in(value: Any) -> Iterator[sp.Basic]:
+    """Percorre as expressões SymPy contidas em um resultado dos serviços."""
+    if isinstance(value, DerivativeResult):
+        yield value.original_expression.sympy_expr
+        yield value.result
+    elif isinstance(value, PartialDerivativeResult):
+        yield value.original_expression.sympy_expr
+        yield from value.derivatives.values()
+    elif isinstance(value, sp.MatrixBase):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, sp.Basic):
+                yield item
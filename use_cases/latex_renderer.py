@@ -0,0 +1,162 @@
+"""
+Renderização de expressões em LaTeX com memoização e limite de tamanho.
+Cada expressão é convertida uma única vez; expressões grandes são exibidas de
+forma abreviada (com subexpressões comuns nomeadas, ou truncada), para que nem
+o servidor nem o MathJax/KaTeX do navegador travem em derivadas enormes.
+"""
+from dataclasses import dataclass
+from typing import Optional
+import sympy as sp
+from use_cases.result_cache import ResultCache, shared_result_cache
+
+
+# Tamanho máximo do LaTeX exibido, em caracteres
+MAX_LATEX_CHARS = 3000
+
+# Até este número de nós a expressão é convertida por inteiro
+MAX_FULL_NODES = 1500
+
+# Até este número de nós tenta-se a forma com subexpressões comuns (CSE)
+MAX_CSE_NODES = 20000
+
+# Acima deste número de nós a simplificação não é tentada
+MAX_SIMPLIFY_NODES = 400
+
+
+@dataclass(frozen=True)
+class RenderedLatex:
+    """LaTeX pronto para exibição e, se abreviado, o resultado completo em texto."""
+    latex: str
+    abbreviated: bool = False
+    note: Optional[str] = None
+    full_text: Optional[str] = None
+
+
+def count_nodes(expr: sp.Basic, limit: int) -> int:
+    """Conta os nós da árvore da expressão, parando ao atingir `limit`."""
+    count = 0
+    for _ in sp.preorder_traversal(expr):
+        count += 1
+        if count >= limit:
+            break
+    return count
+
+
+class LatexRenderer:
+    """Converte expressões em LaTeX, guardando o resultado no cache de resultados."""
+
+    def __init__(
+        self,
+        result_cache: Optional[ResultCache] = None,
+        max_chars: int = MAX_LATEX_CHARS
+    ):
+        self.result_cache = result_cache if result_cache is not None else shared_result_cache()
+        self.max_chars = max_chars
+
+    def render(self, expr: sp.Basic) -> RenderedLatex:
+        """Retorna o LaTeX da expressão, abreviado se ele exceder o limite de tamanho."""
+        expr = self._as_basic(expr)
+        return self.result_cache.get_or_compute(("latex", expr), lambda: self._render(expr))
+
+    def latex(self, expr: sp.Basic) -> str:
+        """Atalho para o LaTeX exibível da expressão."""
+        return self.render(expr).latex
+
+    def simplify(self, expr: sp.Basic) -> sp.Basic:
+        """Simplifica a expressão uma única vez; expressões grandes são mantidas como estão."""
+        expr = self._as_basic(expr)
+        if count_nodes(expr, MAX_SIMPLIFY_NODES) >= MAX_SIMPLIFY_NODES:
+            return expr
+        return self.result_cache.get_or_compute(("simplify", expr), lambda: sp.simplify(expr))
+
+    def _render(self, expr: sp.Basic) -> RenderedLatex:
+        nodes = count_nodes(expr, MAX_CSE_NODES)
+        if nodes < MAX_FULL_NODES:
+            latex = sp.latex(expr)
+            if len(latex) <= self.max_chars:
+                return RenderedLatex(latex)
+
+        full_text = sp.sstr(expr)
+        if nodes < MAX_CSE_NODES:
+            latex = self._cse_latex(expr)
+            if latex is not None:
+                return RenderedLatex(
+                    latex,
+                    abbreviated=True,
+                    note="Resultado grande: subexpressões repetidas foram nomeadas.",
+                    full_text=full_text
+                )
+
+        latex, omitted = self._truncated_latex(expr)
+        return RenderedLatex(
+            latex,
+            abbreviated=True,
+            note=f"Resultado grande: {omitted} termo(s) omitido(s) na exibição.",
+            full_text=full_text
+        )
+
+    def _cse_latex(self, expr: sp.Basic) -> Optional[str]:
+        """Forma com subexpressões comuns nomeadas, se ela couber no limite."""
+        replacements, reduced = sp.cse(expr, symbols=sp.numbered_symbols("c"))
+        if not replacements:
+            return None
+        lines = [sp.latex(reduced[0])]
+        for symbol, value in replacements:
+            lines.append(f"{sp.latex(symbol)} = {sp.latex(value)}")
+        latex = r"\begin{aligned}& " + r" \\ \text{onde } & ".join(lines[:2]) + "".join(
+            r" \\ & " + line for line in lines[2:]
+        ) + r"\end{aligned}"
+        return latex if len(latex) <= self.max_chars else None
+
+    def _truncated_latex(self, expr: sp.Basic, budget: Optional[int] = None):
+        """
+        Exibe os primeiros termos até o limite de caracteres; retorna (LaTeX, termos omitidos).
+
+        Somas e produtos mostram os termos que cabem e abreviam o primeiro que
+        não cabe, recursivamente; o custo é limitado pelo orçamento, não pelo
+        tamanho da expressão.
+        """
+        budget = self.max_chars if budget is None else budget
+        if count_nodes(expr, MAX_FULL_NODES) < MAX_FULL_NODES:
+            latex = sp.latex(expr)
+            if len(latex) <= budget:
+                return latex, 0
+        if not isinstance(expr, (sp.Add, sp.Mul)) or budget <= 0:
+            return r"\cdots", 1
+
+        separator = " + " if isinstance(expr, sp.Add) else r" \cdot "
+        parts = []
+        omitted = 0
+        remaining = budget
+        for index, arg in enumerate(expr.args):
+            piece, arg_omitted = self._truncated_latex(arg, remaining)
+            if isinstance(expr, sp.Mul) and isinstance(arg, sp.Add):
+                piece = rf"\left({piece}\right)"
+            parts.append(piece)
+            remaining -= len(piece)
+            if arg_omitted:
+                # O termo foi abreviado: os demais também são omitidos
+                omitted = arg_omitted + len(expr.args) - index - 1
+                if index < len(expr.args) - 1:
+                    parts.append(r"\cdots")
+                break
+        latex = parts[0]
+        for piece in parts[1:]:
+            # Termos negativos já trazem o sinal: "a - b" em vez de "a + - b"
+            latex += f" {piece}" if separator == " + " and piece.startswith("-") else separator + piece
+        return latex, omitted
+
+    @staticmethod
+    def _as_basic(expr):
+        """Matrizes mutáveis não são hashable; usa-se a forma imutável."""
+        if isinstance(expr, sp.MatrixBase) and not isinstance(expr, sp.Basic):
+            return sp.ImmutableMatrix(expr)
+        return expr
+
+
+_shared_latex_renderer = LatexRenderer()
+
+
+def shared_latex_renderer() -> LatexRenderer:
+    """Retorna o renderizador de LaTeX compartilhado pelo processo."""
+    return _shared_latex_renderer
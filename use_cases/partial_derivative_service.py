@@ -2,19 +2,77 @@
 Serviço para cálculo de derivadas parciais.
 Implementa os casos de uso relacionados a derivadas parciais.
 """
+from concurrent.futures import Future
 from typing import List, Dict, Optional, Union, Tuple
-from domain.models import Expression, PartialDerivativeResult, CriticalPoint
+import sympy as sp
+from domain.models import Expression, PartialDerivativeResult, CriticalPoint, parse_expression
+from adapters.futures import call_now
 from adapters.sympy_adapter import SymPyAdapter
+from use_cases.result_cache import ResultCache, shared_result_cache
+from use_cases.compute_backend import ComputeBackend
+from use_cases import compute_tasks
 
 
 class PartialDerivativeService:
     """Serviço para cálculo de derivadas parciais."""
     
-    def __init__(self, sympy_adapter: SymPyAdapter):
+    def __init__(
+        self,
+        sympy_adapter: SymPyAdapter,
+        result_cache: Optional[ResultCache] = None,
+        backend: Optional[ComputeBackend] = None
+    ):
         self.sympy_adapter = sympy_adapter
+        self.result_cache = result_cache if result_cache is not None else shared_result_cache()
+        # Com um backend, os cálculos rodam onde ele indicar (pool de processos ou nós remotos)
+        self.backend = backend
     
     def calculate_partial_derivatives(self, expression_str: str, variables: List[str]) -> Optional[PartialDerivativeResult]:
         """Calcula todas as derivadas parciais para uma função multivariável."""
+        key = ResultCache.make_key("partial", expression_str, variables)
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self._run(
+                "partial_derivatives",
+                self._calculate_partial_derivatives,
+                expression_str,
+                variables,
+                priority=compute_tasks.estimate_priority("partial", expression_str)
+            )
+        )
+    
+    def submit_partial_derivatives(self, expression_str: str, variables: List[str]) -> Future:
+        """Como calculate_partial_derivatives, mas retorna um Future em vez de aguardar o backend."""
+        key = ResultCache.make_key("partial", expression_str, variables)
+        return self.result_cache.get_or_submit(
+            key,
+            lambda: self._submit(
+                "partial_derivatives",
+                self._calculate_partial_derivatives,
+                expression_str,
+                variables,
+                priority=compute_tasks.estimate_priority("partial", expression_str)
+            )
+        )
+    
+    def is_gradient_cached(self, expression_str: str, variables: List[str]) -> bool:
+        """Indica se as derivadas parciais já estão no cache de resultados."""
+        return ResultCache.make_key("partial", expression_str, variables) in self.result_cache
+    
+    def _run(self, task: str, local, *args, priority: int):
+        """Executa a tarefa no backend, se houver, ou `local` na própria thread."""
+        if self.backend is None:
+            return local(*args)
+        return self.backend.run(task, *args, priority=priority)
+    
+    def _submit(self, task: str, local, *args, priority: int) -> Future:
+        """Como _run, mas retorna o Future da tarefa no backend (ou um já concluído, sem backend)."""
+        if self.backend is None:
+            return call_now(local, *args)
+        return self.backend.submit(task, *args, priority=priority)
+    
+    def _calculate_partial_derivatives(self, expression_str: str, variables: List[str]) -> Optional[PartialDerivativeResult]:
+        """Calcula as derivadas parciais sem consultar o cache."""
         try:
             # Criar objeto Expression
             expression = Expression(raw_expression=expression_str, variables=variables)
@@ -27,6 +85,46 @@ class PartialDerivativeService:
             print(f"Erro no serviço de derivadas parciais: {str(e)}")
             return None
     
+    def calculate_hessian(self, expression_str: str, variables: List[str]) -> Optional[sp.Matrix]:
+        """Calcula a matriz Hessiana de uma função multivariável."""
+        key = ResultCache.make_key("hessian", expression_str, variables)
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self._run(
+                "hessian",
+                self._calculate_hessian,
+                expression_str,
+                variables,
+                priority=compute_tasks.estimate_priority("hessian", expression_str)
+            )
+        )
+    
+    def submit_hessian(self, expression_str: str, variables: List[str]) -> Future:
+        """Como calculate_hessian, mas retorna um Future em vez de aguardar o backend."""
+        key = ResultCache.make_key("hessian", expression_str, variables)
+        return self.result_cache.get_or_submit(
+            key,
+            lambda: self._submit(
+                "hessian",
+                self._calculate_hessian,
+                expression_str,
+                variables,
+                priority=compute_tasks.estimate_priority("hessian", expression_str)
+            )
+        )
+    
+    def _calculate_hessian(self, expression_str: str, variables: List[str]) -> Optional[sp.Matrix]:
+        """Calcula a matriz Hessiana sem consultar o cache."""
+        return self.sympy_adapter.calculate_hessian(Expression(raw_expression=expression_str, variables=variables))
+    
+    def is_hessian_cached(self, expression_str: str, variables: List[str]) -> bool:
+        """Indica se a matriz Hessiana já está no cache de resultados."""
+        return ResultCache.make_key("hessian", expression_str, variables) in self.result_cache
+    
+    def is_critical_points_cached(self, expression_str: str, variables: List[str]) -> bool:
+        """Indica se os pontos críticos já estão no cache de resultados."""
+        return ResultCache.make_key("critical_points", expression_str, variables) in self.result_cache
+    
     def get_partial_derivative_steps(self, expression_str: str, variable: str) -> List[str]:
         """Obtém os passos para o cálculo de uma derivada parcial."""
         try:
@@ -37,21 +135,46 @@ class PartialDerivativeService:
             if variable not in all_variables:
                 all_variables.append(variable)
             
-            # Criar objeto Expression
-            expression = Expression(raw_expression=expression_str, variables=all_variables)
-            
             # Calcular as derivadas parciais para obter os passos
-            result = self.sympy_adapter.calculate_partial_derivatives(expression)
+            result = self.calculate_partial_derivatives(expression_str, all_variables)
             
             if result and variable in result.steps:
-                return result.steps[variable]
+                return list(result.steps[variable])
             return ["Não foi possível gerar os passos para esta derivada parcial."]
         except Exception as e:
             print(f"Erro ao gerar passos da derivada parcial: {str(e)}")
             return ["Não foi possível gerar os passos para esta derivada parcial."]
     
-    def find_critical_points(self, expression_str: str, variables: List[str]) -> List[CriticalPoint]:
-        """Encontra pontos críticos de uma função multivariável."""
+    def find_critical_points(self, expression_str: str, variables: List[str]) -> Optional[List[CriticalPoint]]:
+        """Encontra pontos críticos de uma função multivariável (None em caso de falha)."""
+        key = ResultCache.make_key("critical_points", expression_str, variables)
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self._run(
+                "critical_points",
+                self._find_critical_points,
+                expression_str,
+                variables,
+                priority=compute_tasks.estimate_priority("critical_points", expression_str)
+            )
+        )
+    
+    def submit_critical_points(self, expression_str: str, variables: List[str]) -> Future:
+        """Como find_critical_points, mas retorna um Future em vez de aguardar o backend."""
+        key = ResultCache.make_key("critical_points", expression_str, variables)
+        return self.result_cache.get_or_submit(
+            key,
+            lambda: self._submit(
+                "critical_points",
+                self._find_critical_points,
+                expression_str,
+                variables,
+                priority=compute_tasks.estimate_priority("critical_points", expression_str)
+            )
+        )
+    
+    def _find_critical_points(self, expression_str: str, variables: List[str]) -> Optional[List[CriticalPoint]]:
+        """Encontra os pontos críticos sem consultar o cache."""
         try:
             # Criar objeto Expression
             expression = Expression(raw_expression=expression_str, variables=variables)
@@ -62,7 +185,7 @@ class PartialDerivativeService:
             return critical_points
         except Exception as e:
             print(f"Erro ao encontrar pontos críticos: {str(e)}")
-            return []
+            return None
     
     def get_geometric_interpretation(self, expression_str: str, variables: List[str]) -> str:
         """Retorna uma explicação do significado geométrico das derivadas parciais."""
@@ -71,7 +194,7 @@ class PartialDerivativeService:
             expression = Expression(raw_expression=expression_str, variables=variables)
             
             # Calcular derivadas parciais
-            partial_derivatives = self.sympy_adapter.calculate_partial_derivatives(expression)
+            partial_derivatives = self.calculate_partial_derivatives(expression_str, variables)
             
             if not partial_derivatives:
                 return "Não foi possível gerar a interpretação geométrica."
@@ -120,10 +243,8 @@ class PartialDerivativeService:
     
     def _extract_variables(self, expression_str: str) -> List[str]:
         """Extrai as variáveis de uma expressão."""
-        import sympy as sp
-        
         try:
-            expr = sp.sympify(expression_str)
+            expr = parse_expression(expression_str)
             return [str(symbol) for symbol in expr.free_symbols]
         except Exception:
             # Fallback: tentar extrair variáveis por análise de string
@@ -0,0 +1,129 @@
+"""
+Pré-cálculo especulativo das próximas requisições prováveis.
+Usa apenas a capacidade ociosa do processo para preencher o cache de resultados,
+de modo que o próximo clique mais comum seja atendido sem espera.
+"""
+from queue import Full, Queue
+from threading import Lock, Thread, get_native_id
+from typing import TYPE_CHECKING, Any, Callable, Optional
+import os
+import time
+from use_cases.background_jobs import in_flight_jobs
+from use_cases.compute_scheduler import current_session
+
+if TYPE_CHECKING:
+    from use_cases.compute_backend import ComputeBackend
+
+
+# Tamanho máximo da fila de pré-cálculos; sugestões excedentes são descartadas
+DEFAULT_PREFETCH_QUEUE = 16
+
+# Prioridade (nice) da thread de pré-cálculo no Linux
+PREFETCH_NICENESS = 10
+
+# Sessão à qual os pré-cálculos são atribuídos no escalonador
+PREFETCH_SESSION = "prefetch"
+
+# Espera antes de reavaliar a carga quando o processo está ocupado (segundos)
+BUSY_BACKOFF = 0.5
+
+
+def system_busy(backend: Optional["ComputeBackend"] = None) -> bool:
+    """
+    Indica se há trabalho de primeiro plano ou se a CPU já está saturada.
+
+    Enquanto alguma etapa solicitada por um usuário estiver na fila ou
+    executando, o pré-cálculo espera. Com `backend`, contam também os cálculos
+    síncronos das abas (na fila ou executando no backend); os do próprio
+    pré-cálculo não contam, pois ele só consulta a carga entre um cálculo e outro.
+    """
+    if in_flight_jobs() > 0:
+        return True
+    if backend is not None and backend.pending() > 0:
+        return True
+    try:
+        return os.getloadavg()[0] >= (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return False
+
+
+class Prefetcher:
+    """
+    Executa pré-cálculos em uma única thread de baixa prioridade.
+
+    As sugestões são descartadas (e não enfileiradas) quando já estão em cache,
+    quando já foram sugeridas ou quando a fila está cheia; a thread espera
+    enquanto `is_busy` indicar carga, para nunca disputar CPU com requisições reais.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = DEFAULT_PREFETCH_QUEUE,
+        is_busy: Callable[[], bool] = system_busy
+    ):
+        self.is_busy = is_busy
+        self._queue: Queue = Queue(maxsize=max_queue)
+        self._queued = set()
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+        self._stats = {"submitted": 0, "dropped": 0, "completed": 0, "failed": 0}
+
+    def submit(self, key: Any, fn: Callable[..., Any], *args: Any, cached: bool = False) -> bool:
+        """
+        Sugere um pré-cálculo identificado por `key`.
+
+        Retorna False se a sugestão foi descartada. O resultado de `fn` não é
+        devolvido: espera-se que `fn` preencha um cache (por exemplo, um método
+        de serviço que usa o cache de resultados).
+        """
+        if cached:
+            return False
+        with self._lock:
+            if key in self._queued:
+                return False
+            try:
+                self._queue.put_nowait((key, fn, args))
+            except Full:
+                self._stats["dropped"] += 1
+                return False
+            self._queued.add(key)
+            self._stats["submitted"] += 1
+            self._ensure_thread()
+        return True
+
+    def stats(self):
+        """Retorna contadores de pré-cálculos sugeridos, descartados e concluídos."""
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize())
+
+    def _ensure_thread(self) -> None:
+        """Inicia a thread de pré-cálculo na primeira sugestão."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = Thread(target=self._worker, name="derivata-prefetch", daemon=True)
+            self._thread.start()
+
+    def _worker(self) -> None:
+        """Consome a fila, cedendo a vez sempre que houver carga."""
+        self._lower_priority()
+        current_session.set(PREFETCH_SESSION)
+        while True:
+            key, fn, args = self._queue.get()
+            while self.is_busy():
+                time.sleep(BUSY_BACKOFF)
+            try:
+                fn(*args)
+                outcome = "completed"
+            except Exception as e:
+                print(f"Erro no pré-cálculo: {str(e)}")
+                outcome = "failed"
+            with self._lock:
+                self._queued.discard(key)
+                self._stats[outcome] += 1
+
+    @staticmethod
+    def _lower_priority() -> None:
+        """Reduz a prioridade da thread atual, quando o sistema permite (Linux)."""
+        try:
+            os.setpriority(os.PRIO_PROCESS, get_native_id(), PREFETCH_NICENESS)
+        except (AttributeError, OSError):
+            pass
@@ -0,0 +1,249 @@
+"""
+Cache de resultados simbólicos compartilhado pelo processo.
+Entradas equivalentes (por exemplo, 'x*y' e 'y*x') reaproveitam o mesmo resultado,
+independentemente da sessão que o calculou, e cálculos idênticos simultâneos
+são executados uma única vez. Atrás da memória pode haver um cache em disco,
+que preserva os resultados entre reinícios e entre as réplicas do mesmo host;
+a aplicação o ativa ao construir os serviços, enquanto o uso como biblioteca e
+pelas ferramentas de linha de comando fica só em memória.
+"""
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+import os
+import pickle
+import sympy as sp
+from domain.models import canonical_form
+from adapters.disk_cache import PICKLE_PROTOCOL, DiskCache
+from adapters.futures import completed
+from adapters.memory_cache import LRUCache
+from adapters.single_flight import SingleFlight
+
+
+# Limite padrão de memória dos resultados simbólicos (32 MiB)
+DEFAULT_RESULT_CACHE_BYTES = 32 * 1024 * 1024
+
+# Arquivo padrão do cache em disco (./static é um volume persistente no docker-compose)
+DISK_CACHE_PATH = Path(__file__).resolve().parents[1] / "static" / "result_cache.sqlite3"
+
+# Limite padrão do cache em disco (256 MiB, comprimido)
+DEFAULT_DISK_CACHE_BYTES = 256 * 1024 * 1024
+
+# Validade das entradas em disco (30 dias)
+DEFAULT_DISK_CACHE_TTL = 30 * 24 * 3600.0
+
+# Incrementar quando o formato dos resultados ou das chaves mudar; entradas de outro formato são descartadas
+RESULT_FORMAT_VERSION = 5
+
+
+class ResultCache:
+    """Cache LRU de resultados dos serviços, indexado pela forma canônica da expressão."""
+
+    def __init__(self, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES, disk: Optional[DiskCache] = None):
+        self._cache = LRUCache(max_bytes)
+        self._flight = SingleFlight()
+        self._disk = disk
+
+    @staticmethod
+    def make_key(operation: str, expression_str: str, *params: Hashable) -> Hashable:
+        """Monta a chave a partir da operação, da forma canônica da expressão e dos parâmetros."""
+        return (operation, canonical_form(expression_str)) + tuple(
+            tuple(param) if isinstance(param, list) else param for param in params
+        )
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retorna o resultado em cache ou o calcula e guarda.
+
+        Se o mesmo cálculo já estiver em andamento em outra thread (outra
+        sessão, um estágio em segundo plano ou o prefetcher), aguarda o
+        resultado dele em vez de repeti-lo. Na falta em memória, o cache em
+        disco é consultado antes de calcular. None indica falha do serviço
+        (possivelmente passageira) e não é guardado em nenhum dos níveis.
+        """
+        sentinel = object()
+        value = self._cache.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        return self._flight.do(key, lambda: self._load_or_compute(key, compute))
+
+    def _load_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        sentinel = object()
+        # O cálculo pode ter terminado entre a consulta em memória e a entrada no grupo
+        value = self._cache.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        disk_key = make_disk_key(key) if self._disk is not None else None
+        if disk_key is not None:
+            value = self._disk.get(disk_key, sentinel)
+            if value is not sentinel:
+                self._cache.put(key, value)
+                return value
+        value = compute()
+        if value is not None:
+            self._cache.put(key, value)
+            if disk_key is not None:
+                self._disk.put(disk_key, value)
+        return value
+
+    def get_or_submit(self, key: Hashable, submit: Callable[[], Future]) -> Future:
+        """
+        Versão assíncrona de get_or_compute, para quem não deve bloquear uma thread.
+
+        `submit` inicia o cálculo (por exemplo, no escalonador) e retorna o seu
+        Future; o resultado é guardado quando ele termina. Um resultado em
+        cache volta como um Future já concluído.
+        """
+        sentinel = object()
+        value = self._cache.get(key, sentinel)
+        if value is not sentinel:
+            return completed(value)
+        return self._flight.submit(key, lambda: self._load_or_submit(key, submit))
+
+    def _load_or_submit(self, key: Hashable, submit: Callable[[], Future]) -> Future:
+        sentinel = object()
+        value = self._cache.get(key, sentinel)
+        if value is sentinel and self._disk is not None:
+            value = self._disk.get(make_disk_key(key), sentinel)
+            if value is not sentinel:
+                self._cache.put(key, value)
+        if value is not sentinel:
+            return completed(value)
+        future = submit()
+        future.add_done_callback(lambda done: self._store(key, done))
+        return future
+
+    def _store(self, key: Hashable, done: Future) -> None:
+        if done.cancelled() or done.exception() is not None:
+            return
+        value = done.result()
+        if value is not None:
+            self._cache.put(key, value)
+            if self._disk is not None:
+                self._disk.put(make_disk_key(key), value)
+
+    def attach_disk(self, disk: Optional[DiskCache]) -> None:
+        """Coloca o cache em disco atrás da memória (ou o remove, com None)."""
+        self._disk = disk
+
+    @property
+    def disk(self) -> Optional[DiskCache]:
+        return self._disk
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Guarda um resultado calculado fora do cache (por exemplo, de um snapshot)."""
+        self._cache.put(key, value)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Retorna os pares (chave, resultado) em cache."""
+        return self._cache.items()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._cache or (self._disk is not None and make_disk_key(key) in self._disk)
+
+    def stats(self):
+        """Retorna estatísticas de uso do cache e dos cálculos compartilhados."""
+        stats = self._cache.stats()
+        flight = self._flight.stats()
+        stats["coalesced"] = flight["followers"]
+        stats["in_flight"] = flight["in_flight"]
+        stats["withdrawn"] = flight["withdrawn"]
+        if self._disk is not None:
+            stats["disk"] = self._disk.stats()
+        return stats
+
+    def clear(self) -> None:
+        """Remove todos os resultados do cache (em memória e em disco)."""
+        self._cache.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+
+def make_disk_key(key: Hashable) -> str:
+    """
+    Chave textual do cache em disco.
+
+    Componentes SymPy entram pela forma srepr, e não pelo str(): símbolos com
+    suposições diferentes e Floats de precisões diferentes têm chaves distintas.
+    """
+    return repr(_srepr_components(key))
+
+
+def _srepr_components(value: Any) -> Any:
+    if isinstance(value, (sp.Basic, sp.MatrixBase)):
+        return ("srepr", sp.srepr(value))
+    if isinstance(value, tuple):
+        return tuple(_srepr_components(item) for item in value)
+    return value
+
+
+# Primeiro byte das entradas em disco: formato binário de binary_codec ou pickle
+_BINARY_ENTRY = b"B"
+_PICKLE_ENTRY = b"P"
+
+
+def _dump_entry(value: Any) -> bytes:
+    """Resultados no formato binário compacto; o que ele não representa (LaTeX renderizado etc.) vai em pickle."""
+    from use_cases import binary_codec
+
+    try:
+        return _BINARY_ENTRY + binary_codec.encode(value)
+    except binary_codec.CodecError:
+        return _PICKLE_ENTRY + pickle.dumps(value, protocol=PICKLE_PROTOCOL)
+
+
+def _load_entry(data: bytes) -> Any:
+    from use_cases import binary_codec
+
+    marker, body = data[:1], memoryview(data)[1:]
+    if marker == _BINARY_ENTRY:
+        return binary_codec.decode(body)
+    if marker == _PICKLE_ENTRY:
+        return pickle.loads(body)
+    raise ValueError(f"Entrada de formato desconhecido: {marker!r}")
+
+
+def disk_cache_from_environment(default_path: Optional[Path] = None) -> Optional[DiskCache]:
+    """
+    Cache em disco configurado por DERIVATA_RESULT_CACHE, ou None.
+
+    A variável escolhe o arquivo, ou `off` desativa o cache em disco; sem ela,
+    o cache usa `default_path`, e sem caminho padrão fica desativado.
+    """
+    setting = os.environ.get("DERIVATA_RESULT_CACHE", "").strip()
+    if setting.lower() in ("off", "0", "false", "no"):
+        return None
+    path = Path(setting) if setting else default_path
+    if path is None:
+        return None
+    return DiskCache(
+        path,
+        DEFAULT_DISK_CACHE_BYTES,
+        ttl=DEFAULT_DISK_CACHE_TTL,
+        # Resultados de outra versão do SymPy podem não ser legíveis (pickle) ou iguais
+        format_version=f"{RESULT_FORMAT_VERSION}/sympy-{sp.__version__}",
+        dumps=_dump_entry,
+        loads=_load_entry
+    )
+
+
+# Só em memória, salvo se DERIVATA_RESULT_CACHE apontar um arquivo: importar os serviços
+# (biblioteca, daemon, lote, API) não cria arquivos no projeto
+_shared_result_cache = ResultCache(disk=disk_cache_from_environment())
+
+
+def shared_result_cache() -> ResultCache:
+    """Retorna o cache de resultados compartilhado pelo processo."""
+    return _shared_result_cache
+
+
+def enable_shared_disk_cache(default_path: Path = DISK_CACHE_PATH) -> Optional[DiskCache]:
+    """
+    Coloca o cache em disco atrás do cache compartilhado, se ainda não houver um.
+
+    Usado pela aplicação: sem DERIVATA_RESULT_CACHE, o arquivo é `default_path`
+    (static/result_cache.sqlite3). Retorna o cache em disco em uso, ou None se desativado.
+    """
+    if _shared_result_cache.disk is None:
+        _shared_result_cache.attach_disk(disk_cache_from_environment(default_path))
+    return _shared_result_cache.disk
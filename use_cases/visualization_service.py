@@ -2,54 +2,285 @@
 Serviço para visualização de funções e derivadas.
 Implementa os casos de uso relacionados a visualizações.
 """
-from typing import List, Dict, Optional, Union, Tuple
-import plotly.graph_objects as go
+from typing import TYPE_CHECKING, Any, List, Dict, Optional, Union, Tuple
+from pathlib import Path
+import json
+import numpy as np
+from numpy.lib.format import open_memmap
+import sympy as sp
 from domain.models import Expression, PartialDerivativeResult
 from adapters.plotly_adapter import PlotlyAdapter
 from adapters.sympy_adapter import SymPyAdapter
+from adapters.figure_cache import FigureCache
+from adapters.adaptive_sampling import lambdify_stack, adaptive_sample, mask_poles
+from use_cases.compute_backend import ComputeBackend
+from use_cases.compute_tasks import estimate_priority
+from use_cases.result_cache import ResultCache, shared_result_cache
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+
+# Cache compartilhado pelo processo, para que as figuras sobrevivam às reexecuções do script
+_shared_figure_cache = FigureCache()
 
 
 class VisualizationService:
     """Serviço para visualização de funções e derivadas."""
-    
-    def __init__(self, plotly_adapter: PlotlyAdapter, sympy_adapter: SymPyAdapter):
+
+    def __init__(
+        self,
+        plotly_adapter: PlotlyAdapter,
+        sympy_adapter: SymPyAdapter,
+        figure_cache: Optional[FigureCache] = None,
+        backend: Optional[ComputeBackend] = None,
+        result_cache: Optional[ResultCache] = None
+    ):
         self.plotly_adapter = plotly_adapter
         self.sympy_adapter = sympy_adapter
-    
-    def create_3d_visualization(self, expression_str: str, variables: List[str]) -> Tuple[Optional[go.Figure], Optional[str]]:
+        self.figure_cache = figure_cache if figure_cache is not None else _shared_figure_cache
+        # Com um backend, a parte simbólica (derivadas parciais) roda nele; a amostragem continua local
+        self.backend = backend
+        self.result_cache = result_cache if result_cache is not None else shared_result_cache()
+
+    def _partial_derivatives(self, expression: Expression) -> Optional[PartialDerivativeResult]:
+        """
+        Derivadas parciais da expressão, calculadas no backend, se houver.
+
+        Usa a mesma chave do PartialDerivativeService: as figuras reaproveitam o
+        gradiente já calculado pela aba em vez de pedi-lo de novo ao backend.
+        """
+        variables = list(expression.variables)
+        key = ResultCache.make_key("partial", expression.raw_expression, variables)
+        if self.backend is None:
+            return self.result_cache.get_or_compute(
+                key, lambda: self.sympy_adapter.calculate_partial_derivatives(expression)
+            )
+        return self.result_cache.get_or_compute(
+            key,
+            lambda: self.backend.run(
+                "partial_derivatives",
+                expression.raw_expression,
+                variables,
+                priority=estimate_priority("partial", expression.raw_expression)
+            )
+        )
+
+    def create_3d_visualization(
+        self,
+        expression_str: str,
+        variables: List[str],
+        domain: Tuple[float, float] = (-3, 3),
+        resolution: int = 50
+    ) -> Tuple[Optional["go.Figure"], Optional[str]]:
         """Cria visualização 3D para funções de duas variáveis e suas derivadas parciais."""
         try:
+            key = self.figure_cache.make_key(expression_str, variables, domain, resolution, "surface_3d")
+            cached = self.figure_cache.get(key)
+            if cached is not None:
+                return cached.to_figure(), cached.error
+
             # Criar objeto Expression
             expression = Expression(raw_expression=expression_str, variables=variables)
-            
+
             # Calcular derivadas parciais
-            partial_derivatives = self.sympy_adapter.calculate_partial_derivatives(expression)
-            
+            partial_derivatives = self._partial_derivatives(expression)
+
             if not partial_derivatives:
                 return None, "Não foi possível calcular as derivadas parciais."
-            
+
             # Criar visualização 3D
-            fig, error = self.plotly_adapter.create_3d_visualization(expression, partial_derivatives)
-            
+            fig, error = self.plotly_adapter.create_3d_visualization(
+                expression, partial_derivatives, domain=domain, resolution=resolution
+            )
+
+            self.figure_cache.put(key, fig, error)
             return fig, error
         except Exception as e:
             return None, f"Erro ao criar visualização 3D: {str(e)}"
-    
-    def create_gradient_visualization(self, expression_str: str, variables: List[str]) -> Tuple[Optional[go.Figure], Optional[str]]:
+
+    def create_gradient_visualization(
+        self,
+        expression_str: str,
+        variables: List[str],
+        domain: Tuple[float, float] = (-3, 3),
+        resolution: int = 20
+    ) -> Tuple[Optional["go.Figure"], Optional[str]]:
         """Cria visualização 2D do gradiente (vetores de derivadas parciais)."""
         try:
+            key = self.figure_cache.make_key(expression_str, variables, domain, resolution, "gradient")
+            cached = self.figure_cache.get(key)
+            if cached is not None:
+                return cached.to_figure(), cached.error
+
             # Criar objeto Expression
             expression = Expression(raw_expression=expression_str, variables=variables)
-            
+
             # Calcular derivadas parciais
-            partial_derivatives = self.sympy_adapter.calculate_partial_derivatives(expression)
-            
+            partial_derivatives = self._partial_derivatives(expression)
+
             if not partial_derivatives:
                 return None, "Não foi possível calcular as derivadas parciais."
-            
+
             # Criar visualização do gradiente
-            fig, error = self.plotly_adapter.create_gradient_visualization(expression, partial_derivatives)
-            
+            fig, error = self.plotly_adapter.create_gradient_visualization(
+                expression, partial_derivatives, domain=domain, resolution=resolution
+            )
+
+            self.figure_cache.put(key, fig, error)
+            return fig, error
+        except Exception as e:
+            return None, f"Erro ao criar visualização do gradiente: {str(e)}"
+
+    def create_derivative_plot(
+        self,
+        expression_str: str,
+        variable: str,
+        derivatives: Dict[int, sp.Expr],
+        domain: Tuple[float, float] = (-5, 5),
+        max_points: int = 400
+    ) -> Tuple[Optional["go.Figure"], Optional[str]]:
+        """Cria o gráfico de f e das derivadas já calculadas (ordem -> expressão) sobre o domínio."""
+        try:
+            if domain[0] >= domain[1]:
+                return None, "O limite inferior do domínio deve ser menor que o superior."
+
+            orders = sorted(derivatives)
+            kind = "derivatives:" + ",".join(str(order) for order in orders)
+            key = self.figure_cache.make_key(expression_str, [variable], domain, max_points, kind)
+            cached = self.figure_cache.get(key)
+            if cached is not None:
+                return cached.to_figure(), cached.error
+
+            # Avaliar todas as ordens em uma única passada vetorizada, com abscissas adaptativas
+            evaluate = lambdify_stack(variable, [derivatives[order] for order in orders])
+            x_values, curves = adaptive_sample(evaluate, domain, max_points=max_points)
+            curves = mask_poles(curves)
+
+            fig, error = self.plotly_adapter.create_derivative_curves(variable, x_values, curves, orders)
+
+            self.figure_cache.put(key, fig, error)
+            return fig, error
+        except Exception as e:
+            return None, f"Erro ao criar gráfico das derivadas: {str(e)}"
+
+    def create_order_exploration(
+        self,
+        expression_str: str,
+        variable: str,
+        sequence: List[sp.Expr],
+        domain: Tuple[float, float] = (-5, 5),
+        max_points: int = 600
+    ) -> Tuple[Optional["go.Figure"], Optional[str]]:
+        """Amostra f e as derivadas da sequência [f, f', ..., f^(N)] de uma vez e monta o controle de ordens."""
+        try:
+            if domain[0] >= domain[1]:
+                return None, "O limite inferior do domínio deve ser menor que o superior."
+            if len(sequence) < 2:
+                return None, "É necessária pelo menos a primeira derivada."
+
+            orders = list(range(len(sequence)))
+            key = self.figure_cache.make_key(
+                expression_str, [variable], domain, max_points, f"order_slider:{orders[-1]}"
+            )
+            cached = self.figure_cache.get(key)
+            if cached is not None:
+                return cached.to_figure(), cached.error
+
+            # Todas as ordens em uma única passada vetorizada, com abscissas comuns
+            evaluate = lambdify_stack(variable, sequence)
+            x_values, curves = adaptive_sample(evaluate, domain, max_points=max_points)
+            curves = mask_poles(curves)
+
+            fig, error = self.plotly_adapter.create_order_slider_figure(variable, x_values, curves, orders)
+
+            self.figure_cache.put(key, fig, error)
             return fig, error
         except Exception as e:
-            return None, f"Erro ao criar visualização do gradiente: {str(e)}"
\ No newline at end of file
+            return None, f"Erro ao criar gráfico de exploração de ordens: {str(e)}"
+
+    def export_grid(
+        self,
+        expression_str: str,
+        variables: List[str],
+        output_dir: Union[str, Path],
+        domain: Tuple[float, float] = (-3, 3),
+        resolution: int = 1000,
+        chunk_rows: int = 256,
+        second_order: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Exporta f e suas derivadas parciais amostradas em uma grade para arquivos .npy.
+
+        Cada campo é gravado em blocos de linhas em um arquivo mapeado em memória
+        (um por derivada), reabrindo o mapeamento a cada bloco para que o uso de
+        memória dependa apenas de `chunk_rows`, e não do tamanho da grade. Um
+        manifesto JSON descreve os eixos e os arquivos gerados.
+        """
+        try:
+            if len(variables) != 2:
+                return None, "A exportação de grade só está disponível para funções de duas variáveis."
+            if domain[0] >= domain[1]:
+                return None, "O limite inferior do domínio deve ser menor que o superior."
+
+            # Criar objeto Expression
+            expression = Expression(raw_expression=expression_str, variables=variables)
+
+            # Calcular derivadas parciais
+            partial_derivatives = self._partial_derivatives(expression)
+
+            if not partial_derivatives:
+                return None, "Não foi possível calcular as derivadas parciais."
+
+            fields = {"f": expression.sympy_expr}
+            for var in variables:
+                fields[f"df_d{var}"] = partial_derivatives.derivatives[var]
+            if second_order:
+                hessian = partial_derivatives.get_hessian()
+                for i, var_i in enumerate(variables):
+                    for j, var_j in enumerate(variables[i:], start=i):
+                        fields[f"d2f_d{var_i}d{var_j}"] = hessian[i, j]
+
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+            axis = np.linspace(domain[0], domain[1], resolution)
+            evaluator = self.plotly_adapter.grid_evaluator
+
+            files = {}
+            for name, field_expr in fields.items():
+                kernel = evaluator.compile(field_expr, variables)
+                file_path = output_path / f"{name}.npy"
+
+                # Criar o arquivo com o cabeçalho .npy e o tamanho final, sem mantê-lo mapeado
+                memmap = open_memmap(file_path, mode="w+", dtype=np.float64, shape=(resolution, resolution))
+                del memmap
+
+                for start in range(0, resolution, chunk_rows):
+                    stop = min(start + chunk_rows, resolution)
+                    memmap = open_memmap(file_path, mode="r+")
+                    evaluator.evaluate_kernel(kernel, axis, axis[start:stop], out=memmap, row_offset=start)
+                    memmap.flush()
+                    del memmap
+
+                files[name] = {"file": file_path.name, "expression": str(field_expr)}
+
+            manifest = {
+                "expression": expression_str,
+                "variables": list(variables),
+                "domain": [float(domain[0]), float(domain[1])],
+                "resolution": resolution,
+                "shape": [resolution, resolution],
+                "dtype": "float64",
+                "layout": f"linha i = {variables[1]}[i], coluna j = {variables[0]}[j] (np.meshgrid)",
+                "axes": {
+                    var: {"start": float(domain[0]), "stop": float(domain[1]), "num": resolution}
+                    for var in variables
+                },
+                "fields": files
+            }
+            with open(output_path / "manifest.json", "w", encoding="utf-8") as file:
+                json.dump(manifest, file, ensure_ascii=False, indent=2)
+
+            return manifest, None
+        except Exception as e:
+            return None, f"Erro ao exportar a grade: {str(e)}"
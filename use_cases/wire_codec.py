@@ -0,0 +1,105 @@
+"""
+Codificação dos resultados dos cálculos para o protocolo dos nós de cálculo.
+Os resultados (modelos de domínio, expressões, matrizes) viram estruturas JSON
+com um marcador de tipo; as expressões SymPy são transmitidas na forma srepr,
+que reconstrói exatamente a mesma árvore do outro lado.
+"""
+from typing import Any, Dict
+import sympy as sp
+from domain.models import CriticalPoint, DerivativeResult, Expression, PartialDerivativeResult
+
+
+class CodecError(ValueError):
+    """Valor sem codificação conhecida, ou estrutura recebida inválida."""
+
+
+def _expr(payload: str) -> sp.Basic:
+    return sp.sympify(payload)
+
+
+def encode_value(value: Any) -> Any:
+    """Converte um resultado de cálculo em uma estrutura serializável em JSON."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, DerivativeResult):
+        return {
+            "type": "derivative",
+            "expression": value.original_expression.raw_expression,
+            "variables": list(value.original_expression.variables),
+            "variable": value.variable,
+            "order": value.order,
+            "result": sp.srepr(value.result),
+            "steps": list(value.steps)
+        }
+    if isinstance(value, PartialDerivativeResult):
+        return {
+            "type": "partial",
+            "expression": value.original_expression.raw_expression,
+            "variables": list(value.original_expression.variables),
+            "derivatives": {var: sp.srepr(expr) for var, expr in value.derivatives.items()},
+            "steps": {var: list(steps) for var, steps in value.steps.items()}
+        }
+    if isinstance(value, CriticalPoint):
+        return {
+            "type": "critical_point",
+            "coordinates": {var: sp.srepr(expr) for var, expr in value.coordinates.items()},
+            "classification": value.classification
+        }
+    if isinstance(value, sp.MatrixBase):
+        return {
+            "type": "matrix",
+            "rows": [[sp.srepr(value[i, j]) for j in range(value.cols)] for i in range(value.rows)]
+        }
+    if isinstance(value, sp.Basic):
+        return {"type": "expr", "srepr": sp.srepr(value)}
+    if isinstance(value, (list, tuple)):
+        return {"type": "list", "items": [encode_value(item) for item in value]}
+    raise CodecError(f"Tipo de resultado sem codificação: {type(value).__name__}")
+
+
+def decode_value(payload: Any) -> Any:
+    """Reconstrói o resultado a partir da estrutura produzida por encode_value."""
+    if not isinstance(payload, dict):
+        return payload
+    decoder = _DECODERS.get(payload.get("type"))
+    if decoder is None:
+        raise CodecError(f"Tipo de resultado desconhecido: {payload.get('type')}")
+    try:
+        return decoder(payload)
+    except (KeyError, TypeError, sp.SympifyError) as e:
+        raise CodecError(f"Resultado malformado ({payload.get('type')}): {str(e)}") from e
+
+
+def _decode_derivative(payload: Dict[str, Any]) -> DerivativeResult:
+    return DerivativeResult(
+        original_expression=Expression(payload["expression"], list(payload["variables"])),
+        variable=payload["variable"],
+        order=payload["order"],
+        result=_expr(payload["result"]),
+        steps=list(payload["steps"])
+    )
+
+
+def _decode_partial(payload: Dict[str, Any]) -> PartialDerivativeResult:
+    return PartialDerivativeResult(
+        original_expression=Expression(payload["expression"], list(payload["variables"])),
+        derivatives={var: _expr(expr) for var, expr in payload["derivatives"].items()},
+        steps={var: list(steps) for var, steps in payload["steps"].items()}
+    )
+
+
+def _decode_critical_point(payload: Dict[str, Any]) -> CriticalPoint:
+    return CriticalPoint(
+        coordinates={var: _expr(expr) for var, expr in payload["coordinates"].items()},
+        classification=payload["classification"]
+    )
+
+
+_DECODERS = {
+    "derivative": _decode_derivative,
+    "partial": _decode_partial,
+    "critical_point": _decode_critical_point,
+    "matrix": lambda payload: sp.Matrix([[_expr(item) for item in row] for row in payload["rows"]]),
+    "expr": lambda payload: _expr(payload["srepr"]),
+    "list": lambda payload: [decode_value(item) for item in payload["items"]]
+}